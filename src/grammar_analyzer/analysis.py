@@ -0,0 +1,170 @@
+from pycmp.parsing import (
+    build_lr0_automaton,
+    build_lr1_automaton,
+    compute_suffix_firsts,
+)
+from pycmp import compiled
+from grammar_analyzer.cache import cached, grammar_weight
+
+ARTIFACTS = {}
+
+
+def artifact(name):
+    """
+    Register a builder for the artifact `name`. Builders take the
+    `GrammarAnalysis` and read the artifacts they depend on from it.
+    """
+
+    def decorator(builder):
+        ARTIFACTS[name] = builder
+        return builder
+
+    return decorator
+
+
+class GrammarAnalysis:
+    """
+    Lazily built, memoized analysis artifacts of one grammar.
+
+    Every artifact is built at most once, the first time it is asked for.
+    The artifacts read while building another one are recorded as its
+    dependencies, so `invalidate` drops exactly what was derived from it.
+    The automata are built within `budget`, if given.
+    """
+
+    def __init__(self, grammar, budget=None):
+        self.grammar = grammar
+        self.budget = budget
+        self.artifacts = {}
+        self.dependencies = {}
+        self.builds = {}
+        self._building = []
+
+    def get(self, name):
+        if self._building:
+            self.dependencies[self._building[-1]].add(name)
+
+        try:
+            return self.artifacts[name]
+        except KeyError:
+            pass
+
+        assert name not in self._building, f"Artifact '{name}' depends on itself"
+        builder = ARTIFACTS[name]
+
+        self.dependencies[name] = set()
+        self._building.append(name)
+        try:
+            value = builder(self)
+        finally:
+            self._building.pop()
+
+        self.artifacts[name] = value
+        self.builds[name] = self.builds.get(name, 0) + 1
+        return value
+
+    def __getattr__(self, name):
+        if name in ARTIFACTS:
+            return self.get(name)
+        raise AttributeError(name)
+
+    def invalidate(self, name):
+        """Drop the artifact `name` and every artifact built from it."""
+        self.artifacts.pop(name, None)
+        for other, dependencies in self.dependencies.items():
+            if name in dependencies and other in self.artifacts:
+                self.invalidate(other)
+
+
+@cached(weigher=grammar_weight)
+def get_analysis(grammar, *, budget=None):
+    """
+    The shared analysis of `grammar`. With a `budget`, a new analysis is
+    returned instead, not cached, whose automata are built within it.
+    """
+    return GrammarAnalysis(grammar, budget)
+
+
+def get_augmented(grammar):
+    return get_analysis(grammar).augmented
+
+
+@artifact("augmented")
+def __build_augmented(analysis):
+    return analysis.grammar.get_augmented_grammar(True)
+
+
+@artifact("compiled")
+def __build_compiled(analysis):
+    return compiled.CompiledGrammar(analysis.augmented)
+
+
+@artifact("compiled_firsts")
+def __build_compiled_firsts(analysis):
+    """FIRST bitmasks and nullability by symbol id of the augmented grammar."""
+    return compiled.compute_firsts(analysis.compiled)
+
+
+@artifact("compiled_suffixes")
+def __build_compiled_suffixes(analysis):
+    """FIRST bitmask and nullability of the suffix after every item."""
+    return compiled.compute_suffix_firsts(analysis.compiled, *analysis.compiled_firsts)
+
+
+@artifact("compiled_follows")
+def __build_compiled_follows(analysis):
+    return compiled.compute_follows(
+        analysis.compiled, *analysis.compiled_firsts, analysis.compiled_suffixes
+    )
+
+
+@artifact("firsts")
+def __build_firsts(analysis):
+    return compiled.decode_firsts(analysis.compiled, *analysis.compiled_firsts)
+
+
+@artifact("follows")
+def __build_follows(analysis):
+    return compiled.decode_follows(analysis.compiled, analysis.compiled_follows)
+
+
+@artifact("suffix_firsts")
+def __build_suffix_firsts(analysis):
+    return compute_suffix_firsts(analysis.augmented, analysis.firsts)
+
+
+@artifact("nullable")
+def __build_nullable(analysis):
+    cg = analysis.compiled
+    _, nullable = analysis.compiled_firsts
+    return {
+        cg.symbols[s] for s in range(cg.n_terminals, len(cg.symbols)) if nullable[s]
+    }
+
+
+@artifact("lr0_automaton")
+def __build_lr0_automaton(analysis):
+    return build_lr0_automaton(analysis.augmented, analysis.budget)
+
+
+@artifact("lr0_dfa")
+def __build_lr0_dfa(analysis):
+    return analysis.lr0_automaton.to_deterministic(budget=analysis.budget)
+
+
+@artifact("lr1_automaton")
+def __build_lr1_automaton(analysis):
+    return build_lr1_automaton(analysis.augmented, budget=analysis.budget)
+
+
+@artifact("ll_table")
+def __build_ll_table(analysis):
+    cg = analysis.compiled
+    table = compiled.build_ll_table(
+        cg, analysis.compiled_suffixes, analysis.compiled_follows
+    )
+    return {
+        (cg.symbols[x], cg.symbols[t]): [cg.productions[p] for p in productions]
+        for (x, t), productions in table.items()
+        if x != cg.start
+    }
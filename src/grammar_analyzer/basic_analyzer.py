@@ -1,14 +1,23 @@
-from functools import lru_cache
-from pycmp.parsing import compute_firsts as __compute_firsts
-from pycmp.parsing import compute_follows as __compute_follows
+from grammar_analyzer.cache import cached
+from grammar_analyzer.analysis import get_analysis
 
 
-@lru_cache
+@cached
 def compute_firsts(grammar):
-    return __compute_firsts(grammar)
+    return __without_augmentation(grammar, get_analysis(grammar).firsts)
 
 
-@lru_cache
+@cached
 def compute_follows(grammar):
-    firsts = compute_firsts(grammar)
-    return __compute_follows(grammar, firsts)
+    return __without_augmentation(grammar, get_analysis(grammar).follows)
+
+
+def __without_augmentation(grammar, sets):
+    # the analysis runs on the augmented grammar; hide its start symbol and
+    # the body of its start production from the grammar's own sets
+    augmented = get_analysis(grammar).augmented
+    hidden = {augmented.start_symbol}
+    for production in augmented.start_symbol.productions:
+        if all(production.right != p.right for p in grammar.productions):
+            hidden.add(production.right)
+    return {key: value for key, value in sets.items() if key not in hidden}
@@ -0,0 +1,167 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from pycmp.grammar import FrozenGrammar
+from pycmp.canonical import canonical_form, isomorphism, augmented_isomorphism
+from pycmp.canonical import translate
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ("hits", "misses", "evictions", "entries", "weight", "max_entries", "max_weight"),
+)
+
+
+class AnalysisCache:
+    """
+    LRU cache bounded both by number of entries and by total weight, an
+    estimate of the memory each entry holds. Least recently used entries
+    are evicted until both bounds hold again.
+    """
+
+    def __init__(self, max_entries=256, max_weight=200_000):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.entries = OrderedDict()
+        self.weight = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Return `(True, value)` on a hit and `(False, None)` on a miss."""
+        try:
+            value, _ = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value, weight=1):
+        if key in self.entries:
+            self.weight -= self.entries.pop(key)[1]
+        self.entries[key] = (value, weight)
+        self.weight += weight
+
+        # The newest entry is kept even if it alone is over the bounds
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or self.weight > self.max_weight
+        ):
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.weight -= evicted
+            self.evictions += 1
+
+    def info(self):
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.evictions,
+            len(self.entries),
+            self.weight,
+            self.max_entries,
+            self.max_weight,
+        )
+
+    def clear(self):
+        self.entries.clear()
+        self.weight = 0
+        self.hits = self.misses = self.evictions = 0
+
+
+ANALYSIS_CACHE = AnalysisCache()
+
+
+def grammar_key(grammar):
+    """
+    Frozen grammars are keyed by fingerprint alone, so equal snapshots share
+    results. Mutable grammars are keyed by object and current content: the
+    results hold their symbols, and a change to the grammar must not return
+    stale results.
+    """
+    if isinstance(grammar, FrozenGrammar):
+        return grammar.fingerprint
+    return grammar.fingerprint, grammar
+
+
+def grammar_weight(grammar, value=None):
+    return sum(len(production.right) + 1 for production in grammar.productions)
+
+
+def table_weight(grammar, tables):
+    """Number of cells of a table, or of a tuple of tables."""
+    if isinstance(tables, dict):
+        tables = (tables,)
+    return max(1, sum(len(table) for table in tables))
+
+
+def graph_weight(grammar, graph):
+    """Number of nodes and edges of a pydot graph."""
+    return max(1, len(graph.get_nodes()) + len(graph.get_edges()))
+
+
+def cached(function=None, *, cache=None, weigher=None, canonical=False, augmented=None):
+    """
+    Like `functools.lru_cache` for functions whose first argument is a
+    grammar, but keyed with `grammar_key` and stored in a bounded
+    `AnalysisCache` (the shared `ANALYSIS_CACHE` by default). `weigher`
+    estimates the weight of an entry from the grammar and the result.
+
+    With `canonical`, results are keyed by the grammar's canonical form
+    instead and shared by every grammar equal up to nonterminal names and
+    production order: a result computed for one of them is translated to
+    the symbols and productions of the others. Results that hold objects of
+    the augmented grammar as well need `augmented`, which gives the augmented
+    grammar the result was computed on.
+
+    A `budget` keyword argument skips the cache: the result is computed
+    within it and not stored, so a budget is always charged for the work it
+    bounds.
+    """
+    if function is None:
+        return lambda f: cached(
+            f, cache=cache, weigher=weigher, canonical=canonical, augmented=augmented
+        )
+    if cache is None:
+        cache = ANALYSIS_CACHE
+
+    @wraps(function)
+    def wrapper(grammar, *args, **kwargs):
+        budget = kwargs.pop("budget", None)
+        if budget is not None:
+            return function(grammar, *args, budget=budget, **kwargs)
+
+        form = get_canonical_form(grammar) if canonical else None
+        key = (
+            function.__module__,
+            function.__qualname__,
+            form.fingerprint if canonical else grammar_key(grammar),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+
+        hit, value = cache.get(key)
+        if hit and not canonical:
+            return value
+        if hit:
+            source, source_form, source_augmented, value = value
+            if source is grammar:
+                return value
+            mapping = isomorphism(source, grammar, source_form, form)
+            if mapping is not None and augmented is not None:
+                mapping = augmented_isomorphism(
+                    mapping, source_augmented, augmented(grammar)
+                )
+            if mapping is not None:
+                return translate(value, mapping)
+
+        value = function(grammar, *args, **kwargs)
+        weight = 1 if weigher is None else weigher(grammar, value)
+        entry = value
+        if canonical:
+            entry = (grammar, form, augmented and augmented(grammar), value)
+        cache.put(key, entry, weight)
+        return value
+
+    wrapper.cache_info = cache.info
+    return wrapper
+
+
+get_canonical_form = cached(canonical_form)
@@ -0,0 +1,250 @@
+from functools import namedtuple
+from pycmp.grammar import Item, Terminal
+from pycmp.parsing import ShiftReduceParser, closure_lr1
+from pycmp.utils import ContainerSet
+from pycmp.compiled import build_lr1_collection, register_states
+from pycmp.budget import STATE_BYTES, ITEM_BYTES
+from grammar_analyzer.cache import cached
+from grammar_analyzer.analysis import artifact, get_analysis
+
+grammar_class = namedtuple("grammar_class", ("ll", "slr", "lalr", "lr"))
+
+
+class _ConflictFound(Exception):
+    pass
+
+
+class __ConflictDetector(ShiftReduceParser):
+    """
+    Shift-reduce table that stops at the first collision the grammar's
+    precedence declarations cannot settle. `fill` registers the entries.
+    """
+
+    def __init__(self, grammar, fill):
+        self.fill = fill
+        super().__init__(grammar)
+
+    def _build_parsing_table(self):
+        self.fill(self)
+
+    def _register(self, table, key, value):
+        if (
+            table is self.action
+            and key in table
+            and key not in self._nonassoc
+            and table[key] != value
+            and len(self._resolve(key, table[key], value)) > 1
+        ):
+            raise _ConflictFound()
+        super()._register(table, key, value)
+
+
+def _has_conflicts(grammar, fill):
+    try:
+        __ConflictDetector(grammar, fill)
+    except _ConflictFound:
+        return True
+    return False
+
+
+@cached(canonical=True)
+def classify(grammar, *, budget=None):
+    """
+    Tell whether `grammar` is LL(1), SLR(1), LALR(1) and LR(1).
+
+    Every check stops at its first conflict and the implied answers are
+    never computed: SLR(1) grammars are LALR(1) and LALR(1) grammars are
+    LR(1). (LL(1) implies LR(1) only for reduced grammars, so it is not
+    used.) SLR(1) and LALR(1) share one LR(0) collection (LALR(1)
+    lookaheads are propagated over it) and the LR(1) automaton is only built
+    when LALR(1) fails, on the compiled grammar. The collections are built
+    within `budget`, if given.
+    """
+    analysis = get_analysis(grammar, budget=budget)
+    augmented, follows = analysis.augmented, analysis.follows
+    firsts = dict(analysis.firsts)
+    firsts[augmented.eof] = ContainerSet(augmented.eof)
+
+    ll = not __has_ll_conflicts(augmented, firsts, follows)
+
+    states, kernels, gotos = analysis.lr0_collection
+
+    slr = not _has_conflicts(
+        augmented, lambda parser: __fill_slr(parser, augmented, states, gotos, follows)
+    )
+    if slr:
+        return grammar_class(ll, True, True, True)
+
+    lookaheads, suffixes = analysis.lalr_lookaheads, analysis.suffix_firsts
+    lalr = not _has_conflicts(
+        augmented,
+        lambda parser: __fill_lalr(
+            parser, augmented, kernels, gotos, lookaheads, firsts, suffixes
+        ),
+    )
+    if lalr:
+        return grammar_class(ll, False, lalr, True)
+
+    cg = analysis.compiled
+    collection = build_lr1_collection(
+        cg, analysis.compiled_suffixes, budget=analysis.budget
+    )
+    states, gotos = collection.item_sets(), collection.gotos
+    lr = not _has_conflicts(
+        augmented, lambda parser: register_states(parser, cg, states, gotos)
+    )
+    return grammar_class(ll, False, False, lr)
+
+
+def __has_ll_conflicts(grammar, firsts, follows):
+    terminals = grammar.terminals + [grammar.eof]
+    predicted = {}
+
+    for production in grammar.productions:
+        x, alpha = production
+        if x == grammar.start_symbol:
+            continue
+        seen = predicted.setdefault(x, set())
+
+        first_alpha = firsts[alpha]
+        lookaheads = list(first_alpha)
+        if first_alpha.contains_epsilon:
+            lookaheads.extend(t for t in terminals if t in follows[x])
+
+        for t in lookaheads:
+            if t in seen:
+                return True
+            seen.add(t)
+
+    return False
+
+
+def __lr0_closure(kernel):
+    closure = list(kernel)
+    seen = set(closure)
+    for item in closure:
+        symbol = item.next_symbol
+        if symbol is None or not symbol.is_nonterminal:
+            continue
+        for production in symbol.productions:
+            child = Item(production, 0)
+            if child not in seen:
+                seen.add(child)
+                closure.append(child)
+    return closure
+
+
+@artifact("lr0_collection")
+def __build_lr0_collection(analysis):
+    """
+    Canonical LR(0) collection. Returns the closed states, their kernels and
+    the goto function as a dict `(state, symbol) -> state`. Every state is
+    charged to the analysis budget, if any.
+    """
+    grammar = analysis.augmented
+    start = frozenset([Item(grammar.start_symbol.productions[0], 0)])
+    kernels, index, states, gotos = [start], {start: 0}, [], {}
+    budget = analysis.budget
+    if budget is not None:
+        budget.track("lr0 collection")
+
+    for i, kernel in enumerate(kernels):
+        closure = __lr0_closure(kernel)
+        states.append(closure)
+        if budget is not None:
+            budget.charge(1, len(closure), STATE_BYTES + ITEM_BYTES * len(closure))
+
+        moves = {}
+        for item in closure:
+            if not item.is_reduce_item:
+                moves.setdefault(item.next_symbol, []).append(item.next_item())
+
+        for symbol, items in moves.items():
+            target = frozenset(items)
+            try:
+                gotos[i, symbol] = index[target]
+            except KeyError:
+                gotos[i, symbol] = index[target] = len(kernels)
+                kernels.append(target)
+
+    return states, kernels, gotos
+
+
+def __register_item(parser, grammar, gotos, idx, item, lookaheads):
+    if item.is_reduce_item:
+        is_start = item.production.left == grammar.start_symbol
+        for s in lookaheads:
+            action = parser.OK if is_start and s == grammar.eof else parser.REDUCE
+            parser._register(parser.action, (idx, s), (action, item.production))
+        return
+
+    x = item.next_symbol
+    if x.is_terminal:
+        parser._register(parser.action, (idx, x), (parser.SHIFT, gotos[idx, x]))
+
+
+def __fill_slr(parser, grammar, states, gotos, follows):
+    for idx, state in enumerate(states):
+        for item in state:
+            lookaheads = follows.get(item.production.left, ())
+            __register_item(parser, grammar, gotos, idx, item, lookaheads)
+
+
+@artifact("lalr_lookaheads")
+def __compute_lalr_lookaheads(analysis):
+    """
+    Kernel item lookaheads of the LALR(1) automaton, found on the LR(0)
+    collection by telling spontaneous lookaheads from propagated ones with a
+    dummy lookahead (Aho et al., 4.7.5).
+
+    Items of non-productive symbols may have no lookaheads at all, and then
+    nothing is generated from them: spontaneous lookaheads only count once
+    the item they come from has some.
+    """
+    grammar = analysis.augmented
+    _, kernels, gotos = analysis.lr0_collection
+    dummy = Terminal("#", grammar)
+    firsts, suffixes = analysis.firsts, analysis.suffix_firsts
+
+    lookaheads = {
+        (i, item): set() for i, kernel in enumerate(kernels) for item in kernel
+    }
+    start = next(iter(kernels[0]))
+    lookaheads[0, start].add(grammar.eof)
+
+    propagation, spontaneous = {}, {}
+    for i, kernel in enumerate(kernels):
+        for item in kernel:
+            targets = propagation.setdefault((i, item), [])
+            generated = spontaneous.setdefault((i, item), [])
+            for child in closure_lr1(
+                [Item(item.production, item.pos, [dummy])], firsts, suffixes
+            ):
+                if child.is_reduce_item:
+                    continue
+                target = (gotos[i, child.next_symbol], child.next_item().center())
+                for lookahead in child.lookaheads:
+                    if lookahead == dummy:
+                        targets.append(target)
+                    else:
+                        generated.append((target, lookahead))
+
+    pending = [(0, start)]
+    while pending:
+        key = pending.pop()
+        updates = [(target, lookaheads[key]) for target in propagation[key]]
+        updates.extend((target, {la}) for target, la in spontaneous.pop(key, ()))
+        for target, values in updates:
+            size = len(lookaheads[target])
+            lookaheads[target].update(values)
+            if len(lookaheads[target]) != size:
+                pending.append(target)
+
+    return lookaheads
+
+
+def __fill_lalr(parser, grammar, kernels, gotos, lookaheads, firsts, suffixes):
+    for idx, kernel in enumerate(kernels):
+        items = [Item(k.production, k.pos, lookaheads[idx, k]) for k in kernel]
+        for item in closure_lr1(items, firsts, suffixes):
+            __register_item(parser, grammar, gotos, idx, item, item.lookaheads)
@@ -1,4 +1,9 @@
+import time
 import pydot
+from collections import deque
+
+# Seconds the counterexample searches may spend before giving up
+CONFLICT_SEARCH_TIME_BUDGET = 5
 
 
 def build_derivation_tree(parse, is_right_parse=False):
@@ -36,3 +41,112 @@ def __build_derivation_tree(tree, parse, is_right_parse, i=0):
         tree.add_edge(pydot.Edge(node, child))
 
     return i, node
+
+
+class StackInterner:
+    """
+    Persistent stacks stored as interned (top, rest) cells, so every stack
+    is a single int: pushing and popping share structure, and search
+    configurations hash in O(1).
+    """
+
+    EMPTY = 0
+
+    def __init__(self):
+        self.cells = [None]
+        self.ids = {}
+
+    def push(self, stack, value):
+        key = (value, stack)
+        try:
+            return self.ids[key]
+        except KeyError:
+            self.ids[key] = len(self.cells)
+            self.cells.append(key)
+            return len(self.cells) - 1
+
+    def extend(self, stack, values):
+        for value in values:
+            stack = self.push(stack, value)
+        return stack
+
+    def top(self, stack):
+        return self.cells[stack][0]
+
+    def pop(self, stack, count=1):
+        for _ in range(count):
+            stack = self.cells[stack][1]
+        return stack
+
+
+def search_conflicts(
+    start, successors, conflicts, targets, time_budget=None, first_only=True
+):
+    """
+    0-1 breadth-first search over parser configurations.
+
+    `successors(config)` yields `(terminal, next_config)` pairs, with
+    `terminal` None for moves that read no input. `conflicts(config)` yields
+    `(key, terminal)` pairs for the conflicting table entries reachable from
+    `config` by reading `terminal` (or nothing when it is None).
+
+    Configurations are visited in order of consumed input. Conflicts reached
+    by reading a terminal are queued like any other move that reads one, and
+    only recorded when they come out of the queue, so the prefix recorded for
+    each conflict key is a shortest one. The search ends once every key in
+    `targets` was found. Returns a dict from conflict keys to prefixes; it
+    may be partial if `time_budget` (seconds) runs out.
+    """
+    if not targets:
+        return {}
+
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    found = {}
+    visited = set()
+    # (config, prefix, key): entries with a key are conflicts found at the
+    # cost of their prefix, not configurations to expand
+    pending = deque([(start, None, None)])
+
+    while pending:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+
+        config, prefix, key = pending.popleft()
+        if key is not None:
+            if key not in found:
+                found[key] = _unroll(prefix)
+                if first_only or len(found) == len(targets):
+                    return found
+            continue
+
+        if config in visited:
+            continue
+        visited.add(config)
+
+        for key, terminal in conflicts(config):
+            if key in found:
+                continue
+            if terminal is None:
+                found[key] = _unroll(prefix)
+                if first_only or len(found) == len(targets):
+                    return found
+            else:
+                pending.append((None, (terminal, prefix), key))
+
+        for terminal, next_config in successors(config):
+            if next_config in visited:
+                continue
+            if terminal is None:
+                pending.appendleft((next_config, prefix, None))
+            else:
+                pending.append((next_config, (terminal, prefix), None))
+
+    return found
+
+
+def _unroll(prefix):
+    terminals = []
+    while prefix is not None:
+        terminal, prefix = prefix
+        terminals.append(terminal)
+    return list(reversed(terminals))
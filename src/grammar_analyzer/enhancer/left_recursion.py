@@ -1,4 +1,5 @@
 from pycmp.grammar import Grammar, Sentence, Symbol, Production, NonTerminal
+from pycmp.budget import ITEM_BYTES
 from grammar_analyzer.enhancer.converter import grammar_to_graph, graph_to_grammar
 from grammar_analyzer.enhancer.unnecesary_productions import (
     remove_unit_prods,
@@ -6,9 +7,12 @@ from grammar_analyzer.enhancer.unnecesary_productions import (
 )
 
 
-def remove_left_recursion(grammar):
-    new_grammar = __remove_epsilon_productions(grammar)
-    new_grammar = remove_unit_prods(new_grammar)
+def remove_left_recursion(grammar, budget=None):
+    """Every production the pass generates is charged to `budget`, if given."""
+    new_grammar = __remove_epsilon_productions(grammar, budget)
+    new_grammar = remove_unit_prods(new_grammar, budget)
+    if budget is not None:
+        budget.track("remove left recursion")
 
     nonterminals = [t.name for t in new_grammar.nonterminals]
 
@@ -28,6 +32,8 @@ def remove_left_recursion(grammar):
                         for item in remove_first:
                             new_sentence.append(item)
                         d[nonterminals[i]].append(new_sentence)
+                        if budget is not None:
+                            budget.charge(items=1, bytes=ITEM_BYTES * len(new_sentence))
         d = __remove_inmediate_left_recursion(d)
 
     return graph_to_grammar(S, d)
@@ -81,7 +87,9 @@ def __remove_inmediate_left_recursion(d: dict):
     return new_d
 
 
-def __remove_epsilon_productions(grammar):
+def __remove_epsilon_productions(grammar, budget=None):
+    if budget is not None:
+        budget.track("remove epsilon productions")
     S, d = grammar_to_graph(grammar)
     nonterminals = [t.name for t in grammar.nonterminals]
 
@@ -102,6 +110,8 @@ def __remove_epsilon_productions(grammar):
 
                     if not new_sentence in new_value:
                         new_value.append(new_sentence)
+                        if budget is not None:
+                            budget.charge(items=1, bytes=ITEM_BYTES * len(new_sentence))
 
         d[key] = new_value
 
@@ -1,5 +1,6 @@
 from pycmp.grammar import Grammar, Sentence, Symbol
 from itertools import islice
+from pycmp.budget import ITEM_BYTES
 from grammar_analyzer.enhancer.converter import graph_to_grammar, grammar_to_graph
 
 
@@ -46,7 +47,10 @@ class Trie:
         return productions
 
 
-def remove_common_prefixes(grammar: Grammar):
+def remove_common_prefixes(grammar: Grammar, budget=None):
+    """Every production the pass generates is charged to `budget`, if given."""
+    if budget is not None:
+        budget.track("remove common prefixes")
     S, d = grammar_to_graph(grammar)
     nonterminals = [nt.name for nt in grammar.nonterminals]
 
@@ -79,6 +83,8 @@ def remove_common_prefixes(grammar: Grammar):
             n.productions = [d[A][-1]]
 
             for p in productions:
+                if budget is not None:
+                    budget.charge(items=1, bytes=ITEM_BYTES * len(p))
                 if len(p) > n.depth + 1:
                     try:
                         d[A_new].append(p[n.depth + 1:])
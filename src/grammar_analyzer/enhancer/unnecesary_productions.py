@@ -1,9 +1,10 @@
 from pycmp.grammar import Grammar, Sentence, Symbol, Production, NonTerminal
+from pycmp.budget import ITEM_BYTES
 from grammar_analyzer.enhancer.converter import grammar_to_graph, graph_to_grammar
 
 
-def remove_unnecesary_productions(G: Grammar):
-    new_G = remove_unit_prods(G)
+def remove_unnecesary_productions(G: Grammar, budget=None):
+    new_G = remove_unit_prods(G, budget)
     new_G = remove_unreachable_prods(new_G)
     return new_G
 
@@ -36,7 +37,10 @@ def __overlook(d: dict, mark: dict, nonterminals: list, t):
                 __overlook(d, mark, nonterminals, symbol)
 
 
-def remove_unit_prods(G: Grammar):
+def remove_unit_prods(G: Grammar, budget=None):
+    """Every production the pass generates is charged to `budget`, if given."""
+    if budget is not None:
+        budget.track("remove unit productions")
     S, d = grammar_to_graph(G)
     nonterminals = [t.name for t in G.nonterminals]
     new_d = {}
@@ -45,6 +49,8 @@ def remove_unit_prods(G: Grammar):
     for pair in u:
         for sentence in d[pair[1]]:
             if not (len(sentence) == 1 and sentence[0] in nonterminals):
+                if budget is not None:
+                    budget.charge(items=1, bytes=ITEM_BYTES * len(sentence))
                 try:
                     if not sentence in new_d[pair[0]]:
                         new_d[pair[0]].append(sentence)
@@ -1 +1 @@
-from grammar_analyzer.interpreter.interpreter import eval_input
+from grammar_analyzer.interpreter.interpreter import eval_input, InputEvaluator
@@ -4,17 +4,33 @@ from grammar_analyzer.interpreter.evaluation import (
     register_start_symbol,
     register_terminals,
 )
-from grammar_analyzer.interpreter.language import lexer, parser
-from pycmp.evaluation import evaluate_reverse_parse
+from grammar_analyzer.interpreter.language import lexer, lr1_parser
 from pycmp.grammar import Grammar
-from pycmp.parsing import LR1Parser
+from pycmp.incremental import IncrementalDocument
+
+
+class InputEvaluator:
+    """
+    Evaluates successive versions of one input. Only the part of the text
+    that changed since the last call is lexed and parsed again; the rest of
+    the parse tree, with the values of its attributes, is reused. Callers
+    that run concurrently must keep an evaluator each.
+    """
+
+    def __init__(self):
+        self.document = None
+
+    def __call__(self, text):
+        if self.document is None:
+            self.document = IncrementalDocument(lexer, lr1_parser, text)
+            tree = self.document.tree
+        else:
+            tree = self.document.update(text)
+        return evaluate_ast(tree.evaluate())
 
 
 def eval_input(text):
-    tokens = lexer(text)
-    parse, actions = parser(tokens)
-    ast = evaluate_reverse_parse(parse, actions, tokens)
-    return evaluate_ast(ast)
+    return InputEvaluator()(text)
 
 
 def evaluate_ast(node):
@@ -47,9 +47,10 @@ def build_input_lexer(eps, union, arrow, eol, symbol, eof):
             (symbol, f"({symbols})(({symbols})*)"),
         ],
         eof,
+        ignore=[ignore],
     )
 
-    return lambda text: [t for t in lexer(text) if t.ttype != ignore]
+    return lexer
 
 
 def build_input_grammar():
@@ -88,8 +89,7 @@ def build_input_grammar():
     return input_grammar
 
 
-def build_input_parser(grammar):
-    parser = LR1Parser(grammar)
+def build_input_parser(parser):
     return lambda tokens: parser([t.ttype for t in tokens], return_actions=True)
 
 
@@ -102,4 +102,5 @@ lexer = build_input_lexer(
     symbol=grammar["symbol"],
     eof=grammar.eof,
 )
-parser = build_input_parser(grammar)
+lr1_parser = LR1Parser(grammar)
+parser = build_input_parser(lr1_parser)
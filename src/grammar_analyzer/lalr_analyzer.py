@@ -1,17 +1,37 @@
-from functools import lru_cache
-from itertools import chain
 from pycmp.parsing import ShiftReduceParser, build_lr1_automaton
 from pycmp.grammar import Item
 from grammar_analyzer.shift_reduce_analyzer import (
+    ConflictsCollector,
     shift_reduce_info,
     build_conflict_str as __build_conflict_str,
+    build_conflict_strs as __build_conflict_strs,
 )
-from grammar_analyzer.common import build_derivation_tree
+from grammar_analyzer.cache import cached, graph_weight, table_weight
+from grammar_analyzer.analysis import artifact, get_analysis, get_augmented
+from grammar_analyzer.common import CONFLICT_SEARCH_TIME_BUDGET, build_derivation_tree
+from pycmp.incremental import IncrementalParser
+from pycmp.token import Token
 
 # TODO: Refactor all shift-reduce analyzers to share common code
 
 
 class LALRParser(ShiftReduceParser):
+    def __init__(
+        self, grammar, verbose=False, augmented=None, automaton=None, budget=None
+    ):
+        """
+        The augmented grammar and its LR(1) `automaton` may be passed
+        prebuilt. Otherwise the automaton is built within `budget`, if given.
+        """
+        self.augmented = augmented
+        self.automaton = automaton
+        self.budget = budget
+        super().__init__(grammar, verbose)
+
+    def _update_parsing_table(self):
+        self.augmented = self.automaton = None
+        super()._update_parsing_table()
+
     def _build_parsing_table(self):
         """
         Method to construct an LALR parser:
@@ -28,12 +48,27 @@ class LALRParser(ShiftReduceParser):
            11, 12, ... , Ik all have the same core. Let K be the union of all sets of
            items having the same core as GOTO(I1, X). Then GOTO(J, X) = K. 
         """
-        grammar = self.grammar.get_augmented_grammar(True)
-
-        automaton = build_lr1_automaton(grammar)
-        merged_states = self._merge_states(node.state for node in automaton)
+        grammar = self.augmented
+        if grammar is None:
+            grammar = self.augmented = self.grammar.get_augmented_grammar(True)
+        if self.automaton is None:
+            self.automaton = build_lr1_automaton(grammar, budget=self.budget)
+        automaton = self.automaton
+
+        nodes = list(automaton)
+        cores = [self._get_core(node.state) for node in nodes]
+        merged_states = self._merge_states(node.state for node in nodes)
+
+        # Nodes with the same core have the same transitions, up to cores
+        index, representatives = {}, []
+        for node, core in zip(nodes, cores):
+            if core not in index:
+                index[core] = len(representatives)
+                representatives.append(node)
+        merged_idx = {id(node): index[core] for node, core in zip(nodes, cores)}
 
         for idx, state in enumerate(merged_states):
+            original_node = representatives[idx]
             for item in state:
                 if item.is_reduce_item:
                     is_start = item.production.left == grammar.start_symbol
@@ -45,20 +80,11 @@ class LALRParser(ShiftReduceParser):
                     continue
 
                 x = item.next_symbol
-                original_node = next(
-                    node
-                    for node in automaton
-                    if self._get_core(node.state) == self._get_core(state)
-                )
                 try:
-                    original_dest = original_node.transitions[x.name][0].state
+                    original_dest = original_node.transitions[x.name][0]
                 except KeyError:
                     continue
-                dest_idx = next(
-                    i
-                    for i, s in enumerate(merged_states)
-                    if self._get_core(s) == self._get_core(original_dest)
-                )
+                dest_idx = merged_idx[id(original_dest)]
                 if x.is_terminal:
                     self._register(self.action, (idx, x), (self.SHIFT, dest_idx))
                 else:
@@ -66,53 +92,38 @@ class LALRParser(ShiftReduceParser):
 
     @classmethod
     def _merge_states(cls, states):
-        cores, new_states = frozenset(cls._get_core(s) for s in states), []
-        for core in cores:
-            items = chain(state for state in states if cls._get_core(state) == core)
-            new_state = frozenset(
-                Item(
-                    center.production,
-                    center.pos,
-                    lookaheads=chain(
-                        item.lookaheads for item in items if item.center() == center
-                    ),
-                )
-                for center in core
-            )
-            new_states.append(new_state)
+        merged = {}
+        for state in states:
+            centers = merged.setdefault(cls._get_core(state), {})
+            for item in state:
+                centers.setdefault(item.center(), set()).update(item.lookaheads)
 
-        return new_states
+        return [
+            frozenset(
+                Item(center.production, center.pos, lookaheads=lookaheads)
+                for center, lookaheads in centers.items()
+            )
+            for centers in merged.values()
+        ]
 
     @staticmethod
     def _get_core(state):
         return frozenset(i.center() for i in state)
 
-    @staticmethod
-    def _register(table, key, value):
-        assert (
-            key not in table or table[key] == value
-        ), "Shift-Reduce or Reduce-Reduce conflict!!!"
-        table[key] = value
 
+class __LALRParserConflicts(ConflictsCollector, LALRParser):
+    pass
 
-class __LALRParserConflicts(LALRParser):
-    def __call__(self, tokens, return_actions=False):
-        raise NotImplementedError()
-
-    @staticmethod
-    def _register(table, key, value):
-        if key in table and value not in table[key]:
-            table[key].append(value)
-        else:
-            table[key] = [value]
 
-
-@lru_cache
-def __build_lalr_info(grammar):
-    parser_conflicts = __LALRParserConflicts(grammar)
-    automaton = build_lr1_automaton(grammar.get_augmented_grammar(True))
+@artifact("lalr_info")
+def __build_lalr_info(analysis):
+    parser_conflicts = __LALRParserConflicts(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr1_automaton,
+    )
     return shift_reduce_info(
-        automaton,
+        analysis.lr1_automaton,
         parser_conflicts.action,
         parser_conflicts.goto,
         __LALRParserConflicts.SHIFT,
@@ -120,46 +131,73 @@ def __build_lalr_info(grammar):
     )
 
 
-@lru_cache
-def is_lalr_grammar(grammar):
-    parser_info = __build_lalr_info(grammar)
+@cached(canonical=True)
+def is_lalr_grammar(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lalr_info
     return not any(len(v) > 1 for v in parser_info.action_table.values())
 
 
-def build_lalr_tables(grammar):
-    parser_info = __build_lalr_info(grammar)
+@cached(canonical=True, augmented=get_augmented, weigher=table_weight)
+def build_lalr_tables(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lalr_info
     return parser_info.action_table, parser_info.goto_table
 
 
-@lru_cache
-def build_conflict_str(grammar):
-    parser_info = __build_lalr_info(grammar)
+@cached(canonical=True)
+def build_conflict_str(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).lalr_info
     return __build_conflict_str(
         parser_info.action_table,
         parser_info.goto_table,
-        grammar.terminals,
+        grammar.terminals + [grammar.eof],
+        parser_info.shift_act,
+        parser_info.reduce_act,
+        time_budget,
+    )
+
+
+@cached(canonical=True, weigher=table_weight)
+def build_conflict_strs(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).lalr_info
+    return __build_conflict_strs(
+        parser_info.action_table,
+        parser_info.goto_table,
+        grammar.terminals + [grammar.eof],
         parser_info.shift_act,
         parser_info.reduce_act,
+        time_budget,
     )
 
 
-@lru_cache
-def build_automaton(grammar):
-    parser_info = __build_lalr_info(grammar)
+@cached(weigher=graph_weight)
+def build_automaton(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lalr_info
     return parser_info.automaton.graph()
 
 
 def get_derivation_tree_builder(grammar):
-    parser = __build_lalr_parser(grammar)
+    """
+    Derivation tree builder that reparses incrementally from its previous
+    input. It keeps that input, so every caller needs a builder of its own.
+    """
+    parser = IncrementalParser(get_analysis(grammar).lalr_parser)
 
     def tree_builder(tokens):
-        parse = parser(tokens)
-        right_parse = reversed(parse)
+        parser.update([Token(t.name, t) for t in tokens])
+        right_parse = reversed(parser.right_parse())
         return build_derivation_tree(right_parse, is_right_parse=True)
 
     return tree_builder
 
 
-@lru_cache
-def __build_lalr_parser(grammar):
-    return LALRParser(grammar)
+@artifact("lalr_parser")
+def __build_lalr_parser(analysis):
+    return LALRParser(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr1_automaton,
+    )
@@ -1,62 +1,103 @@
-from functools import lru_cache
 from pycmp.grammar import Grammar
-from pycmp.parsing import build_ll_table as __build_ll_table
 from pycmp.parsing import build_ll_parser
-from grammar_analyzer.basic_analyzer import compute_firsts, compute_follows
-from grammar_analyzer.common import build_derivation_tree
-
-
-@lru_cache
+from pycmp.llk import build_llk_table as __build_llk_table
+from grammar_analyzer.cache import cached, table_weight, grammar_weight
+from grammar_analyzer.analysis import get_analysis
+from grammar_analyzer.common import (
+    CONFLICT_SEARCH_TIME_BUDGET,
+    StackInterner,
+    build_derivation_tree,
+    search_conflicts,
+)
+
+
+@cached(canonical=True)
 def is_ll_grammar(grammar):
     table = build_ll_table(grammar)
     return not any(len(v) > 1 for v in table.values())
 
 
-@lru_cache
+@cached(canonical=True, weigher=table_weight)
 def build_ll_table(grammar):
-    firsts = compute_firsts(grammar)
-    follows = compute_follows(grammar)
-    return __build_ll_table(grammar, firsts, follows)
+    return get_analysis(grammar).ll_table
+
+
+@cached
+def is_llk_grammar(grammar, k):
+    return build_llk_table(grammar, k).is_llk
+
+
+@cached(weigher=grammar_weight)
+def build_llk_table(grammar, k):
+    return __build_llk_table(grammar, max_k=k)
+
+
+@cached(canonical=True)
+def build_conflict_str(grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET):
+    """
+    Shortest input prefix that drives the LL(1) parser into a conflicting
+    table entry, or None if there is none (or the time budget runs out).
+    """
+    conflicts = __search_conflicts(grammar, time_budget, first_only=True)
+    return next(iter(conflicts.values()), None)
+
+
+@cached(canonical=True, weigher=table_weight)
+def build_conflict_strs(grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET):
+    """
+    Map every reachable conflicting entry `(nonterminal, terminal)` of the
+    LL(1) table to the shortest prefix that reaches it.
+    """
+    return __search_conflicts(grammar, time_budget, first_only=False)
 
 
-@lru_cache
-def build_conflict_str(grammar):
+def __search_conflicts(grammar, time_budget, first_only):
+    # A configuration is (stack, lookahead): `lookahead` is a terminal that
+    # was already appended to the prefix when a prediction was made and is
+    # still waiting to be matched.
     table = build_ll_table(grammar)
-    start, terminals = grammar.start_symbol, grammar.terminals
-    return __build_conflict_str([start], table, terminals, set())
-
-
-def __build_conflict_str(stack, table, terminals, visited):
-    if len(stack) == 0:
-        return None
-
-    top = stack.pop()
-
-    if top.is_terminal:
-        conflict = __build_conflict_str(stack, table, terminals, visited)
-        if conflict is None:
-            return None
-        return [top] + conflict
-
-    for t in terminals:
-        if (top, t) in visited:
-            continue
-        try:
-            production = table[top, t]
-        except KeyError:
-            continue
-        if len(production) > 1:
-            return [t]
-        production = production[0]
-        visited.add((top, t))
-        conflict = __build_conflict_str(
-            stack + list(reversed(production.right)), table, terminals, visited
-        )
-        if conflict is None:
-            continue
-        return conflict
-
-    return None
+    terminals = grammar.terminals + [grammar.eof]
+    stacks = StackInterner()
+
+    def lookaheads(pending):
+        return terminals if pending is None else [pending]
+
+    def conflicts(config):
+        stack, pending = config
+        if stack == stacks.EMPTY:
+            return
+        top = stacks.top(stack)
+        if top.is_terminal:
+            return
+        for t in lookaheads(pending):
+            if len(table.get((top, t), ())) > 1:
+                yield (top, t), (t if pending is None else None)
+
+    def successors(config):
+        stack, pending = config
+        if stack == stacks.EMPTY:
+            return
+        top, rest = stacks.top(stack), stacks.pop(stack)
+
+        if top.is_terminal:
+            if pending is None:
+                yield top, (rest, None)
+            elif pending == top:
+                yield None, (rest, None)
+            return
+
+        # Conflicting entries are followed through every alternative so the
+        # conflicts behind them are found as well
+        for t in lookaheads(pending):
+            for production in table.get((top, t), ()):
+                next_stack = stacks.extend(rest, reversed(production.right))
+                yield (t if pending is None else None), (next_stack, t)
+
+    start = (stacks.push(stacks.EMPTY, grammar.start_symbol), None)
+    targets = {key for key, value in table.items() if len(value) > 1}
+    return search_conflicts(
+        start, successors, conflicts, targets, time_budget, first_only
+    )
 
 
 def get_derivation_tree_builder(grammar):
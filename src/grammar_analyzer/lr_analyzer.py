@@ -1,32 +1,32 @@
-from functools import lru_cache
-from pycmp.parsing import LR1Parser, build_lr1_automaton
+from pycmp.parsing import LR1Parser
 from grammar_analyzer.shift_reduce_analyzer import (
+    ConflictsCollector,
     shift_reduce_info,
     build_conflict_str as __build_conflict_str,
+    build_conflict_strs as __build_conflict_strs,
 )
-from grammar_analyzer.common import build_derivation_tree
+from grammar_analyzer.cache import cached, graph_weight, table_weight
+from grammar_analyzer.analysis import artifact, get_analysis, get_augmented
+from grammar_analyzer.common import CONFLICT_SEARCH_TIME_BUDGET, build_derivation_tree
+from pycmp.incremental import IncrementalParser
+from pycmp.token import Token
 
 # TODO: Refactor all shift-reduce analyzers to share common code
 
 
-class __LR1ParserConflicts(LR1Parser):
-    def __call__(self, tokens, return_actions=False):
-        raise NotImplementedError()
+class __LR1ParserConflicts(ConflictsCollector, LR1Parser):
+    pass
 
-    @staticmethod
-    def _register(table, key, value):
-        if key in table and value not in table[key]:
-            table[key].append(value)
-        else:
-            table[key] = [value]
 
-
-@lru_cache
-def __build_lr_info(grammar):
-    parser_conflicts = __LR1ParserConflicts(grammar)
-    automaton = build_lr1_automaton(grammar.get_augmented_grammar(True))
+@artifact("lr_info")
+def __build_lr_info(analysis):
+    parser_conflicts = __LR1ParserConflicts(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr1_automaton,
+    )
     return shift_reduce_info(
-        automaton,
+        analysis.lr1_automaton,
         parser_conflicts.action,
         parser_conflicts.goto,
         __LR1ParserConflicts.SHIFT,
@@ -34,46 +34,73 @@ def __build_lr_info(grammar):
     )
 
 
-@lru_cache
-def is_lr_grammar(grammar):
-    parser_info = __build_lr_info(grammar)
+@cached(canonical=True)
+def is_lr_grammar(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lr_info
     return not any(len(v) > 1 for v in parser_info.action_table.values())
 
 
-def build_lr_tables(grammar):
-    parser_info = __build_lr_info(grammar)
+@cached(canonical=True, augmented=get_augmented, weigher=table_weight)
+def build_lr_tables(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lr_info
     return parser_info.action_table, parser_info.goto_table
 
 
-@lru_cache
-def build_conflict_str(grammar):
-    parser_info = __build_lr_info(grammar)
+@cached(canonical=True)
+def build_conflict_str(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).lr_info
     return __build_conflict_str(
         parser_info.action_table,
         parser_info.goto_table,
-        grammar.terminals,
+        grammar.terminals + [grammar.eof],
+        parser_info.shift_act,
+        parser_info.reduce_act,
+        time_budget,
+    )
+
+
+@cached(canonical=True, weigher=table_weight)
+def build_conflict_strs(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).lr_info
+    return __build_conflict_strs(
+        parser_info.action_table,
+        parser_info.goto_table,
+        grammar.terminals + [grammar.eof],
         parser_info.shift_act,
         parser_info.reduce_act,
+        time_budget,
     )
 
 
-@lru_cache
-def build_automaton(grammar):
-    parser_info = __build_lr_info(grammar)
+@cached(weigher=graph_weight)
+def build_automaton(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).lr_info
     return parser_info.automaton.graph()
 
 
 def get_derivation_tree_builder(grammar):
-    parser = __build_lr_parser(grammar)
+    """
+    Derivation tree builder that reparses incrementally from its previous
+    input. It keeps that input, so every caller needs a builder of its own.
+    """
+    parser = IncrementalParser(get_analysis(grammar).lr_parser)
 
     def tree_builder(tokens):
-        parse = parser(tokens)
-        right_parse = reversed(parse)
+        parser.update([Token(t.name, t) for t in tokens])
+        right_parse = reversed(parser.right_parse())
         return build_derivation_tree(right_parse, is_right_parse=True)
 
     return tree_builder
 
 
-@lru_cache
-def __build_lr_parser(grammar):
-    return LR1Parser(grammar)
+@artifact("lr_parser")
+def __build_lr_parser(analysis):
+    return LR1Parser(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr1_automaton,
+    )
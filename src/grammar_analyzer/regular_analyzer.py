@@ -1,5 +1,5 @@
 from pycmp.grammar import Grammar
-from pycmp.automata import NFA, DFA, nfa_to_dfa
+from pycmp.automata import NFA, DFA, CompiledDFA, nfa_to_dfa
 from pycmp.utils import pprint
 
 
@@ -37,6 +37,12 @@ def grammar_to_automaton(grammar):
     return NFA(states, {final}, transitions)
 
 
+def build_recognizer(grammar):
+    """Matcher of the sentences of a regular grammar, given as sequences of
+    terminal names."""
+    return CompiledDFA(nfa_to_dfa(grammar_to_automaton(grammar)))
+
+
 def automaton_to_regex(automaton):
     automaton = nfa_to_dfa(automaton)
 
@@ -1,5 +1,10 @@
 from functools import namedtuple
 from pycmp.utils import pprint
+from grammar_analyzer.common import (
+    CONFLICT_SEARCH_TIME_BUDGET,
+    StackInterner,
+    search_conflicts,
+)
 
 shift_reduce_info = namedtuple(
     "parser_info",
@@ -7,58 +12,110 @@ shift_reduce_info = namedtuple(
 )
 
 
-def build_conflict_str(action, goto, terminals, shift_act, reduce_act):
-    return __build_conflict_str(
-        [0], set(), action, goto, terminals, shift_act, reduce_act
+class ConflictsCollector:
+    """
+    Mixin for `ShiftReduceParser` subclasses that keeps every colliding
+    entry in a list instead of failing, after giving the grammar's
+    precedence declarations a chance to settle the collision.
+    """
+
+    def __call__(self, tokens, return_actions=False):
+        raise NotImplementedError()
+
+    def _register(self, table, key, value):
+        if table is self.action:
+            if key in self._nonassoc:
+                return
+            if key in table and len(table[key]) == 1 and value not in table[key]:
+                entries = self._resolve(key, table[key][0], value)
+                if not entries:
+                    del table[key]
+                    self._nonassoc.add(key)
+                    return
+                if len(entries) == 1:
+                    table[key] = entries
+                    return
+
+        if key not in table:
+            table[key] = [value]
+        elif value not in table[key]:
+            table[key].append(value)
+
+
+def build_conflict_str(
+    action,
+    goto,
+    terminals,
+    shift_act,
+    reduce_act,
+    time_budget=CONFLICT_SEARCH_TIME_BUDGET,
+):
+    """
+    Shortest input prefix that drives the shift-reduce parser into a
+    conflicting ACTION entry, or None if there is none (or the time budget
+    runs out). `terminals` should include the eof symbol.
+    """
+    conflicts = __search_conflicts(
+        action, goto, terminals, shift_act, reduce_act, time_budget, True
+    )
+    return next(iter(conflicts.values()), None)
+
+
+def build_conflict_strs(
+    action,
+    goto,
+    terminals,
+    shift_act,
+    reduce_act,
+    time_budget=CONFLICT_SEARCH_TIME_BUDGET,
+):
+    """
+    Map every reachable conflicting ACTION entry `(state, terminal)` to the
+    shortest prefix that reaches it.
+    """
+    return __search_conflicts(
+        action, goto, terminals, shift_act, reduce_act, time_budget, False
     )
 
 
-def __build_conflict_str(
-    stack, visited, action_table, goto_table, terminals, shift_act, reduce_act
+def __search_conflicts(
+    action_table, goto_table, terminals, shift_act, reduce_act, time_budget, first_only
 ):
-    # print(stack)
-    state = stack[-1]
-
-    for t in terminals:
-        if (state, t) in visited:
-            continue
-
-        try:
-            value = action_table[state, t]
-            # print(f"({state}, {t}) --> {value}")
-        except KeyError:
-            continue
-
-        if len(value) > 1:
-            return [t]
-
-        action, tag = value[0]
-
-        if action == shift_act:
-            visited.add((state, t))
-            conflict = __build_conflict_str(
-                stack + [tag],
-                visited,
-                action_table,
-                goto_table,
-                terminals,
-                shift_act,
-                reduce_act,
-            )
-            if conflict is None:
-                continue
-            return [t] + conflict
-
-        if action == reduce_act:
-            temp_stack = stack[: -len(tag.right)]
-            return __build_conflict_str(
-                temp_stack + [goto_table[temp_stack[-1], tag.left][0]],
-                visited,
-                action_table,
-                goto_table,
-                terminals,
-                shift_act,
-                reduce_act,
-            )
-
-    return None
+    # A configuration is (state stack, lookahead): `lookahead` is a terminal
+    # already appended to the prefix that reductions are still waiting on.
+    stacks = StackInterner()
+
+    def lookaheads(pending):
+        return terminals if pending is None else [pending]
+
+    def conflicts(config):
+        stack, pending = config
+        state = stacks.top(stack)
+        for t in lookaheads(pending):
+            if len(action_table.get((state, t), ())) > 1:
+                yield (state, t), (t if pending is None else None)
+
+    def successors(config):
+        stack, pending = config
+        state = stacks.top(stack)
+
+        # Conflicting entries are followed through every alternative so the
+        # conflicts behind them are found as well
+        for t in lookaheads(pending):
+            read = t if pending is None else None
+
+            for action, tag in action_table.get((state, t), ()):
+                if action == shift_act:
+                    yield read, (stacks.push(stack, tag), None)
+                elif action == reduce_act:
+                    rest = stacks.pop(stack, len(tag.right))
+                    if rest == stacks.EMPTY:
+                        continue
+                    dest = goto_table[stacks.top(rest), tag.left][0]
+                    yield read, (stacks.push(rest, dest), t)
+
+    start = (stacks.push(stacks.EMPTY, 0), None)
+    targets = {key for key, value in action_table.items() if len(value) > 1}
+    return search_conflicts(
+        start, successors, conflicts, targets, time_budget, first_only
+    )
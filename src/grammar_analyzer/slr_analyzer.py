@@ -1,32 +1,33 @@
-from functools import lru_cache
-from pycmp.parsing import SLR1Parser, build_lr0_automaton
+from pycmp.parsing import SLR1Parser
 from grammar_analyzer.shift_reduce_analyzer import (
+    ConflictsCollector,
     shift_reduce_info,
     build_conflict_str as __build_conflict_str,
+    build_conflict_strs as __build_conflict_strs,
 )
-from grammar_analyzer.common import build_derivation_tree
+from grammar_analyzer.cache import cached, graph_weight, table_weight
+from grammar_analyzer.analysis import artifact, get_analysis, get_augmented
+from grammar_analyzer.common import CONFLICT_SEARCH_TIME_BUDGET, build_derivation_tree
+from pycmp.incremental import IncrementalParser
+from pycmp.token import Token
 
 # TODO: Refactor all shift-reduce analyzers to share common code
 
 
-class __SLR1ParserConflicts(SLR1Parser):
-    def __call__(self, tokens, return_actions=False):
-        raise NotImplementedError()
+class __SLR1ParserConflicts(ConflictsCollector, SLR1Parser):
+    pass
 
-    @staticmethod
-    def _register(table, key, value):
-        if key in table and value not in table[key]:
-            table[key].append(value)
-        else:
-            table[key] = [value]
 
-
-@lru_cache
-def __build_slr_info(grammar):
-    parser_conflicts = __SLR1ParserConflicts(grammar)
-    automaton = build_lr0_automaton(grammar.get_augmented_grammar(True))
+@artifact("slr_info")
+def __build_slr_info(analysis):
+    parser_conflicts = __SLR1ParserConflicts(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr0_dfa,
+        follows=analysis.follows,
+    )
     return shift_reduce_info(
-        automaton,
+        analysis.lr0_automaton,
         parser_conflicts.action,
         parser_conflicts.goto,
         __SLR1ParserConflicts.SHIFT,
@@ -34,47 +35,76 @@ def __build_slr_info(grammar):
     )
 
 
-@lru_cache
-def is_slr_grammar(grammar):
-    parser_info = __build_slr_info(grammar)
+@cached(canonical=True)
+def is_slr_grammar(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).slr_info
     return not any(len(v) > 1 for v in parser_info.action_table.values())
 
 
-def build_slr_tables(grammar):
-    parser_info = __build_slr_info(grammar)
+@cached(canonical=True, augmented=get_augmented, weigher=table_weight)
+def build_slr_tables(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).slr_info
     return parser_info.action_table, parser_info.goto_table
 
 
-@lru_cache
-def build_conflict_str(grammar):
-    parser_info = __build_slr_info(grammar)
+@cached(canonical=True)
+def build_conflict_str(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).slr_info
     return __build_conflict_str(
         parser_info.action_table,
         parser_info.goto_table,
-        grammar.terminals,
+        grammar.terminals + [grammar.eof],
+        parser_info.shift_act,
+        parser_info.reduce_act,
+        time_budget,
+    )
+
+
+@cached(canonical=True, weigher=table_weight)
+def build_conflict_strs(
+    grammar, time_budget=CONFLICT_SEARCH_TIME_BUDGET, *, budget=None
+):
+    parser_info = get_analysis(grammar, budget=budget).slr_info
+    return __build_conflict_strs(
+        parser_info.action_table,
+        parser_info.goto_table,
+        grammar.terminals + [grammar.eof],
         parser_info.shift_act,
         parser_info.reduce_act,
+        time_budget,
     )
 
 
-@lru_cache
-def build_automaton(grammar):
-    parser_info = __build_slr_info(grammar)
+@cached(weigher=graph_weight)
+def build_automaton(grammar, *, budget=None):
+    parser_info = get_analysis(grammar, budget=budget).slr_info
     return parser_info.automaton.graph()
 
 
 def get_derivation_tree_builder(grammar):
-    parser = __build_slr_parser(grammar)
+    """
+    Derivation tree builder that reparses incrementally from its previous
+    input. It keeps that input, so every caller needs a builder of its own.
+    """
+    parser = IncrementalParser(get_analysis(grammar).slr_parser)
+    eof = Token("$", grammar.eof)
 
     def tree_builder(tokens):
-        parse = parser([grammar[t] for t in tokens] + [grammar.eof])
-        right_parse = tuple(reversed(parse))
+        parser.update([Token(t, grammar[t]) for t in tokens] + [eof])
+        right_parse = tuple(reversed(parser.right_parse()))
         print(right_parse)
         return build_derivation_tree(right_parse, is_right_parse=True)
 
     return tree_builder
 
 
-@lru_cache
-def __build_slr_parser(grammar):
-    return SLR1Parser(grammar)
+@artifact("slr_parser")
+def __build_slr_parser(analysis):
+    return SLR1Parser(
+        analysis.grammar,
+        augmented=analysis.augmented,
+        automaton=analysis.lr0_dfa,
+        follows=analysis.follows,
+    )
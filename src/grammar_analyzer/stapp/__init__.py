@@ -1,5 +1,6 @@
 import streamlit as st
-from grammar_analyzer.interpreter import eval_input
+from grammar_analyzer.interpreter import InputEvaluator
+from grammar_analyzer.stapp.session import get_session_state
 from grammar_analyzer.stapp.basic_analysis import run_basic_analysis
 from grammar_analyzer.stapp.ll_analysis import run_ll_analysis
 from grammar_analyzer.stapp.slr_analysis import run_slr_analysis
@@ -16,8 +17,13 @@ def input_grammar():
         label="Please input your grammar here",
         value="s -> if x then s\ns -> if x then s else s\ns -> num\nx -> num",
     )
+    # Every session keeps its own evaluator, so reruns only reparse what
+    # changed; frozen grammars share cached analyses
     try:
-        return eval_input(input_text)
+        state = get_session_state()
+        if "input_evaluator" not in state:
+            state["input_evaluator"] = InputEvaluator()
+        return state["input_evaluator"](input_text).freeze()
     except:
         return None
 
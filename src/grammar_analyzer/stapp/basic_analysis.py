@@ -1,5 +1,5 @@
 import streamlit as st
-from grammar_analyzer.basic_analyzer import compute_firsts, compute_follows
+from grammar_analyzer.analysis import get_analysis
 from pycmp.utils import ContainerSet
 
 # pylint: disable=no-value-for-parameter
@@ -9,9 +9,12 @@ def run_basic_analysis(grammar):
     st.write("## Basic analysis")
     st.write("")
 
-    firsts = compute_firsts(grammar)
-    st.write("__Firsts:__", {str(k): str(v) for k, v in firsts.items()})
+    analysis = get_analysis(grammar)
+    start = analysis.augmented.start_symbol
 
-    follows = compute_firsts(grammar)
-    st.write("__Follows:__", {str(k): str(v) for k, v in follows.items()})
+    firsts = analysis.firsts
+    st.write("__Firsts:__", {str(k): str(v) for k, v in firsts.items() if k != start})
+
+    follows = analysis.follows
+    st.write("__Follows:__", {str(k): str(v) for k, v in follows.items() if k != start})
 
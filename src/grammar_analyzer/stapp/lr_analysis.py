@@ -24,6 +24,9 @@ def run_lr_analysis(grammar):
 
     if not is_lr:
         conflict = build_conflict_str(grammar)
+        if conflict is None:
+            st.write("No string leading to a conflict was found in time.")
+            return
         conflict = " ".join(str(t) for t in conflict)
         st.write(
             "A possible string that leads to a conflict when trying to parse it is:"
@@ -3,6 +3,7 @@ from grammar_analyzer.regular_analyzer import (
     is_regular_grammar,
     grammar_to_automaton,
     automaton_to_regex,
+    build_recognizer,
 )
 
 # pylint: disable=no-value-for-parameter
@@ -25,3 +26,10 @@ def run_regular_analysis(grammar):
     st.write(f"_A regular expression to represent your grammar could be:_")
     st.write(f"> {regex}")
     st.write("where '@' doesn't match any symbol in your vocabulary")
+
+    recognizer = build_recognizer(grammar)
+    string = st.text_input("Please enter a string to recognize").split()
+    if not string:
+        return
+    belongs = recognizer.match(string)
+    st.write(f"__The string is {'' if belongs else 'not '}in your language__")
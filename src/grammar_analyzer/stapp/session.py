@@ -0,0 +1,20 @@
+import weakref
+from streamlit.ReportThread import get_report_ctx
+
+_session_states = weakref.WeakKeyDictionary()
+_bare_state = {}
+
+
+def get_session_state():
+    """
+    Dict kept across the reruns of one browser session.
+
+    Streamlit 0.54 has no `st.session_state`. The uploaded file manager in
+    the report context belongs to one session and outlives its reruns, so it
+    keys the state, which goes away with the session. Run bare, without
+    `streamlit run`, there is no report context and a single state.
+    """
+    ctx = get_report_ctx()
+    if ctx is None:
+        return _bare_state
+    return _session_states.setdefault(ctx.uploaded_file_mgr, {})
@@ -1,5 +1,6 @@
 import streamlit as st
 from pandas import DataFrame
+from grammar_analyzer.stapp.session import get_session_state
 from grammar_analyzer.slr_analyzer import (
     is_slr_grammar,
     build_conflict_str,
@@ -27,7 +28,13 @@ def run_slr_analysis(grammar):
     st.graphviz_chart(str(automaton))
 
     if is_slr:
-        tree_builder = get_derivation_tree_builder(grammar)
+        # Kept by the session, so new strings only reparse what changed
+        state = get_session_state()
+        builder = state.get("slr_tree_builder")
+        if builder is None or builder[0] is not grammar:
+            builder = (grammar, get_derivation_tree_builder(grammar))
+            state["slr_tree_builder"] = builder
+        tree_builder = builder[1]
         string = st.text_input("Please enter a string to parse").split()
         if not string:
             return
@@ -36,6 +43,9 @@ def run_slr_analysis(grammar):
 
     else:
         conflict = build_conflict_str(grammar)
+        if conflict is None:
+            st.write("No string leading to a conflict was found in time.")
+            return
         conflict = " ".join(str(t) for t in conflict)
         st.write(
             "A possible string that leads to a conflict when trying to parse it is:"
@@ -1,7 +1,35 @@
 class Node:
+    children = ()
+
     def evaluate(self):
         raise NotImplementedError()
 
+    def fold(self, combine):
+        """
+        Fold the tree in postorder: `combine(node, *values)` gets the values
+        of the children of `node`. Nodes are kept on a stack of their own, so
+        deep trees do not hit the recursion limit.
+        """
+        values = []
+        pending = [(self, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if expanded or not node.children:
+                count = len(node.children)
+                arguments = values[len(values) - count :]
+                del values[len(values) - count :]
+                values.append(combine(node, *arguments))
+            else:
+                pending.append((node, True))
+                pending.extend((child, False) for child in reversed(node.children))
+        return values[0]
+
+
+def _evaluate(node, *values):
+    if node.children:
+        return node.operate(*values)
+    return node.evaluate()
+
 
 class AtomicNode(Node):
     def __init__(self, lex):
@@ -12,9 +40,12 @@ class UnaryNode(Node):
     def __init__(self, node):
         self.node = node
 
+    @property
+    def children(self):
+        return (self.node,)
+
     def evaluate(self):
-        value = self.node.evaluate()
-        return self.operate(value)
+        return self.fold(_evaluate)
 
     @staticmethod
     def operate(value):
@@ -26,10 +57,12 @@ class BinaryNode(Node):
         self.left = left
         self.right = right
 
+    @property
+    def children(self):
+        return (self.left, self.right)
+
     def evaluate(self):
-        lvalue = self.left.evaluate()
-        rvalue = self.right.evaluate()
-        return self.operate(lvalue, rvalue)
+        return self.fold(_evaluate)
 
     @staticmethod
     def operate(lvalue, rvalue):
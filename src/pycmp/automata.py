@@ -1,5 +1,8 @@
 import pydot
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pycmp.utils import ContainerSet, DisjointSet
+from pycmp.budget import STATE_BYTES, ITEM_BYTES
 
 
 class State:
@@ -42,42 +45,93 @@ class State:
         return self
 
     def recognize(self, string):
-        states = self.epsilon_closure
+        states, moves, closures = self.masks()
+        current = closures[0]
         for symbol in string:
-            states = self.move_by_state(symbol, *states)
-            states = self.epsilon_closure_by_state(*states)
-        return any(s.final for s in states)
-
-    def to_deterministic(self, formatter=lambda x: str(x)):
-        closure = self.epsilon_closure
-        start = State(tuple(closure), any(s.final for s in closure), formatter)
-
-        closures = [closure]
-        states = [start]
-        pending = [start]
-
-        while pending:
-            state = pending.pop()
-            symbols = {symbol for s in state.state for symbol in s.transitions}
-
-            for symbol in symbols:
-                move = self.move_by_state(symbol, *state.state)
-                closure = self.epsilon_closure_by_state(*move)
-
-                if closure not in closures:
-                    new_state = State(
-                        tuple(closure), any(s.final for s in closure), formatter
-                    )
-                    closures.append(closure)
-                    states.append(new_state)
-                    pending.append(new_state)
-                else:
-                    index = closures.index(closure)
-                    new_state = states[index]
-
-                state.add_transition(symbol, new_state)
-
-        return start
+            target = 0
+            for n in _bits(current):
+                target |= moves[n].get(symbol, 0)
+            current = _close(target, closures)
+        return any(states[n].final for n in _bits(current))
+
+    def to_deterministic(self, formatter=lambda x: str(x), budget=None):
+        """Subset construction. Every new state is charged to `budget`, if given."""
+        if budget is not None:
+            budget.track("subset construction")
+
+        states, moves, closures = self.masks()
+        subsets, rows = subset_construction(1, moves, closures, budget)
+
+        dfa = []
+        for subset in subsets:
+            closure = tuple(states[n] for n in _bits(subset))
+            dfa.append(State(closure, any(s.final for s in closure), formatter))
+        for state, row in zip(dfa, rows):
+            for symbol, destination in row.items():
+                state.add_transition(symbol, dfa[destination])
+
+        return dfa[0]
+
+    def masks(self):
+        """
+        The states reachable from this one, numbered from 0 in the order
+        `reachable` returns them, along with bitmasks of their transitions by
+        symbol and of their epsilon closures. The graph may still change, so
+        they are computed on every call.
+        """
+        states = self.reachable()
+        ids = {id(state): n for n, state in enumerate(states)}
+        moves, epsilon = [], []
+        for state in states:
+            row = {}
+            for symbol, destinations in state.transitions.items():
+                row[symbol] = _mask(ids[id(s)] for s in destinations)
+            moves.append(row)
+            epsilon.append(_mask(ids[id(s)] for s in state.epsilon_transitions))
+        return states, moves, epsilon_closures(epsilon)
+
+    def minimize(self, key=lambda state: state.final, formatter=lambda x: str(x)):
+        """
+        Minimal equivalent of this deterministic automaton, by Hopcroft's
+        algorithm. States are merged only when `key` gives them the same
+        value; the merged state takes its `final` and `tag` from them.
+        """
+        states = self.reachable()
+        ids = {id(state): n for n, state in enumerate(states)}
+        transitions = [
+            {symbol: ids[id(state.get(symbol))] for symbol in state.transitions}
+            for state in states
+        ]
+        blocks = hopcroft_minimization(transitions, [key(state) for state in states])
+
+        representatives = {}
+        for n, block in enumerate(blocks):
+            representatives.setdefault(block, n)
+
+        minimized = []
+        for block, n in representatives.items():
+            minimized.append(State(block, states[n].final, formatter))
+            minimized[block].tag = states[n].tag
+        for block, n in representatives.items():
+            for symbol, destination in transitions[n].items():
+                minimized[block].add_transition(symbol, minimized[blocks[destination]])
+
+        return minimized[blocks[0]]
+
+    def reachable(self):
+        """The states reachable from this one, itself first."""
+        states, visited = [self], {id(self)}
+        for state in states:
+            for destinations in state.transitions.values():
+                for node in destinations:
+                    if id(node) not in visited:
+                        visited.add(id(node))
+                        states.append(node)
+            for node in state.epsilon_transitions:
+                if id(node) not in visited:
+                    visited.add(id(node))
+                    states.append(node)
+        return states
 
     @staticmethod
     def from_nfa(nfa, get_states=False):
@@ -102,15 +156,13 @@ class State:
 
     @staticmethod
     def epsilon_closure_by_state(*states):
-        closure = {state for state in states}
-
-        l = 0
-        while l != len(closure):
-            l = len(closure)
-            tmp = [s for s in closure]
-            for s in tmp:
-                for epsilon_state in s.epsilon_transitions:
+        closure = set(states)
+        pending = list(states)
+        while pending:
+            for epsilon_state in pending.pop().epsilon_transitions:
+                if epsilon_state not in closure:
                     closure.add(epsilon_state)
+                    pending.append(epsilon_state)
         return closure
 
     @property
@@ -225,6 +277,15 @@ class NFA:
             self.vocabulary.add(symbol)
 
         self.vocabulary.discard("")
+        self._closures = None
+
+    @property
+    def closures(self):
+        """Epsilon closure of every state as a bitmask, computed once."""
+        if self._closures is None:
+            epsilon = [_mask(self.epsilon_transitions(s)) for s in range(self.states)]
+            self._closures = epsilon_closures(epsilon)
+        return self._closures
 
     def epsilon_transitions(self, state):
         assert state in self.transitions, "Invalid state" + str(state)
@@ -292,6 +353,74 @@ class DFA(NFA):
         return False
 
 
+class CompiledDFA:
+    """
+    A DFA as a dense transition table. Every symbol of the vocabulary is
+    mapped to a column, plus one last column for every other symbol, and
+    states are kept as the offsets of their rows: `table[row + column]` is
+    the row of the destination. Missing transitions lead to a dead state,
+    numbered after the others, that loops on every column.
+
+    Matching keeps its cursor in local variables, so one compiled DFA can be
+    shared between threads.
+    """
+
+    def __init__(self, automaton):
+        symbols = sorted(automaton.vocabulary, key=str)
+        self.columns = {symbol: n for n, symbol in enumerate(symbols)}
+        self.width = width = len(symbols) + 1
+        self.dead = dead = automaton.states
+        self.start = automaton.start
+
+        self.table = table = array("l", [dead * width]) * ((dead + 1) * width)
+        for (origin, symbol), destinations in automaton.map.items():
+            table[origin * width + self.columns[symbol]] = destinations[0] * width
+
+        accepting = bytearray(automaton.states + 1)
+        for state in automaton.finals:
+            accepting[state] = 1
+        self.accepting = bytes(accepting)
+
+        # Strings over one-character symbols are mapped to columns in one
+        # pass by str.translate
+        self.translation = None
+        if width <= 256 and all(isinstance(s, str) and len(s) == 1 for s in symbols):
+            self.translation = _Translation(
+                {ord(symbol): chr(n) for symbol, n in self.columns.items()}
+            )
+            self.translation.other = chr(width - 1)
+
+    def encode(self, string):
+        """The columns of the symbols of `string`."""
+        if self.translation is not None and isinstance(string, str):
+            return string.translate(self.translation).encode("latin-1")
+        other = self.width - 1
+        return [self.columns.get(symbol, other) for symbol in string]
+
+    def match(self, string):
+        table, width = self.table, self.width
+        dead = self.dead * width
+        row = self.start * width
+        for column in self.encode(string):
+            row = table[row + column]
+            if row == dead:
+                return False
+        return bool(self.accepting[row // width])
+
+    def match_many(self, strings, workers=None):
+        """Match every string of `strings`, on a pool of `workers` threads
+        if given."""
+        if workers is None:
+            return [self.match(string) for string in strings]
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(self.match, strings))
+
+
+class _Translation(dict):
+    def __missing__(self, key):
+        return self.other
+
+
 def move(automaton, states, symbol):
     moves = set()
     for state in states:
@@ -303,52 +432,155 @@ def move(automaton, states, symbol):
 
 
 def epsilon_closure(automaton, states):
-    pending = [s for s in states]
-    closure = {s for s in states}
+    return ContainerSet(*_bits(_close(_mask(states), automaton.closures)))
+
+
+def epsilon_closures(epsilon):
+    """
+    Epsilon closure of every state as a bitmask, where `epsilon[s]` is the
+    bitmask of the epsilon transitions of state `s`.
+
+    The strongly connected components of the epsilon graph (found with an
+    iterative Tarjan) share a closure: their members and the closures of
+    the components they reach, which Tarjan completes first. Every epsilon
+    transition is followed once.
+    """
+    n = len(epsilon)
+    index, low = [-1] * n, [0] * n
+    on_stack = [False] * n
+    stack, closures = [], [0] * n
+    counter = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, _bits(epsilon[root]))]
+
+        while work:
+            state, successors = work[-1]
+            for successor in successors:
+                if index[successor] < 0:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    work.append((successor, _bits(epsilon[successor])))
+                    break
+                if on_stack[successor]:
+                    low[state] = min(low[state], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[state])
+                if low[state] != index[state]:
+                    continue
+
+                component, members, reached = [], 0, 0
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    members |= 1 << member
+                    reached |= epsilon[member]
+                    if member == state:
+                        break
+                closure = _close(reached & ~members, closures) | members
+                for member in component:
+                    closures[member] = closure
+
+    return closures
+
+
+def subset_construction(start, moves, closures, budget=None):
+    """
+    Subset construction over NFA states numbered from 0, with sets of
+    states as int bitmasks. `moves[s]` maps the symbols leaving state `s` to
+    the bitmask of their destinations and `closures[s]` is its epsilon
+    closure (see `epsilon_closures`). Sets are looked up by value, and only
+    the symbols leaving a set are followed.
+
+    Returns the closed sets reached from `start`, its own first, and for
+    each of them a dict from symbols to the index of the destination set.
+    Every set after the first is charged to `budget`, if given.
+    """
+    start = _close(start, closures)
+    subsets, ids, rows = [start], {start: 0}, []
+
+    for subset in subsets:
+        targets = {}
+        pending = subset
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            for symbol, destinations in moves[low.bit_length() - 1].items():
+                targets[symbol] = targets.get(symbol, 0) | destinations
+
+        row = {}
+        for symbol, destinations in targets.items():
+            closure = _close(destinations, closures)
+            try:
+                row[symbol] = ids[closure]
+            except KeyError:
+                row[symbol] = ids[closure] = len(subsets)
+                subsets.append(closure)
+                if budget is not None:
+                    size = bin(closure).count("1")
+                    budget.charge(1, size, STATE_BYTES + ITEM_BYTES * size)
+        rows.append(row)
 
-    while pending:
-        state = pending.pop()
-        dest_states = automaton.epsilon_transitions(state)
-        closure.update({s for s in dest_states})
-        pending.extend(dest_states)
+    return subsets, rows
 
-    return ContainerSet(*closure)
 
+def _close(mask, closures):
+    closure = 0
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        closure |= closures[low.bit_length() - 1]
+    return closure
 
-def nfa_to_dfa(automaton):
-    transitions = {}
 
-    start = epsilon_closure(automaton, [automaton.start])
-    start.id = 0
-    start.is_final = any(s in automaton.finals for s in start)
-    states = [start]
+def _mask(states):
+    mask = 0
+    for state in states:
+        mask |= 1 << state
+    return mask
 
-    pending = [start]
-    while pending:
-        state = pending.pop()
-
-        for symbol in automaton.vocabulary:
-            next_state = epsilon_closure(automaton, move(automaton, state, symbol))
-            next_state.id = len(states)
-            next_state.is_final = any(s in automaton.finals for s in next_state)
-            if not next_state:
-                continue
-
-            if next_state not in states:
-                pending.append(next_state)
-                states.append(next_state)
-            else:
-                next_state.id = states.index(next_state)
 
-            try:
-                transitions[state.id, symbol]
-                assert False, "Invalid DFA!!!"
-            except KeyError:
-                transitions[state.id, symbol] = next_state.id
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        yield low.bit_length() - 1
+
+
+def nfa_to_dfa(automaton, budget=None):
+    """Subset construction. Every new state is charged to `budget`, if given."""
+    if budget is not None:
+        budget.track("nfa to dfa")
+
+    moves = [{} for _ in range(automaton.states)]
+    for (origin, symbol), destinations in automaton.map.items():
+        if symbol != "":
+            moves[origin][symbol] = _mask(destinations)
 
-    finals = [state.id for state in states if state.is_final]
-    dfa = DFA(len(states), finals, transitions)
-    return dfa
+    subsets, rows = subset_construction(
+        1 << automaton.start, moves, automaton.closures, budget
+    )
+
+    transitions = {
+        (origin, symbol): destination
+        for origin, row in enumerate(rows)
+        for symbol, destination in row.items()
+    }
+    finals = _mask(automaton.finals)
+    finals = [n for n, subset in enumerate(subsets) if subset & finals]
+    return DFA(len(subsets), finals, transitions)
 
 
 def automata_union(a1, a2):
@@ -434,68 +666,144 @@ def automata_closure(a1):
     return NFA(states, finals, transitions, start)
 
 
-def distinguish_states(group, automaton, partition):
-    split = {}
-    vocabulary = tuple(automaton.vocabulary)
+class NFABuilder:
+    """
+    Thompson construction over a single arena of states. Fragments are
+    `(start, final)` pairs into the arena, so combining them only adds the
+    new states and epsilon transitions instead of relocating the operands.
+    """
 
-    for member in group:
-        state = member.value
+    def __init__(self):
+        self.states = 0
+        self.transitions = {}
 
-        transitions = automaton.transitions[state]
-        destinations = [transitions.get(s, [None])[0] for s in vocabulary]
-        key = tuple([d and partition[d].representative for d in destinations])
+    def state(self):
+        self.states += 1
+        return self.states - 1
+
+    def connect(self, origin, symbol, destination):
+        self.transitions.setdefault((origin, symbol), []).append(destination)
+
+    def epsilon(self):
+        state = self.state()
+        return state, state
+
+    def symbol(self, symbol):
+        start, final = self.state(), self.state()
+        self.connect(start, symbol, final)
+        return start, final
+
+    def union(self, left, right):
+        start, final = self.state(), self.state()
+        for fragment_start, fragment_final in (left, right):
+            self.connect(start, "", fragment_start)
+            self.connect(fragment_final, "", final)
+        return start, final
+
+    def concatenation(self, left, right):
+        self.connect(left[1], "", right[0])
+        return left[0], right[1]
+
+    def closure(self, fragment):
+        start, final = self.state(), self.state()
+        self.connect(start, "", fragment[0])
+        self.connect(start, "", final)
+        self.connect(fragment[1], "", start)
+        return start, final
+
+    def build(self, fragment):
+        start, final = fragment
+        return NFA(self.states, [final], self.transitions, start)
+
+
+def hopcroft_minimization(transitions, labels):
+    """
+    Hopcroft's minimization of the DFA whose state `s` moves by each symbol
+    in `transitions[s]` to the state it maps to. Missing transitions go to
+    an implicit dead state of its own. Only states with equal `labels[s]`
+    may be merged, so the initial partition can separate accepting states
+    by what they accept.
+
+    Returns the block of every state, numbered in order of first state.
+    """
+    n = len(transitions)
+    dead = n
+    symbols = {symbol for row in transitions for symbol in row}
+    inverse = {symbol: [[] for _ in range(n + 1)] for symbol in symbols}
+    for state, row in enumerate(transitions):
+        for symbol in symbols:
+            inverse[symbol][row.get(symbol, dead)].append(state)
+    for symbol in symbols:
+        inverse[symbol][dead].append(dead)
+
+    initial = {}
+    block_of = [initial.setdefault(label, len(initial)) for label in labels]
+    block_of.append(len(initial))
+    members = [set() for _ in range(len(initial) + 1)]
+    for state, block in enumerate(block_of):
+        members[block].add(state)
+
+    largest = max(range(len(members)), key=lambda block: len(members[block]))
+    pending = set(range(len(members))) - {largest}
 
-        if key not in split:
-            split[key] = []
-        split[key].append(state)
+    while pending:
+        splitter = list(members[pending.pop()])
+        for symbol in symbols:
+            predecessors = inverse[symbol]
+            touched = {}
+            for state in splitter:
+                for predecessor in predecessors[state]:
+                    touched.setdefault(block_of[predecessor], []).append(predecessor)
+
+            for block, states in touched.items():
+                if len(states) == len(members[block]):
+                    continue
+                split = len(members)
+                members[block].difference_update(states)
+                members.append(set(states))
+                for state in states:
+                    block_of[state] = split
+                if block in pending or len(states) <= len(members[block]):
+                    pending.add(split)
+                else:
+                    pending.add(block)
 
-    return [group for group in split.values()]
+    numbers = {}
+    return [numbers.setdefault(block, len(numbers)) for block in block_of[:n]]
 
 
 def state_minimization(automaton):
-    partition = DisjointSet(*range(automaton.states))
-
-    ## partition = { NON-FINALS | FINALS }
-    partition.merge([s for s in range(automaton.states) if s not in automaton.finals])
-    partition.merge(automaton.finals)
+    transitions = [
+        {symbol: destinations[0] for symbol, destinations in row.items()}
+        for row in (automaton.transitions[s] for s in range(automaton.states))
+    ]
+    labels = [s in automaton.finals for s in range(automaton.states)]
 
-    while True:
-        new_partition = DisjointSet(*range(automaton.states))
-
-        # Split each group if needed (use distinguish_states(group, automaton, partition))
-        for group in partition.groups:
-            for sgroup in distinguish_states(group, automaton, partition):
-                new_partition.merge(sgroup)
-
-        if len(new_partition) == len(partition):
-            break
-
-        partition = new_partition
+    groups = {}
+    for state, block in enumerate(hopcroft_minimization(transitions, labels)):
+        groups.setdefault(block, []).append(state)
 
+    partition = DisjointSet(*range(automaton.states))
+    for group in groups.values():
+        partition.merge(group)
     return partition
 
 
 def automata_minimization(automaton):
-    partition = state_minimization(automaton)
-
-    states = [s for s in partition.representatives]
-
-    transitions = {}
-    for i, state in enumerate(states):
-        origin = state.value
-        for symbol, destinations in automaton.transitions[origin].items():
-            destination = states.index(partition[destinations[0]].representative)
-
-            try:
-                transitions[i, symbol]
-                assert False
-            except KeyError:
-                transitions[i, symbol] = destination
-
-    finals = [i for i, s in enumerate(states) if s.value in automaton.finals]
-    start = states.index(partition[automaton.start].representative)
-
-    return DFA(len(states), finals, transitions, start)
+    transitions = [
+        {symbol: destinations[0] for symbol, destinations in row.items()}
+        for row in (automaton.transitions[s] for s in range(automaton.states))
+    ]
+    labels = [s in automaton.finals for s in range(automaton.states)]
+    blocks = hopcroft_minimization(transitions, labels)
+
+    minimized = {}
+    for state, row in enumerate(transitions):
+        for symbol, destination in row.items():
+            minimized[blocks[state], symbol] = blocks[destination]
+
+    finals = {blocks[s] for s in automaton.finals}
+    return DFA(max(blocks) + 1, finals, minimized, blocks[automaton.start])
 
 
 def multiline_formatter(state):
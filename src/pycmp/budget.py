@@ -0,0 +1,87 @@
+import time
+from pycmp.exceptions import BudgetExceeded
+
+# Rough memory cost of a state and of one of its items, for the builders
+STATE_BYTES = 200
+ITEM_BYTES = 32
+
+
+class CancellationToken:
+    """Set from anywhere (another thread, a request handler, ...) to stop
+    the builders checking a `Budget` that holds it."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Budget:
+    """
+    Limits for the automaton and table builders: states and items built,
+    wall time since the first check and bytes (estimated by the builders),
+    plus an optional `CancellationToken`. `None` means no limit.
+
+    Builders call `charge` as they build and it raises `BudgetExceeded`
+    once a limit is passed. One budget may be shared by several builders:
+    the counts add up across them.
+    """
+
+    def __init__(
+        self,
+        max_states=None,
+        max_items=None,
+        max_seconds=None,
+        max_bytes=None,
+        token=None,
+    ):
+        self.max_states = max_states
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.token = token
+        self.states = self.items = self.bytes = 0
+        self.stage = None
+        self.started = None
+
+    def track(self, stage):
+        """Name the builder charging next, for the statistics."""
+        self.stage = stage
+        if self.started is None:
+            self.started = time.monotonic()
+        return self
+
+    @property
+    def elapsed(self):
+        return 0.0 if self.started is None else time.monotonic() - self.started
+
+    @property
+    def stats(self):
+        return {
+            "stage": self.stage,
+            "states": self.states,
+            "items": self.items,
+            "bytes": self.bytes,
+            "seconds": round(self.elapsed, 3),
+        }
+
+    def charge(self, states=0, items=0, bytes=0):
+        self.states += states
+        self.items += items
+        self.bytes += bytes
+        self.check()
+
+    def check(self):
+        if self.started is None:
+            self.started = time.monotonic()
+        if self.token is not None and self.token.cancelled:
+            raise BudgetExceeded("cancelled", self.stats)
+        if self.max_states is not None and self.states > self.max_states:
+            raise BudgetExceeded("states", self.stats)
+        if self.max_items is not None and self.items > self.max_items:
+            raise BudgetExceeded("items", self.stats)
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            raise BudgetExceeded("bytes", self.stats)
+        if self.max_seconds is not None and self.elapsed > self.max_seconds:
+            raise BudgetExceeded("seconds", self.stats)
@@ -0,0 +1,219 @@
+import json
+import hashlib
+
+
+class CanonicalForm:
+    """
+    Normal form of a grammar that does not depend on the names of its
+    nonterminals nor on the order of its productions. Terminals keep their
+    names: they are what the lexer produces.
+
+    `ids` maps every nonterminal to its canonical id (the start symbol is
+    always 0) and `productions` holds the productions as sorted
+    `(left id, right side)` pairs, where right sides are tuples of
+    `("t", name)` and `("n", id)`.
+    """
+
+    def __init__(self, grammar, ids, productions, fingerprint):
+        self.grammar = grammar
+        self.ids = ids
+        self.productions = productions
+        self.fingerprint = fingerprint
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CanonicalForm) and self.fingerprint == other.fingerprint
+        )
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+
+def canonical_form(grammar):
+    """
+    Color refinement (1-dimensional Weisfeiler-Lehman) over the production
+    graph. A nonterminal's color is refined by the colors of its right sides
+    and of the places where it occurs, until the partition is stable.
+    Remaining ties are broken by individualizing one member of the first
+    tied class and refining again.
+
+    Tied nonterminals are usually interchangeable (an automorphism), and
+    then the choice does not matter. Since color refinement cannot tell
+    every non-isomorphic pair apart, `isomorphism` checks the mapping the
+    forms induce before anything is reused.
+    """
+    nonterminals = grammar.nonterminals
+    colors = {nt: 0 if nt == grammar.start_symbol else 1 for nt in nonterminals}
+    colors = __refine(grammar, colors)
+
+    while len(set(colors.values())) < len(nonterminals):
+        tied = {}
+        for nt in nonterminals:
+            tied.setdefault(colors[nt], []).append(nt)
+        color = min(c for c, members in tied.items() if len(members) > 1)
+        chosen = tied[color][0]
+        colors = {nt: (c, nt != chosen) for nt, c in colors.items()}
+        colors = __refine(grammar, __rank(colors))
+
+    productions = tuple(
+        sorted(
+            (colors[p.left], __right_side(p.right, colors)) for p in grammar.productions
+        )
+    )
+
+    production_ids = {}
+    for p in grammar.productions:
+        production_ids.setdefault(p, (colors[p.left], __right_side(p.right, colors)))
+
+    content = {
+        "ptype": grammar.ptype and grammar.ptype.__name__,
+        "start_symbol": grammar.start_symbol is not None,
+        "nonterminals": len(nonterminals),
+        "terminals": sorted(t.name for t in grammar.terminals),
+        "productions": productions,
+        "precedence": sorted(
+            (t.name, level, assoc) for t, (level, assoc) in grammar.precedence.items()
+        ),
+        "production_precedence": sorted(
+            (production_ids[p], t.name)
+            for p, t in grammar.production_precedence.items()
+        ),
+    }
+    data = json.dumps(content, separators=(",", ":"))
+    fingerprint = hashlib.sha256(data.encode()).hexdigest()
+
+    return CanonicalForm(grammar, colors, productions, fingerprint)
+
+
+def __right_side(right, colors):
+    return tuple(("t", s.name) if s.is_terminal else ("n", colors[s]) for s in right)
+
+
+def __rank(signatures):
+    ranks = {sig: i for i, sig in enumerate(sorted(set(signatures.values())))}
+    return {nt: ranks[sig] for nt, sig in signatures.items()}
+
+
+def __refine(grammar, colors):
+    classes = len(set(colors.values()))
+
+    while True:
+        right_sides = {nt: [] for nt in colors}
+        occurrences = {nt: [] for nt in colors}
+        for production in grammar.productions:
+            right = __right_side(production.right, colors)
+            right_sides[production.left].append(right)
+            for i, symbol in enumerate(production.right):
+                if symbol.is_nonterminal:
+                    occurrences[symbol].append((colors[production.left], i, right))
+
+        colors = __rank(
+            {
+                nt: (
+                    colors[nt],
+                    tuple(sorted(right_sides[nt])),
+                    tuple(sorted(occurrences[nt])),
+                )
+                for nt in colors
+            }
+        )
+
+        refined = len(set(colors.values()))
+        if refined == classes:
+            return colors
+        classes = refined
+
+
+def isomorphism(source, target, source_form=None, target_form=None):
+    """
+    Map the symbols and productions of `source` to those of `target` when
+    both grammars are the same up to nonterminal names and production order.
+    Returns None otherwise. The mapping is verified production by production.
+    """
+    source_form = source_form or canonical_form(source)
+    target_form = target_form or canonical_form(target)
+    if source_form != target_form:
+        return None
+
+    by_id = {i: nt for nt, i in target_form.ids.items()}
+    terminals = {t.name: t for t in target.terminals}
+    if len(terminals) != len(source.terminals):
+        return None
+
+    mapping = {source.eof: target.eof, source.epsilon: target.epsilon}
+    candidates = {}
+    for p in target.productions:
+        key = (p.left, tuple(p.right))
+        candidates.setdefault(key, []).append(p)
+
+    # Forms computed earlier may be stale if a grammar changed since
+    try:
+        for t in source.terminals:
+            mapping[t] = terminals[t.name]
+        for nt, i in source_form.ids.items():
+            mapping[nt] = by_id[i]
+        for p in source.productions:
+            key = (mapping[p.left], tuple(mapping[s] for s in p.right))
+            mapping[p] = candidates[key].pop()
+    except (KeyError, IndexError):
+        return None
+    if len(source.productions) != len(target.productions):
+        return None
+
+    if mapping.get(source.start_symbol) is not target.start_symbol:
+        return None
+    if any(
+        target.precedence.get(mapping[t]) != value
+        for t, value in source.precedence.items()
+    ):
+        return None
+    if any(
+        target.production_precedence.get(mapping[p]) is not mapping[t]
+        for p, t in source.production_precedence.items()
+    ):
+        return None
+
+    return mapping
+
+
+def augmented_isomorphism(mapping, source, target):
+    """
+    Extend the `isomorphism` between two grammars to copies of them augmented
+    with `get_augmented_grammar`: `source` and `target` share the symbols and
+    productions of the grammars, and add a start symbol and its productions.
+    Returns None if the augmentations differ.
+    """
+    mapping = dict(mapping)
+    mapping[source.start_symbol] = target.start_symbol
+
+    candidates = {}
+    for p in target.start_symbol.productions:
+        candidates.setdefault(tuple(p.right), []).append(p)
+    try:
+        for p in source.start_symbol.productions:
+            mapping[p] = candidates[tuple(mapping[s] for s in p.right)].pop()
+    except (KeyError, IndexError):
+        return None
+
+    return mapping
+
+
+def translate(obj, mapping):
+    """
+    Rebuild `obj` (tables, sets, tuples, ...) with every object found in
+    `mapping` replaced by its image. Anything else is kept as it is.
+    """
+    if isinstance(obj, dict):
+        return {translate(k, mapping): translate(v, mapping) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [translate(x, mapping) for x in obj]
+    if isinstance(obj, (set, frozenset)):
+        return type(obj)(translate(x, mapping) for x in obj)
+    if isinstance(obj, tuple):
+        items = [translate(x, mapping) for x in obj]
+        return type(obj)(*items) if hasattr(obj, "_fields") else tuple(items)
+
+    try:
+        return mapping.get(obj, obj)
+    except (TypeError, AttributeError):
+        return obj
@@ -0,0 +1,761 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pycmp.utils import ContainerSet
+from pycmp.budget import STATE_BYTES, ITEM_BYTES
+
+PARALLEL_MIN_WAVE = 256
+
+
+class CompiledGrammar:
+    """
+    Integer view of a grammar for the table builders.
+
+    Symbol ids are dense: terminals first, then eof (`self.eof`), then the
+    nonterminals, so `s < self.n_terminals` tells terminals apart. Productions
+    are numbered grouped by left side: the productions of nonterminal id
+    `n_terminals + i` are `ranges[i]` to `ranges[i + 1]`. Right sides live in
+    one flat `array('i')`, production `p` spanning `offsets[p]:offsets[p + 1]`.
+
+    Item `(p, dot)` has id `item_base[p] + dot`, so the item after it is the
+    next id. `item_next[item]` is the symbol after the dot, -1 at the end.
+    Terminal sets are int bitmasks over terminal ids.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        terminals = grammar.terminals + [grammar.eof]
+        self.symbols = terminals + grammar.nonterminals
+        self.ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.n_terminals = len(terminals)
+        self.eof = self.n_terminals - 1
+        self.start = self.ids[grammar.start_symbol]
+
+        ids = self.ids
+        self.productions = sorted(grammar.productions, key=lambda p: ids[p.left])
+        self.production_ids = {p: i for i, p in enumerate(self.productions)}
+
+        self.left = array("i", (ids[p.left] for p in self.productions))
+        self.rhs = array("i")
+        self.offsets = array("i", [0])
+        for production in self.productions:
+            self.rhs.extend(ids[s] for s in production.right)
+            self.offsets.append(len(self.rhs))
+
+        n_nonterminals = len(self.symbols) - self.n_terminals
+        self.ranges = array("i", [0] * (n_nonterminals + 1))
+        for left in self.left:
+            self.ranges[left - self.n_terminals + 1] += 1
+        for i in range(n_nonterminals):
+            self.ranges[i + 1] += self.ranges[i]
+
+        self.item_base = array("i")
+        self.item_production = array("i")
+        self.item_next = array("i")
+        for p in range(len(self.productions)):
+            self.item_base.append(len(self.item_production))
+            start, end = self.offsets[p], self.offsets[p + 1]
+            for dot in range(start, end + 1):
+                self.item_production.append(p)
+                self.item_next.append(self.rhs[dot] if dot < end else -1)
+
+    def detached(self):
+        """Copy with the integer tables only, cheap to send to other processes."""
+        copy = CompiledGrammar.__new__(CompiledGrammar)
+        copy.grammar = copy.symbols = copy.ids = None
+        copy.productions = copy.production_ids = None
+        for name in (
+            "n_terminals",
+            "eof",
+            "start",
+            "left",
+            "rhs",
+            "offsets",
+            "ranges",
+            "item_base",
+            "item_production",
+            "item_next",
+        ):
+            setattr(copy, name, getattr(self, name))
+        return copy
+
+    def right(self, p):
+        return self.rhs[self.offsets[p] : self.offsets[p + 1]]
+
+    def productions_of(self, symbol):
+        i = symbol - self.n_terminals
+        return range(self.ranges[i], self.ranges[i + 1])
+
+    def is_terminal(self, symbol):
+        return symbol < self.n_terminals
+
+    def terminals_of(self, mask):
+        return [self.symbols[t] for t in bits(mask)]
+
+
+def bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def compute_firsts(cg):
+    """FIRST bitmask and nullability of every symbol id."""
+    firsts = [1 << s if s < cg.n_terminals else 0 for s in range(len(cg.symbols))]
+    nullable = bytearray(len(cg.symbols))
+
+    change = True
+    while change:
+        change = False
+        for p, left in enumerate(cg.left):
+            first, empty = first_of(
+                cg, cg.offsets[p], cg.offsets[p + 1], firsts, nullable
+            )
+            if first | firsts[left] != firsts[left]:
+                firsts[left] |= first
+                change = True
+            if empty and not nullable[left]:
+                nullable[left] = 1
+                change = True
+
+    return firsts, nullable
+
+
+def first_of(cg, start, end, firsts, nullable):
+    """FIRST bitmask and nullability of `cg.rhs[start:end]`."""
+    first = 0
+    rhs = cg.rhs
+    for i in range(start, end):
+        symbol = rhs[i]
+        first |= firsts[symbol]
+        if not nullable[symbol]:
+            return first, False
+    return first, True
+
+
+def compute_suffix_firsts(cg, firsts, nullable):
+    """
+    FIRST bitmask and nullability of the rest of the right side from every
+    item on, i.e. per (production, dot), indexed by item id.
+    """
+    n_items = len(cg.item_next)
+    suffix_firsts = [0] * n_items
+    suffix_nullable = bytearray(n_items)
+
+    for p in range(len(cg.productions)):
+        item = cg.item_base[p] + cg.offsets[p + 1] - cg.offsets[p]
+        first, empty = 0, 1
+        suffix_nullable[item] = 1
+        while item > cg.item_base[p]:
+            item -= 1
+            symbol = cg.item_next[item]
+            first = first | firsts[symbol] if nullable[symbol] else firsts[symbol]
+            empty = empty and nullable[symbol]
+            suffix_firsts[item] = first
+            suffix_nullable[item] = empty
+
+    return suffix_firsts, suffix_nullable
+
+
+def compute_follows(cg, firsts, nullable, suffixes=None):
+    if suffixes is None:
+        suffixes = compute_suffix_firsts(cg, firsts, nullable)
+    suffix_firsts, suffix_nullable = suffixes
+
+    follows = [0] * len(cg.symbols)
+    follows[cg.start] = 1 << cg.eof
+    occurrences = [
+        (item, cg.item_next[item], cg.left[cg.item_production[item]])
+        for item in range(len(cg.item_next))
+        if cg.item_next[item] >= cg.n_terminals
+    ]
+
+    change = True
+    while change:
+        change = False
+        for item, symbol, left in occurrences:
+            follow = suffix_firsts[item + 1]
+            if suffix_nullable[item + 1]:
+                follow |= follows[left]
+            if follow | follows[symbol] != follows[symbol]:
+                follows[symbol] |= follow
+                change = True
+
+    return follows
+
+
+def decode_firsts(cg, firsts, nullable):
+    """The firsts as `compute_firsts` returns them, keyed by symbols and right sides."""
+    decoded = {}
+    for s, symbol in enumerate(cg.symbols):
+        if s == cg.eof:
+            continue
+        decoded[symbol] = ContainerSet(
+            *cg.terminals_of(firsts[s]), contains_epsilon=bool(nullable[s])
+        )
+    for p, production in enumerate(cg.productions):
+        first, empty = first_of(cg, cg.offsets[p], cg.offsets[p + 1], firsts, nullable)
+        decoded[production.right] = ContainerSet(
+            *cg.terminals_of(first), contains_epsilon=empty
+        )
+    return decoded
+
+
+def decode_follows(cg, follows):
+    return {
+        cg.symbols[s]: ContainerSet(*cg.terminals_of(follows[s]))
+        for s in range(cg.n_terminals, len(cg.symbols))
+    }
+
+
+def build_ll_table(cg, suffixes, follows):
+    """LL(1) table `(nonterminal id, terminal id) -> [production ids]`."""
+    suffix_firsts, suffix_nullable = suffixes
+    table = {}
+    for p, left in enumerate(cg.left):
+        first = suffix_firsts[cg.item_base[p]]
+        empty = suffix_nullable[cg.item_base[p]]
+        for t in bits(first):
+            table.setdefault((left, t), []).append(p)
+        # Like `parsing.build_ll_table`, a terminal both in the first and in
+        # the follow lists the production twice
+        if empty:
+            for t in bits(follows[left]):
+                table.setdefault((left, t), []).append(p)
+    return table
+
+
+def lr0_closure(cg, kernel):
+    closure = list(kernel)
+    seen = set(closure)
+    for item in closure:
+        symbol = cg.item_next[item]
+        if symbol < cg.n_terminals:
+            continue
+        for p in cg.productions_of(symbol):
+            child = cg.item_base[p]
+            if child not in seen:
+                seen.add(child)
+                closure.append(child)
+    return closure
+
+
+def build_lr0_collection(cg, budget=None):
+    """
+    LR(0) item sets, numbered in breadth-first order. Returns the closed
+    states (lists of item ids) and the transitions `(state, symbol) -> state`.
+    Every state is charged to `budget`, if given.
+    """
+    if budget is not None:
+        budget.track("lr0 collection")
+    (start,) = cg.productions_of(cg.start)
+    kernels = [(cg.item_base[start],)]
+    index = {kernels[0]: 0}
+    states, gotos = [], {}
+
+    for i, kernel in enumerate(kernels):
+        closure = lr0_closure(cg, kernel)
+        states.append(closure)
+        if budget is not None:
+            budget.charge(1, len(closure), STATE_BYTES + ITEM_BYTES * len(closure))
+
+        moves = {}
+        for item in closure:
+            symbol = cg.item_next[item]
+            if symbol >= 0:
+                moves.setdefault(symbol, []).append(item + 1)
+
+        for symbol, items in moves.items():
+            target = tuple(sorted(items))
+            try:
+                gotos[i, symbol] = index[target]
+            except KeyError:
+                gotos[i, symbol] = index[target] = len(kernels)
+                kernels.append(target)
+
+    return states, gotos
+
+
+class LR1Collection:
+    """
+    LR(1) item sets stored as an LR(0) core id plus one lookahead bitmask
+    per kernel item: `states[i]` is `(core, masks)`, so states are hashed,
+    compared and merged as tuples of ints.
+
+    Everything that depends on the kernel alone is computed once per core
+    and shared by all the states with that core: the closure items (kernel
+    first), how lookaheads flow from an item to the items it adds, and
+    where each closure item moves. A state's closure masks are recomputed
+    from its kernel masks when they are needed.
+    """
+
+    def __init__(self, cg, suffixes):
+        self.cg = cg
+        self.suffixes = suffixes
+        self.kernels = []
+        self.closures = []
+        self.flows = []
+        self.moves = []
+        self.core_ids = {}
+        self.states = []
+        self.state_ids = {}
+        self.gotos = {}
+
+    def core(self, kernel):
+        """Id of the core with `kernel`, a sorted tuple of item ids."""
+        try:
+            return self.core_ids[kernel]
+        except KeyError:
+            pass
+
+        cg = self.cg
+        suffix_firsts, suffix_nullable = self.suffixes
+        closure = lr0_closure(cg, kernel)
+        positions = {item: j for j, item in enumerate(closure)}
+
+        flows = []
+        for item in closure:
+            symbol = cg.item_next[item]
+            if symbol < cg.n_terminals:
+                flows.append(None)
+                continue
+            children = tuple(
+                positions[cg.item_base[p]] for p in cg.productions_of(symbol)
+            )
+            flows.append((suffix_firsts[item + 1], suffix_nullable[item + 1], children))
+
+        core = self.core_ids[kernel] = len(self.kernels)
+        self.kernels.append(kernel)
+        self.closures.append(closure)
+        self.flows.append(flows)
+        self.moves.append(None)
+        return core
+
+    def core_moves(self, core):
+        """`(symbol, target core, sources)` for every symbol after a dot, in
+        symbol order; `sources[k]` is the closure position moving to the
+        target's kernel item `k`."""
+        moves = self.moves[core]
+        if moves is not None:
+            return moves
+
+        grouped = {}
+        for j, item in enumerate(self.closures[core]):
+            symbol = self.cg.item_next[item]
+            if symbol >= 0:
+                grouped.setdefault(symbol, []).append((item + 1, j))
+
+        moves = self.moves[core] = []
+        for symbol in sorted(grouped):
+            targets = sorted(grouped[symbol])
+            kernel = tuple(item for item, _ in targets)
+            sources = tuple(j for _, j in targets)
+            moves.append((symbol, self.core(kernel), sources))
+        return moves
+
+    def add_state(self, core, masks):
+        key = (core, masks)
+        try:
+            return self.state_ids[key]
+        except KeyError:
+            self.state_ids[key] = len(self.states)
+            self.states.append(key)
+            return self.state_ids[key]
+
+    def closure_masks(self, state):
+        """Lookahead masks of the closure of `state`, by closure position.
+        An item adds its children with the union of FIRST(beta l) over its
+        lookaheads l: nothing when it has none."""
+        return self.close(*self.states[state])
+
+    def close(self, core, masks):
+        flows = self.flows[core]
+        closure = list(masks)
+        closure.extend([0] * (len(flows) - len(masks)))
+
+        pending = [k for k, mask in enumerate(masks) if mask]
+        while pending:
+            j = pending.pop()
+            flow = flows[j]
+            if flow is None:
+                continue
+            first, nullable, children = flow
+            lookaheads = first | closure[j] if nullable else first
+            for child in children:
+                if closure[child] | lookaheads != closure[child]:
+                    closure[child] |= lookaheads
+                    pending.append(child)
+
+        return closure
+
+    def items(self, state):
+        """The closure of `state` as `(item, lookahead mask)` pairs."""
+        core, _ = self.states[state]
+        return list(zip(self.closures[core], self.closure_masks(state)))
+
+    def item_sets(self):
+        return [self.items(state) for state in range(len(self.states))]
+
+    def successors(self, core, masks):
+        """`(symbol, target kernel, target masks)` of the state `(core, masks)`."""
+        closure = self.close(core, masks)
+        return [
+            (symbol, self.kernels[target], tuple(closure[j] for j in sources))
+            for symbol, target, sources in self.core_moves(core)
+        ]
+
+    def build(self, starts, workers=None, min_wave=PARALLEL_MIN_WAVE, budget=None):
+        """
+        Add the states reachable from the start symbol ids `starts`,
+        numbered in breadth-first order after the start states.
+
+        The states are expanded in waves: the states found while expanding
+        one wave make up the next one. With `workers`, the waves of at least
+        `min_wave` states are expanded in a process pool that only receives
+        the integer tables and the kernels. The results are merged in wave
+        order, so the numbering is the same as the sequential one.
+
+        New states are charged to `budget`, if given, as they are found.
+        """
+        cg = self.cg
+        if budget is not None:
+            budget.track("lr1 collection")
+        for symbol in starts:
+            (p,) = cg.productions_of(symbol)
+            self.add_state(self.core((cg.item_base[p],)), (1 << cg.eof,))
+
+        pool = None
+        futures = []
+        try:
+            wave = 0
+            while wave < len(self.states):
+                end = len(self.states)
+                tasks = [
+                    (self.kernels[core], masks) for core, masks in self.states[wave:end]
+                ]
+
+                if workers and len(tasks) >= min_wave:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(
+                            workers,
+                            initializer=_init_worker,
+                            initargs=(cg.detached(), self.suffixes),
+                        )
+                    chunksize = max(1, len(tasks) // (4 * workers))
+                    futures = [
+                        pool.submit(_expand_kernels, tasks[i : i + chunksize])
+                        for i in range(0, len(tasks), chunksize)
+                    ]
+                    results = (r for future in futures for r in future.result())
+                else:
+                    results = (
+                        self.successors(core, masks)
+                        for core, masks in self.states[wave:end]
+                    )
+
+                for state, successors in enumerate(results, wave):
+                    found = len(self.states)
+                    for symbol, kernel, masks in successors:
+                        dest = self.add_state(self.core(kernel), masks)
+                        self.gotos[state, symbol] = dest
+                    if budget is not None:
+                        items = sum(len(masks) for _, masks in self.states[found:])
+                        budget.charge(
+                            len(self.states) - found,
+                            items,
+                            STATE_BYTES * (len(self.states) - found)
+                            + ITEM_BYTES * items,
+                        )
+                wave = end
+        except BaseException:
+            # Do not wait for the rest of the wave (shutdown's cancel_futures
+            # needs Python 3.9)
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return self
+
+    def merge_cores(self):
+        """
+        The LALR(1) collection: states with the same core merged by OR-ing
+        their masks, numbered in the order their cores first appear.
+        """
+        merged = LR1Collection(self.cg, self.suffixes)
+        merged.kernels, merged.closures = self.kernels, self.closures
+        merged.flows, merged.moves, merged.core_ids = (
+            self.flows,
+            self.moves,
+            self.core_ids,
+        )
+
+        by_core, renumber = {}, []
+        for core, masks in self.states:
+            current = by_core.get(core)
+            by_core[core] = (
+                masks
+                if current is None
+                else tuple(a | b for a, b in zip(current, masks))
+            )
+        index = {core: i for i, core in enumerate(by_core)}
+        for core, masks in by_core.items():
+            merged.add_state(core, masks)
+        for core, _ in self.states:
+            renumber.append(index[core])
+
+        for (state, symbol), dest in self.gotos.items():
+            merged.gotos[renumber[state], symbol] = renumber[dest]
+        return merged
+
+
+class Translation:
+    """
+    Ids of the compiled grammar `old` in terms of those of `new`, compiled
+    from the same grammar after some productions were added or removed.
+    Symbols and productions are matched by identity, except for the
+    augmented start symbol and its production, which are matched to the
+    new ones. Ids with no counterpart translate to -1.
+
+    `edited` holds the ids in `new` of the nonterminals whose productions
+    changed.
+    """
+
+    def __init__(self, old, new):
+        self.old, self.new = old, new
+        self.symbols = [new.ids.get(symbol, -1) for symbol in old.symbols]
+        self.symbols[old.start] = new.start
+
+        ids = {id(production): p for p, production in enumerate(new.productions)}
+        self.productions = [
+            ids.get(id(production), -1) for production in old.productions
+        ]
+        (start,) = old.productions_of(old.start)
+        (self.productions[start],) = new.productions_of(new.start)
+
+        self.edited = {
+            self.symbols[old.left[p]]
+            for p, q in enumerate(self.productions)
+            if q < 0 and self.symbols[old.left[p]] >= 0
+        }
+        kept = set(self.productions)
+        self.edited.update(
+            new.left[q] for q in range(len(new.productions)) if q not in kept
+        )
+
+        terminals = self.symbols[: old.n_terminals]
+        self.same_terminals = terminals == list(range(old.n_terminals))
+        self.terminals = [-1] * new.n_terminals
+        for t, u in enumerate(terminals):
+            if u >= 0:
+                self.terminals[u] = t
+
+    def item(self, item):
+        old = self.old
+        p = old.item_production[item]
+        q = self.productions[p]
+        return -1 if q < 0 else self.new.item_base[q] + item - old.item_base[p]
+
+    def mask(self, mask):
+        """A terminal mask of `old` as one of `new`."""
+        if self.same_terminals:
+            return mask
+        result = 0
+        for t in bits(mask):
+            result |= 1 << self.symbols[t]
+        return result
+
+    def old_mask(self, mask):
+        """A terminal mask of `new` as one of `old`, None if it has terminals
+        `old` did not."""
+        if self.same_terminals:
+            return mask
+        result = 0
+        for u in bits(mask):
+            t = self.terminals[u]
+            if t < 0:
+                return None
+            result |= 1 << t
+        return result
+
+
+class IncrementalLR1Collection(LR1Collection):
+    """
+    `LR1Collection` of a grammar rebuilt from the one of `previous`, the
+    collection of the grammar before an edit.
+
+    A core of `previous` is adopted, with its closure and lookahead flows
+    translated, when its kernel survived the edit, no item of its closure
+    is before an edited nonterminal and the First of the suffixes it reads
+    lookaheads from did not change. A state with an adopted core and the
+    same lookaheads as a state of `previous` has the same successors, so
+    they are translated instead of computed. Everything else is built as
+    usual, and states are numbered as `LR1Collection.build` would.
+
+    `reused` maps the states whose successors were translated to the state
+    they came from and `origins` the adopted cores to theirs.
+    """
+
+    def __init__(self, previous, cg, suffixes):
+        super().__init__(cg, suffixes)
+        self.previous = previous
+        self.translation = translation = Translation(previous.cg, cg)
+        self.origins = {}
+        self.reused = {}
+
+        # Kernels are sorted and masks follow their order: a kernel whose
+        # items changed order (productions were moved) is built again
+        self.translated_kernels = []
+        self.old_kernels = {}
+        for core, kernel in enumerate(previous.kernels):
+            kernel = tuple(translation.item(item) for item in kernel)
+            if -1 in kernel or list(kernel) != sorted(kernel):
+                kernel = None
+            else:
+                self.old_kernels[kernel] = core
+            self.translated_kernels.append(kernel)
+
+    def core(self, kernel):
+        if kernel not in self.core_ids:
+            old = self.old_kernels.get(kernel)
+            if old is not None and self.__adopt(kernel, old):
+                return self.core_ids[kernel]
+        return super().core(kernel)
+
+    def __adopt(self, kernel, old):
+        cg, translation = self.cg, self.translation
+        closure = [translation.item(item) for item in self.previous.closures[old]]
+        if -1 in closure or any(
+            cg.item_next[item] in translation.edited for item in closure
+        ):
+            return False
+
+        suffix_firsts, suffix_nullable = self.suffixes
+        flows = []
+        for item, flow in zip(closure, self.previous.flows[old]):
+            if flow is None:
+                flows.append(None)
+                continue
+            first, nullable, children = flow
+            if (
+                translation.mask(first) != suffix_firsts[item + 1]
+                or nullable != suffix_nullable[item + 1]
+            ):
+                return False
+            flows.append((suffix_firsts[item + 1], nullable, children))
+
+        core = self.core_ids[kernel] = len(self.kernels)
+        self.kernels.append(kernel)
+        self.closures.append(closure)
+        self.flows.append(flows)
+        self.moves.append(None)
+        self.origins[core] = old
+        return True
+
+    def origin(self, previous, core, masks):
+        """The state of `previous`, a collection of the grammar before the
+        edit sharing its cores, that `(core, masks)` came from, if any."""
+        old = self.origins.get(core)
+        if old is None:
+            return None
+        old_masks = tuple(self.translation.old_mask(mask) for mask in masks)
+        return previous.state_ids.get((old, old_masks))
+
+    def successors(self, core, masks):
+        previous, translation = self.previous, self.translation
+        state = self.origin(previous, core, masks)
+        if state is None:
+            return super().successors(core, masks)
+
+        old = self.origins[core]
+        successors = []
+        for symbol, _, _ in previous.core_moves(old):
+            target, target_masks = previous.states[previous.gotos[state, symbol]]
+            kernel = self.translated_kernels[target]
+            if kernel is None:
+                return super().successors(core, masks)
+            successors.append(
+                (
+                    translation.symbols[symbol],
+                    kernel,
+                    tuple(translation.mask(mask) for mask in target_masks),
+                )
+            )
+        successors.sort(key=lambda successor: successor[0])
+        self.reused[self.add_state(core, masks)] = state
+        return successors
+
+    def build(self, starts, budget=None):
+        """Like `LR1Collection.build`, in this process. Drops the previous
+        collection once done."""
+        super().build(starts, budget=budget)
+        self.previous, self.old_kernels = None, {}
+        return self
+
+
+def build_lr1_collection(cg, suffixes, starts=None, workers=None, budget=None):
+    """
+    Canonical LR(1) collection of the augmented grammar `cg`, with a start
+    state for each start symbol id in `starts` (the grammar's by default).
+    With `workers`, large waves of states are expanded in that many
+    processes; the result is the same.
+    """
+    collection = LR1Collection(cg, suffixes)
+    starts = [cg.start] if starts is None else starts
+    return collection.build(starts, workers, budget=budget)
+
+
+_worker_collection = None
+
+
+def _init_worker(cg, suffixes):
+    global _worker_collection
+    _worker_collection = LR1Collection(cg, suffixes)
+
+
+def _expand_kernels(tasks):
+    collection = _worker_collection
+    return [
+        collection.successors(collection.core(kernel), masks) for kernel, masks in tasks
+    ]
+
+
+def register_states(parser, cg, states, gotos):
+    """
+    Fill the tables of a `ShiftReduceParser` for the augmented grammar `cg`
+    from item sets given as lists of `(item, lookahead mask)`, registering
+    the entries in terms of the grammar's own symbols and productions.
+    """
+    for state, items in enumerate(states):
+        register_state(parser, cg, state, items, gotos)
+
+
+def register_state(parser, cg, state, items, gotos):
+    """Fill the ACTION and GOTO rows of one state, like `register_states`."""
+    for item, lookaheads in items:
+        symbol = cg.item_next[item]
+        if symbol >= cg.n_terminals:
+            dest = gotos[state, symbol]
+            parser._register(parser.goto, (state, cg.symbols[symbol]), dest)
+            continue
+        if symbol >= 0:
+            value = (parser.SHIFT, gotos[state, symbol])
+            parser._register(parser.action, (state, cg.symbols[symbol]), value)
+            continue
+
+        p = cg.item_production[item]
+        production = cg.productions[p]
+        for t in bits(lookaheads):
+            action = (
+                parser.OK if cg.left[p] == cg.start and t == cg.eof else parser.REDUCE
+            )
+            parser._register(
+                parser.action, (state, cg.symbols[t]), (action, production)
+            )
+
+
+def slr_items(cg, closure, follows):
+    """Attach the follows of their left side to the items of an LR(0) state."""
+    return [(item, follows[cg.left[cg.item_production[item]]]) for item in closure]
@@ -0,0 +1,303 @@
+import os
+import json
+import mmap
+import struct
+import hashlib
+from collections import OrderedDict
+from pycmp.compiled import LR1Collection, bits
+
+DEFAULT_MAX_MEMORY = 64 * 2**20
+
+# Index slots: key hash (0 when empty) and state id
+_SLOT = struct.Struct("<QQ")
+# Per state: offset of its key in the log and its hash
+_ENTRY = struct.Struct("<QQ")
+# Per state: offset and size of its row
+_ROW = struct.Struct("<QQ")
+
+
+class _MappedFile:
+    """A file mapped in memory that can grow."""
+
+    def __init__(self, path, size):
+        self.file = open(path, "w+b")
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+    def resize(self, size, clear=False):
+        self.map.close()
+        if clear:
+            self.file.truncate(0)
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+    def __len__(self):
+        return len(self.map)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class DiskStateStore:
+    """
+    Interning table of LR(1) states `(core, masks)` kept on disk.
+
+    Keys are appended to a log file. A hash index in a memory-mapped file
+    (open addressing with linear probing, doubled when half full) maps them
+    to ids, and a second mapped file gives the position of every id's key in
+    the log. Only the most recently used keys, up to `max_memory` bytes by
+    estimate, are kept in memory.
+    """
+
+    def __init__(self, directory, mask_width, kernel_sizes, max_memory):
+        self.mask_width = mask_width
+        self.kernel_sizes = kernel_sizes
+        self.max_memory = max_memory
+        self.log = open(os.path.join(directory, "states.log"), "w+b")
+        self.log_size = 0
+        self.capacity = 1024
+        self.index = _MappedFile(
+            os.path.join(directory, "states.index"), self.capacity * _SLOT.size
+        )
+        self.entries = _MappedFile(
+            os.path.join(directory, "states.entries"), 1024 * _ENTRY.size
+        )
+        self.count = 0
+        self.hot = OrderedDict()
+        self.hot_weight = 0
+        self.hits = self.misses = 0
+
+    def encode(self, core, masks):
+        width = self.mask_width
+        return struct.pack("<I", core) + b"".join(
+            mask.to_bytes(width, "little") for mask in masks
+        )
+
+    def decode(self, record):
+        (core,) = struct.unpack_from("<I", record)
+        width = self.mask_width
+        masks = tuple(
+            int.from_bytes(record[4 + k * width : 4 + (k + 1) * width], "little")
+            for k in range(self.kernel_sizes[core])
+        )
+        return core, masks
+
+    @staticmethod
+    def _hash(record):
+        digest = hashlib.blake2b(record, digest_size=8).digest()
+        return int.from_bytes(digest, "little") | 1 << 63
+
+    def _record(self, state):
+        offset, _ = _ENTRY.unpack_from(self.entries.map, state * _ENTRY.size)
+        self.log.seek(offset)
+        (core,) = struct.unpack("<I", self.log.read(4))
+        return struct.pack("<I", core) + self.log.read(
+            self.kernel_sizes[core] * self.mask_width
+        )
+
+    def _remember(self, key, state):
+        self.hot[key] = state
+        self.hot.move_to_end(key)
+        self.hot_weight += 64 + 16 * len(key[1])
+        while self.hot_weight > self.max_memory and len(self.hot) > 1:
+            (_, masks), _ = self.hot.popitem(last=False)
+            self.hot_weight -= 64 + 16 * len(masks)
+
+    def _probe(self, hash_, record):
+        """Slot of `record` in the index, or of the empty slot for it."""
+        slot = hash_ % self.capacity
+        while True:
+            stored, state = _SLOT.unpack_from(self.index.map, slot * _SLOT.size)
+            if stored == 0:
+                return slot, None
+            if stored == hash_ and self._record(state) == record:
+                return slot, state
+            slot = (slot + 1) % self.capacity
+
+    def _grow(self):
+        self.capacity *= 2
+        self.index.resize(self.capacity * _SLOT.size, clear=True)
+        for state in range(self.count):
+            _, hash_ = _ENTRY.unpack_from(self.entries.map, state * _ENTRY.size)
+            slot = hash_ % self.capacity
+            while _SLOT.unpack_from(self.index.map, slot * _SLOT.size)[0]:
+                slot = (slot + 1) % self.capacity
+            _SLOT.pack_into(self.index.map, slot * _SLOT.size, hash_, state)
+
+    def intern(self, core, masks):
+        """Id of the state `(core, masks)`, added if it is new. Returns
+        `(id, new)`."""
+        key = (core, masks)
+        state = self.hot.get(key)
+        if state is not None:
+            self.hot.move_to_end(key)
+            self.hits += 1
+            return state, False
+        self.misses += 1
+
+        record = self.encode(core, masks)
+        hash_ = self._hash(record)
+        slot, state = self._probe(hash_, record)
+        if state is not None:
+            self._remember(key, state)
+            return state, False
+
+        state = self.count
+        self.count += 1
+        if self.count * _ENTRY.size > len(self.entries):
+            self.entries.resize(2 * len(self.entries))
+        _ENTRY.pack_into(self.entries.map, state * _ENTRY.size, self.log_size, hash_)
+        self.log.seek(self.log_size)
+        self.log.write(record)
+        self.log_size += len(record)
+        _SLOT.pack_into(self.index.map, slot * _SLOT.size, hash_, state)
+        if 2 * self.count > self.capacity:
+            self._grow()
+
+        self._remember(key, state)
+        return state, True
+
+    def key(self, state):
+        return self.decode(self._record(state))
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.index.close()
+        self.entries.close()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DiskTables:
+    """
+    ACTION/GOTO rows of an LR(1) automaton streamed to `rows.jsonl`, one
+    line per state, with their offsets in `rows.index`. Rows are read back
+    one at a time and use the ids of the compiled grammar: actions map a
+    terminal id to a list of `("SHIFT", state)`, `("REDUCE", production)`
+    and `("OK", production)` entries (more than one on a conflict) and
+    gotos map a nonterminal id to a state.
+    """
+
+    def __init__(self, directory, states):
+        self.directory = directory
+        self.states = states
+        self.rows_file = open(os.path.join(directory, "rows.jsonl"), "rb")
+        self.index_file = open(os.path.join(directory, "rows.index"), "rb")
+        self.offsets = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def row(self, state):
+        offset, size = _ROW.unpack_from(self.offsets, state * _ROW.size)
+        self.rows_file.seek(offset)
+        data = self.rows_file.read(size)
+        row = json.loads(data)
+        action = {
+            int(t): [tuple(entry) for entry in entries]
+            for t, entries in row["action"].items()
+        }
+        goto = {int(x): dest for x, dest in row["goto"].items()}
+        return action, goto
+
+    def rows(self):
+        for state in range(self.states):
+            yield self.row(state)
+
+    def conflicts(self):
+        """`(state, terminal id)` of every cell with more than one entry."""
+        for state, (action, _) in enumerate(self.rows()):
+            for t, entries in action.items():
+                if len(entries) > 1:
+                    yield state, t
+
+    def close(self):
+        self.offsets.close()
+        self.index_file.close()
+        self.rows_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_lr1_tables_on_disk(
+    cg, suffixes, directory, max_memory=DEFAULT_MAX_MEMORY, starts=None, budget=None
+):
+    """
+    Canonical LR(1) tables of the augmented grammar `cg` built out of core.
+
+    States are interned in a `DiskStateStore` under `directory` and found
+    in the same breadth-first order as `LR1Collection.build`, so ids match
+    the in-memory builder. A state's row is written as soon as it is
+    expanded and nothing but the LR(0) cores, the hot keys (bounded by
+    `max_memory`) and the current state is kept in memory. Every expanded
+    state is charged to `budget`, if given, with the size of its row.
+    """
+    if budget is not None:
+        budget.track("lr1 tables on disk")
+    os.makedirs(directory, exist_ok=True)
+    cores = LR1Collection(cg, suffixes)
+    width = max(1, (cg.n_terminals + 7) // 8)
+    with DiskStateStore(directory, width, _KernelSizes(cores), max_memory) as store:
+        for symbol in [cg.start] if starts is None else starts:
+            (p,) = cg.productions_of(symbol)
+            store.intern(cores.core((cg.item_base[p],)), (1 << cg.eof,))
+
+        with open(os.path.join(directory, "rows.jsonl"), "wb") as rows, open(
+            os.path.join(directory, "rows.index"), "wb"
+        ) as index:
+            offset = state = 0
+            while state < len(store):
+                core, masks = store.key(state)
+                row = _build_row(cg, cores, store, core, masks)
+                data = json.dumps(row, separators=(",", ":")).encode() + b"\n"
+                rows.write(data)
+                index.write(_ROW.pack(offset, len(data)))
+                offset += len(data)
+                state += 1
+                if budget is not None:
+                    budget.charge(1, len(masks), len(data))
+
+    return DiskTables(directory, state)
+
+
+class _KernelSizes:
+    """Kernel size by core id, read from the live core table."""
+
+    def __init__(self, cores):
+        self.cores = cores
+
+    def __getitem__(self, core):
+        return len(self.cores.kernels[core])
+
+
+def _build_row(cg, cores, store, core, masks):
+    closure = cores.close(core, masks)
+    action, goto = {}, {}
+
+    for symbol, target, sources in cores.core_moves(core):
+        dest, _ = store.intern(target, tuple(closure[j] for j in sources))
+        if symbol < cg.n_terminals:
+            action.setdefault(symbol, []).append(("SHIFT", dest))
+        else:
+            goto[symbol] = dest
+
+    for item, lookaheads in zip(cores.closures[core], closure):
+        if cg.item_next[item] >= 0:
+            continue
+        p = cg.item_production[item]
+        for t in bits(lookaheads):
+            kind = "OK" if cg.left[p] == cg.start and t == cg.eof else "REDUCE"
+            entries = action.setdefault(t, [])
+            if (kind, p) not in entries:
+                entries.append((kind, p))
+
+    return {"action": action, "goto": goto}
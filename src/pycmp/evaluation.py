@@ -15,27 +15,38 @@ def evaluate_parse(left_parse, tokens):
 
 
 def evaluate(production, left_parse, tokens, inherited_value=None):
-    _, body = production
-    attributes = production.attributes
+    """
+    Evaluate the attributes of the derivation of `production` in
+    `left_parse`. The productions being evaluated are kept on a stack of
+    their own, so long derivations do not hit the recursion limit.
+    """
+    # (production, inherited, synteticed) of every production under way
+    stack = [(production, [inherited_value], [None])]
 
-    synteticed = [None]
-    inherited = [inherited_value]
+    while True:
+        production, inherited, synteticed = stack[-1]
+        _, body = production
+        attributes = production.attributes
 
-    for i, symbol in enumerate(body, 1):
-        inherited.append(attributes[i] and attributes[i](inherited, synteticed))
-        if symbol.is_terminal:
-            assert inherited[i] is None
-            lex = next(tokens).lex
-            synteticed.append(lex)
-        else:
-            next_production = next(left_parse)
-            assert symbol == next_production.left
-            synteticed.append(
-                evaluate(next_production, left_parse, tokens, inherited[i])
-            )
+        i = len(synteticed)
+        if i <= len(body):
+            symbol = body[i - 1]
+            inherited.append(attributes[i] and attributes[i](inherited, synteticed))
+            if symbol.is_terminal:
+                assert inherited[i] is None
+                lex = next(tokens).lex
+                synteticed.append(lex)
+            else:
+                next_production = next(left_parse)
+                assert symbol == next_production.left
+                stack.append((next_production, [inherited[i]], [None]))
+            continue
 
-    synteticed[0] = attributes[0] and attributes[0](inherited, synteticed)
-    return synteticed[0]
+        synteticed[0] = attributes[0] and attributes[0](inherited, synteticed)
+        stack.pop()
+        if not stack:
+            return synteticed[0]
+        stack[-1][2].append(synteticed[0])
 
 
 def evaluate_reverse_parse(right_parse, operations, tokens):
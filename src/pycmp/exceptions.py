@@ -4,3 +4,23 @@ class ParsingError(Exception):
 
 class LexicalError(Exception):
     pass
+
+
+class LLkLimitError(Exception):
+    def __init__(self, message, stats=None):
+        super().__init__(message)
+        self.stats = stats
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised by a builder that ran out of its `Budget`. `limit` names what ran
+    out (`"states"`, `"items"`, `"seconds"`, `"bytes"` or `"cancelled"`) and
+    `stats` holds what had been built by then.
+    """
+
+    def __init__(self, limit, stats):
+        details = ", ".join(f"{key}={value}" for key, value in stats.items())
+        super().__init__(f"Budget exceeded ({limit}): {details}")
+        self.limit = limit
+        self.stats = stats
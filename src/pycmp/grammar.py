@@ -1,4 +1,6 @@
 import json
+import hashlib
+import weakref
 
 
 class Symbol(object):
@@ -279,6 +281,16 @@ class Grammar:
 
         self.symbol_dict = {"$": self.eof}
 
+        self.precedence = {}
+        self.production_precedence = {}
+        self.precedence_levels = 0
+
+    def __setattr__(self, name, value):
+        # Any change to the grammar makes its cached fingerprint stale
+        if name != "_fingerprint":
+            self.__dict__["_fingerprint"] = None
+        super().__setattr__(name, value)
+
     def add_nonterminal(self, name, start_symbol=False):
         name = name.strip()
         if not name:
@@ -294,6 +306,7 @@ class Grammar:
 
         self.nonterminals.append(term)
         self.symbol_dict[name] = term
+        self._fingerprint = None
         return term
 
     def add_nonterminals(self, names):
@@ -308,6 +321,21 @@ class Grammar:
 
         production.left.productions.append(production)
         self.productions.append(production)
+        self._fingerprint = None
+
+    def remove_production(self, production):
+        """
+        Remove the first production equal to `production` and return the one
+        removed, which may be a different object.
+        """
+        production = self.productions[self.productions.index(production)]
+        for productions in (self.productions, production.left.productions):
+            for i, other in enumerate(productions):
+                if other is production:
+                    del productions[i]
+                    break
+        self._fingerprint = None
+        return production
 
     def add_terminal(self, name):
         name = name.strip()
@@ -317,12 +345,46 @@ class Grammar:
         term = Terminal(name, self)
         self.terminals.append(term)
         self.symbol_dict[name] = term
+        self._fingerprint = None
         return term
 
     def add_terminals(self, names):
         ans = tuple((self.add_terminal(x) for x in names.strip().split()))
         return ans
 
+    def add_precedence(self, associativity, *terminals):
+        """
+        Declare a new precedence level, higher than every level declared
+        before, the way `%left`, `%right` and `%nonassoc` do in yacc.
+        """
+        assert associativity in (
+            "left",
+            "right",
+            "nonassoc",
+        ), "Associativity must be 'left', 'right' or 'nonassoc'"
+        assert all(t.is_terminal for t in terminals), "Only terminals have precedence"
+
+        self.precedence_levels += 1
+        for terminal in terminals:
+            self.precedence[terminal] = (self.precedence_levels, associativity)
+        self._fingerprint = None
+
+    def set_production_precedence(self, production, terminal):
+        """Give `production` the precedence of `terminal` (yacc's `%prec`)."""
+        assert terminal in self.precedence, "The terminal has no declared precedence"
+        self.production_precedence[production] = terminal
+        self._fingerprint = None
+
+    def get_precedence(self, production):
+        try:
+            terminal = self.production_precedence[production]
+        except KeyError:
+            terminals = [s for s in production.right if s.is_terminal]
+            if not terminals:
+                return None
+            terminal = terminals[-1]
+        return self.precedence.get(terminal)
+
     def __str__(self):
         mul = "%s, "
 
@@ -407,9 +469,62 @@ class Grammar:
         g.epsilon = self.epsilon
         g.eof = self.eof
         g.symbol_dict = self.symbol_dict.copy()
+        g.precedence = self.precedence.copy()
+        g.production_precedence = self.production_precedence.copy()
+        g.precedence_levels = self.precedence_levels
 
         return g
 
+    @property
+    def fingerprint(self):
+        """
+        SHA-256 of the grammar's content: symbols, productions (in order),
+        start symbol and precedence declarations. Equal grammars built
+        separately, e.g. parsed from the same text, share it.
+
+        It is computed once and kept until the grammar changes through its
+        methods or an assignment to one of its attributes.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = self.__fingerprint()
+        return self._fingerprint
+
+    def __fingerprint(self):
+        productions = []
+        for production in self.productions:
+            body = [s.name for s in production.right]
+            if isinstance(production, AttributedProduction):
+                body.append([_function_key(a) for a in production.attributes])
+            productions.append([production.left.name, body])
+
+        content = {
+            "start_symbol": self.start_symbol and self.start_symbol.name,
+            "nonterminals": [s.name for s in self.nonterminals],
+            "terminals": [s.name for s in self.terminals],
+            "productions": productions,
+            "precedence": sorted(
+                [t.name, level, assoc] for t, (level, assoc) in self.precedence.items()
+            ),
+            "production_precedence": sorted(
+                [self.productions.index(p), t.name]
+                for p, t in self.production_precedence.items()
+            ),
+        }
+        data = json.dumps(content, separators=(",", ":"))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def freeze(self):
+        """
+        Immutable snapshot of the grammar. Snapshots are interned by
+        fingerprint, so freezing equal grammars gives the same object.
+        """
+        fingerprint = self.fingerprint
+        try:
+            return _frozen_grammars[fingerprint]
+        except KeyError:
+            frozen = _frozen_grammars[fingerprint] = FrozenGrammar(self, fingerprint)
+            return frozen
+
     @property
     def is_augmented_grammar(self):
         augmented = 0
@@ -436,6 +551,26 @@ class Grammar:
         else:
             return self.copy()
 
+    def get_entries_augmented_grammar(self, entries):
+        """
+        Augment a copy of the grammar with a start production `s'X -> X` for
+        every nonterminal X in `entries`. Returns the copy and its augmented
+        start symbols, in the same order as `entries`.
+        """
+        g = self.copy()
+        g.start_symbol = None
+
+        start_symbols = []
+        for i, entry in enumerate(entries):
+            ss = g.add_nonterminal("s'" + entry.name, i == 0)
+            if g.ptype is AttributedProduction:
+                ss %= entry + g.epsilon, lambda x: x
+            else:
+                ss %= entry + g.epsilon
+            start_symbols.append(ss)
+
+        return g, start_symbols
+
 
 class Item:
     def __init__(self, production, pos, lookaheads=[]):
@@ -493,3 +628,107 @@ class Item:
 
     def center(self):
         return Item(self.production, self.pos)
+
+
+_frozen_grammars = weakref.WeakValueDictionary()
+
+
+def _function_key(function):
+    """
+    Stable description of an attribute function: where it is defined, its
+    code and the values it closes over.
+    """
+    if function is None:
+        return None
+    code = getattr(function, "__code__", None)
+    if code is None:
+        return [type(function).__qualname__, repr(function)]
+
+    closure = []
+    for cell in function.__closure__ or ():
+        try:
+            closure.append(repr(cell.cell_contents))
+        except ValueError:  # empty cell
+            closure.append(None)
+    return [function.__module__, function.__qualname__, _code_digest(code), closure]
+
+
+def _code_digest(code):
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            digest.update(_code_digest(const).encode())
+        else:
+            digest.update(repr(const).encode())
+    return digest.hexdigest()
+
+
+def _copy_content(grammar, target):
+    """
+    Copy the symbols, productions and precedence declarations of `grammar`
+    into the empty grammar `target`, as new objects that belong to it.
+    """
+    symbols = {grammar.epsilon: target.epsilon, grammar.eof: target.eof}
+    for t in grammar.terminals:
+        symbols[t] = Terminal(t.name, target)
+        target.terminals.append(symbols[t])
+    for nt in grammar.nonterminals:
+        symbols[nt] = NonTerminal(nt.name, target)
+        target.nonterminals.append(symbols[nt])
+    for symbol in target.terminals + target.nonterminals:
+        target.symbol_dict[symbol.name] = symbol
+
+    productions = {}
+    for production in grammar.productions:
+        left = symbols[production.left]
+        if production.is_epsilon:
+            right = target.epsilon
+        else:
+            right = Sentence(*(symbols[s] for s in production.right))
+        if isinstance(production, AttributedProduction):
+            copy = AttributedProduction(left, right, production.attributes)
+        else:
+            copy = Production(left, right)
+        productions[production] = copy
+        left.productions.append(copy)
+        target.productions.append(copy)
+
+    target.ptype = grammar.ptype
+    target.start_symbol = grammar.start_symbol and symbols[grammar.start_symbol]
+    target.precedence = {symbols[t]: v for t, v in grammar.precedence.items()}
+    target.production_precedence = {
+        productions[p]: symbols[t] for p, t in grammar.production_precedence.items()
+    }
+    target.precedence_levels = grammar.precedence_levels
+
+
+class FrozenGrammar(Grammar):
+    """
+    Read-only grammar with its own symbols, so later changes to the grammar
+    it was taken from do not leak into it. `copy()` gives back a mutable
+    grammar with symbols of its own as well.
+    """
+
+    def __init__(self, grammar, fingerprint=None):
+        super().__init__()
+        _copy_content(grammar, self)
+        self._frozen_fingerprint = fingerprint or grammar.fingerprint
+
+    @property
+    def fingerprint(self):
+        return self._frozen_fingerprint
+
+    def freeze(self):
+        return self
+
+    def copy(self):
+        g = Grammar()
+        _copy_content(self, g)
+        return g
+
+    def __frozen(self, *args, **kwargs):
+        raise TypeError("A frozen grammar cannot be modified")
+
+    add_nonterminal = add_terminal = add_production = remove_production = __frozen
+    add_precedence = set_production_precedence = __frozen
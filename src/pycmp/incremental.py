@@ -0,0 +1,555 @@
+from collections import Counter
+from pycmp.utils import ContainerSet
+from pycmp.lexer import IncrementalLexer
+from pycmp.parsing import compute_local_first
+
+
+class FactGraph:
+    """
+    Sets of facts on the nodes of a graph: every node holds its base facts
+    and every fact of its predecessors. Base facts and edges are counted, so
+    several rules may support the same one, and kept up to date under
+    insertions and deletions (delete-rederive).
+
+    `values[node]` is the set of facts of `node`; it is updated in place.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.base = {}
+        self.successors = {}
+        self.predecessors = {}
+
+    def add_node(self, node, values):
+        self.values[node] = values
+        self.base[node] = Counter()
+        self.successors[node] = Counter()
+        self.predecessors[node] = Counter()
+
+    def update(self, added_base=(), removed_base=(), added_edges=(), removed_edges=()):
+        """
+        Apply a delta: `(node, fact)` pairs of base facts and `(origin, dest)`
+        edges. Returns the nodes whose set of facts changed.
+        """
+        removed, added = {}, {}
+
+        def delete(node, fact):
+            if fact in added.get(node, ()):
+                added[node].discard(fact)
+            else:
+                removed.setdefault(node, set()).add(fact)
+            self.values[node].discard(fact)
+
+        def insert(node, fact):
+            if fact in removed.get(node, ()):
+                removed[node].discard(fact)
+            else:
+                added.setdefault(node, set()).add(fact)
+            self.values[node].add(fact)
+
+        # Over-delete everything that may have been derived from the removed
+        # base facts and edges
+        pending = []
+        for node, fact in removed_base:
+            self.base[node][fact] -= 1
+            if not self.base[node][fact]:
+                del self.base[node][fact]
+                pending.append((node, fact))
+        for origin, dest in removed_edges:
+            self.successors[origin][dest] -= 1
+            self.predecessors[dest][origin] -= 1
+            if not self.successors[origin][dest]:
+                del self.successors[origin][dest]
+                del self.predecessors[dest][origin]
+                pending.extend((dest, fact) for fact in self.values[origin])
+
+        deleted = []
+        while pending:
+            node, fact = pending.pop()
+            if fact not in self.values[node]:
+                continue
+            delete(node, fact)
+            deleted.append((node, fact))
+            pending.extend((dest, fact) for dest in self.successors[node])
+
+        # Rederive what still has a base fact or a predecessor holding it,
+        # along with the new base facts and edges
+        for node, fact in added_base:
+            self.base[node][fact] += 1
+            pending.append((node, fact))
+        for origin, dest in added_edges:
+            self.successors[origin][dest] += 1
+            self.predecessors[dest][origin] += 1
+            pending.extend((dest, fact) for fact in self.values[origin])
+        for node, fact in deleted:
+            if fact in self.base[node] or any(
+                fact in self.values[origin] for origin in self.predecessors[node]
+            ):
+                pending.append((node, fact))
+
+        while pending:
+            node, fact = pending.pop()
+            if fact in self.values[node]:
+                continue
+            insert(node, fact)
+            pending.extend((dest, fact) for dest in self.successors[node])
+
+        return {node for node, facts in removed.items() if facts} | {
+            node for node, facts in added.items() if facts
+        }
+
+
+class IncrementalAnalysis:
+    """
+    Nullable nonterminals, First and Follow of a grammar kept up to date
+    while productions are added and removed.
+
+    `firsts` and `follows` are always equal to what `compute_firsts` and
+    `compute_follows` return for the current grammar. Every production is
+    turned into rules (the nullable prefix of its right side feeds the First
+    of its left side, and every nonterminal of the right side gets a Follow
+    from the suffix after it), and an edit only recomputes the rules of the
+    productions it touches and of those using a symbol whose First or
+    nullability changed. Removals are propagated by delete-rederive.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.firsts = {}
+        self.follows = {}
+        self.nullable = set()
+        self.occurrences = {}
+        self.right_sides = Counter()
+        self.first_graph = FactGraph()
+        self.follow_graph = FactGraph()
+        self.first_rules = {}
+        self.follow_rules = {}
+        self._n_terminals = self._n_nonterminals = 0
+
+        self._sync_symbols()
+        start = grammar.start_symbol
+        if start is not None:
+            self.follows[start].set.add(grammar.eof)
+            self.follow_graph.base[start][grammar.eof] += 1
+        self._update(list(grammar.productions), [])
+
+    def add_production(self, production):
+        self.apply(added=[production])
+
+    def remove_production(self, production):
+        self.apply(removed=[production])
+
+    def apply(self, added=(), removed=()):
+        """Remove the productions in `removed` and add those in `added` to the
+        grammar, then update the analysis."""
+        grammar = self.grammar
+        removed = [grammar.remove_production(production) for production in removed]
+        for production in added:
+            grammar.add_production(production)
+        self._update(list(added), removed)
+
+    def _sync_symbols(self):
+        """Pick up the symbols added to the grammar since the last edit."""
+        grammar = self.grammar
+        for terminal in grammar.terminals[self._n_terminals :]:
+            self.firsts[terminal] = ContainerSet(terminal)
+        for nonterminal in grammar.nonterminals[self._n_nonterminals :]:
+            self.firsts[nonterminal] = ContainerSet()
+            self.follows[nonterminal] = ContainerSet()
+            self.first_graph.add_node(nonterminal, self.firsts[nonterminal].set)
+            self.follow_graph.add_node(nonterminal, self.follows[nonterminal].set)
+        self._n_terminals = len(grammar.terminals)
+        self._n_nonterminals = len(grammar.nonterminals)
+
+    def _update(self, added, removed):
+        self._sync_symbols()
+
+        for production in removed:
+            for symbol in set(production.right):
+                del self.occurrences[symbol][id(production)]
+            right = production.right
+            self.right_sides[right] -= 1
+            if not self.right_sides[right]:
+                del self.right_sides[right]
+                del self.firsts[right]
+        for production in added:
+            for symbol in production.right:
+                self.occurrences.setdefault(symbol, {})[id(production)] = production
+            self.right_sides[production.right] += 1
+
+        changed = self._update_nullable(added, removed)
+        touched = self._users(changed)
+        first_changed = self._update_rules(
+            self.first_graph,
+            self.first_rules,
+            self._first_rule,
+            added,
+            removed,
+            touched,
+        )
+        changed |= first_changed
+
+        for production in added + list(self._users(changed).values()):
+            right = production.right
+            self.firsts[right] = compute_local_first(self.firsts, right)
+
+        touched = self._users(changed)
+        self._update_rules(
+            self.follow_graph,
+            self.follow_rules,
+            self._follow_rule,
+            added,
+            removed,
+            touched,
+        )
+
+    def _users(self, symbols):
+        """Productions using any of `symbols` in their right side, by id."""
+        users = {}
+        for symbol in symbols:
+            users.update(self.occurrences.get(symbol, {}))
+        return users
+
+    def _is_nullable(self, symbol):
+        return symbol in self.nullable
+
+    def _update_nullable(self, added, removed):
+        """Nullable nonterminals by delete-rederive. Returns the nonterminals
+        whose nullability changed."""
+        nullable = self.nullable
+        before = {}
+
+        def set_nullable(symbol, value):
+            before.setdefault(symbol, symbol in nullable)
+            if value:
+                nullable.add(symbol)
+            else:
+                nullable.discard(symbol)
+            self.firsts[symbol].set_epsilon(value)
+
+        pending = [p.left for p in removed if p.left in nullable]
+        deleted = []
+        while pending:
+            symbol = pending.pop()
+            if symbol not in nullable:
+                continue
+            set_nullable(symbol, False)
+            deleted.append(symbol)
+            pending.extend(p.left for p in self.occurrences.get(symbol, {}).values())
+
+        pending = [p.left for p in added if all(map(self._is_nullable, p.right))]
+        pending.extend(
+            symbol
+            for symbol in deleted
+            if any(all(map(self._is_nullable, p.right)) for p in symbol.productions)
+        )
+        while pending:
+            symbol = pending.pop()
+            if symbol in nullable:
+                continue
+            set_nullable(symbol, True)
+            for p in self.occurrences.get(symbol, {}).values():
+                if p.left not in nullable and all(map(self._is_nullable, p.right)):
+                    pending.append(p.left)
+
+        return {
+            symbol for symbol, value in before.items() if value != (symbol in nullable)
+        }
+
+    def _update_rules(self, graph, rules, build_rule, added, removed, touched):
+        """Recompute the rules of the touched productions, apply the
+        difference to `graph` and return the nodes that changed."""
+        old_base, old_edges = Counter(), Counter()
+        new_base, new_edges = Counter(), Counter()
+
+        for production in removed:
+            base, edges = rules.pop(id(production))
+            old_base.update(base)
+            old_edges.update(edges)
+        for key, production in touched.items():
+            base, edges = rules.get(key, ((), ()))
+            old_base.update(base)
+            old_edges.update(edges)
+            rules[key] = base, edges = build_rule(production)
+            new_base.update(base)
+            new_edges.update(edges)
+        for production in added:
+            if id(production) in touched:
+                continue
+            rules[id(production)] = base, edges = build_rule(production)
+            new_base.update(base)
+            new_edges.update(edges)
+
+        return graph.update(
+            (new_base - old_base).elements(),
+            (old_base - new_base).elements(),
+            (new_edges - old_edges).elements(),
+            (old_edges - new_edges).elements(),
+        )
+
+    def _first_rule(self, production):
+        """First of the left side gets the terminals and the First of the
+        nonterminals in the nullable prefix of the right side."""
+        left = production.left
+        base, edges = [], []
+        for symbol in production.right:
+            if symbol.is_terminal:
+                base.append((left, symbol))
+                break
+            edges.append((symbol, left))
+            if symbol not in self.nullable:
+                break
+        return base, edges
+
+    def _follow_rule(self, production):
+        """Follow of every nonterminal in the right side gets the First of
+        the suffix after it, and the Follow of the left side if the suffix is
+        nullable."""
+        left = production.left
+        base, edges = [], []
+        first, nullable = set(), True
+        for symbol in reversed(production.right):
+            if symbol.is_nonterminal:
+                base.extend((symbol, t) for t in first)
+                if nullable:
+                    edges.append((left, symbol))
+            if symbol in self.nullable:
+                first = first | self.firsts[symbol].set
+            else:
+                first = set(self.firsts[symbol].set)
+                nullable = False
+        return base, edges
+
+
+class ParseNode:
+    """
+    Node of the parse tree built by `IncrementalParser`: a token, or a
+    reduction by `production` over `children`. `size` is the number of
+    tokens it spans and `state` the state the parser was in before its
+    first token.
+    """
+
+    def __init__(self, state, token=None, production=None, children=()):
+        self.state = state
+        self.token = token
+        self.production = production
+        self.children = children
+        self.size = 1 if production is None else sum(c.size for c in children)
+        self.evaluated = False
+        self.value = None
+
+    @property
+    def symbol(self):
+        return self.token.ttype if self.production is None else self.production.left
+
+    def __iter__(self):
+        """Nodes in postorder."""
+        pending = [(self, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if expanded or node.production is None:
+                yield node
+                continue
+            pending.append((node, True))
+            pending.extend((child, False) for child in reversed(node.children))
+
+    def evaluate(self):
+        """
+        Value of the synthesized attributes, as `evaluate_reverse_parse`
+        computes them. Values are kept on the nodes and evaluated subtrees
+        are not entered, so only the nodes built since the last call are
+        visited.
+        """
+        pending = [(self, False)]
+        while pending:
+            node, expanded = pending.pop()
+            if node.evaluated:
+                continue
+            if node.production is None:
+                node.value = node.token.lex
+            elif not expanded:
+                pending.append((node, True))
+                pending.extend((child, False) for child in reversed(node.children))
+                continue
+            else:
+                rule = node.production.attributes[0]
+                values = [None] + [child.value for child in node.children]
+                node.value = rule(None, values if node.children else None)
+            node.evaluated = True
+        return self.value
+
+
+class IncrementalParser:
+    """
+    Shift-reduce parsing with the tables of `parser` that reuses the parse
+    tree of the previous tokens, after Wagner and Graham.
+
+    The old tree is walked left to right alongside the new tokens. A
+    subtree starting at the current token is shifted whole, as its
+    nonterminal, when it was built from the same state and neither its
+    tokens nor the lookahead after them changed: the parser would build it
+    again step by step. Otherwise it is broken down into its children.
+
+    The work is that of parsing the edited tokens, plus one step for every
+    node on the way from the root down to the edit, which is broken down,
+    and for every sibling of those nodes, which is shifted whole. That is
+    logarithmic in the length of the text for balanced trees, but linear in
+    the number of items after the edit for a list built by a left-recursive
+    rule such as `L -> L S`, whose spine is rebuilt past the edit.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.tokens = []
+        self.tree = None
+        self.reused = 0
+        self._right_parse = None
+
+    def parse(self, tokens):
+        """Parse `tokens` from scratch."""
+        self.tree = None
+        return self.reparse(tokens, 0, len(self.tokens), len(tokens))
+
+    def update(self, tokens):
+        """Reparse after the tokens changed to `tokens`."""
+        old = self.tokens
+        first = 0
+        limit = min(len(old), len(tokens))
+        while first < limit and old[first] == tokens[first]:
+            first += 1
+        common = 0
+        while common < limit - first and old[-common - 1] == tokens[-common - 1]:
+            common += 1
+        return self.reparse(tokens, first, len(old) - common, len(tokens) - common)
+
+    def reparse(self, tokens, first, old_stop, new_stop):
+        """
+        Parse `tokens`, where `tokens[first:new_stop]` replaced
+        `self.tokens[first:old_stop]`, and return the new tree.
+        """
+        action, goto = self.parser.action, self.parser.goto
+        SHIFT, REDUCE, OK = self.parser.SHIFT, self.parser.REDUCE, self.parser.OK
+
+        old = [] if self.tree is None else [self.tree]
+        old_position = 0
+        delta = new_stop - old_stop
+        self.tokens, self.tree, self.reused = tokens, None, 0
+        self._right_parse = None
+
+        states, nodes, cursor = [0], [], 0
+        while True:
+            state = states[-1]
+
+            # Position of the current token in the old tokens, if unchanged
+            if cursor < first:
+                position, clean = cursor, first
+            elif cursor >= new_stop:
+                position, clean = cursor - delta, None
+            else:
+                position = None
+
+            reusable = None
+            while old and position is not None:
+                node = old[-1]
+                if old_position + node.size <= position:
+                    old.pop()
+                    old_position += node.size
+                    continue
+                if old_position == position:
+                    if node.production is None:
+                        break
+                    if node.state == state and (
+                        clean is None or position + node.size < clean
+                    ):
+                        reusable = node
+                        break
+                old.pop()
+                old.extend(reversed(node.children))
+
+            if reusable is not None:
+                old.pop()
+                old_position += reusable.size
+                states.append(goto[state, reusable.production.left])
+                nodes.append(reusable)
+                cursor += reusable.size
+                self.reused += 1
+                continue
+
+            token = tokens[cursor]
+            try:
+                kind, tag = action[state, token.ttype]
+            except KeyError:
+                raise Exception("Parsing error")
+
+            if kind == SHIFT:
+                states.append(tag)
+                nodes.append(ParseNode(state, token))
+                cursor += 1
+            elif kind == REDUCE:
+                count = len(tag.right)
+                children = tuple(nodes[len(nodes) - count :])
+                del states[len(states) - count :]
+                del nodes[len(nodes) - count :]
+                nodes.append(ParseNode(states[-1], production=tag, children=children))
+                states.append(goto[states[-1], tag.left])
+            elif kind == OK:
+                break
+
+        self.tree = nodes[-1]
+        return self.tree
+
+    def right_parse(self):
+        """The productions in the order the parser reduced by them, as the
+        shift-reduce parsers return them. It spans the whole tree, so it is
+        built once per parse."""
+        if self._right_parse is None:
+            self._right_parse = [
+                node.production for node in self.tree if node.production is not None
+            ]
+        return list(self._right_parse)
+
+
+class IncrementalDocument:
+    """
+    Text parsed by `parser` over the tokens of `lexer`, kept up to date under
+    edits: only the damaged tokens are lexed again and the reparse reuses
+    what it can of the previous tree.
+    """
+
+    def __init__(self, lexer, parser, text=""):
+        self.lexer = IncrementalLexer(lexer, text)
+        self.parser = IncrementalParser(parser)
+        self.parser.parse(self.lexer.tokens)
+
+    @property
+    def text(self):
+        return self.lexer.text
+
+    @property
+    def tree(self):
+        return self.parser.tree
+
+    def edit(self, start, end, text):
+        """Replace the text between `start` and `end` with `text` and return
+        the new tree."""
+        first, old_stop, new_stop = self.lexer.edit(start, end, text)
+        return self.parser.reparse(self.lexer.tokens, first, old_stop, new_stop)
+
+    def update(self, text):
+        """Edit the text into `text`, replacing what lies between their
+        common prefix and suffix."""
+        old = self.text
+        start = _common_prefix(old, text)
+        common = _common_prefix(old[start:][::-1], text[start:][::-1])
+        return self.edit(start, len(old) - common, text[start : len(text) - common])
+
+
+def _common_prefix(a, b):
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
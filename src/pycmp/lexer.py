@@ -1,11 +1,19 @@
+from bisect import bisect_left, bisect_right
 from pycmp.token import Token
 from pycmp.regex import Regex
 from pycmp.automata import State
 
 
 class Lexer:
-    def __init__(self, table, eof):
+    """
+    Longest-match lexer over `table`, a list of `(token_type, regex)` pairs
+    where earlier entries win ties. Tokens whose type is in `ignore` are
+    matched but left out of the output.
+    """
+
+    def __init__(self, table, eof, ignore=()):
         self.eof = eof
+        self.ignore = set(ignore)
         self.regexs = self._build_regexs(table)
         self.automaton = self._build_automaton()
 
@@ -22,38 +30,173 @@ class Lexer:
         return regexs
 
     def _build_automaton(self):
+        """
+        Deterministic automaton of the union of the regexs, minimized. Every
+        final state is tagged with the `(n, token_type)` of the first regex
+        it accepts, and only states with the same tag are merged.
+        """
         start = State("start")
         for state in self.regexs:
             start.add_epsilon_transition(state)
-        return start.to_deterministic()
 
-    def _walk(self, string):
+        automaton = start.to_deterministic()
+        for state in automaton.reachable():
+            tags = [s.tag for s in state.state if s.tag]
+            state.tag = min(tags, key=lambda tag: tag[0]) if tags else None
+        return automaton.minimize(key=lambda state: state.tag)
+
+    def _walk(self, text, start=0):
+        """
+        Longest match at `start`: returns the final state reached (or None),
+        where the match ends and how far the text was read, one past the
+        last character looked at. Reading up to the end of the text counts
+        as looking at what follows it.
+        """
         state = self.automaton
         final = state if state.final else None
-        final_lex = lex = ""
+        end = start
 
-        for symbol in string:
+        for i in range(start, len(text)):
+            symbol = text[i]
             if not state.has_transition(symbol):
-                break
+                return final, end, i + 1
             state = state[symbol][0]
-            lex += symbol
             if state.final:
-                final = state
-                final_lex = lex
+                final, end = state, i + 1
 
-        return final, final_lex
+        return final, end, len(text) + 1
 
-    def _tokenize(self, text):
-        i = 0
+    def _scan(self, text, start=0):
+        """
+        Yield `(token_type, start, end, reach)` for the tokens from `start`
+        on, ignored ones included, with `reach` as returned by `_walk`. The
+        last one is the eof, placed where lexing stopped.
+        """
+        i = start
         while True:
-            state, lex = self._walk(text[i:])
+            state, end, reach = self._walk(text, i)
             if not state:
                 break
-            i += len(lex)
-            highest = min([s for s in state.state if s.tag], key=lambda s: s.tag[0])
-            yield lex, highest.tag[1]
+            yield state.tag[1], i, end, reach
+            i = end
+
+        yield self.eof, i, i, reach
 
-        yield "$", self.eof
+    def _tokenize(self, text):
+        for ttype, start, end, _ in self._scan(text):
+            if ttype is self.eof:
+                yield "$", ttype
+            elif ttype not in self.ignore:
+                yield text[start:end], ttype
 
     def __call__(self, text):
         return [Token(lex, ttype) for lex, ttype in self._tokenize(text)]
+
+
+class IncrementalLexer:
+    """
+    The tokens of a text kept up to date under edits by `lexer`.
+
+    An edit relexes from the last token that could not have looked at the
+    edited characters, and stops as soon as a new token starts where an
+    old one did past the edit: from there on, the old tokens are kept.
+    `tokens[i]` spans `text[starts[i]:ends[i]]`; the eof sits where lexing
+    stopped.
+
+    The offsets of the tokens before a gap are kept from the start of the
+    text and those after it from the end, so the tokens past an edit keep
+    theirs. Each edit moves the gap to the tokens it replaces, which costs
+    the number of tokens between it and the previous edit.
+    """
+
+    def __init__(self, lexer, text=""):
+        self.lexer = lexer
+        self.text = ""
+        self.tokens = []
+        self._starts = []
+        self._ends = []
+        self._gap = 0
+        # Characters looked at past the end of a token, at most
+        self.lookahead = 1
+        self.edit(0, 0, text)
+
+    @property
+    def starts(self):
+        return [self.start(i) for i in range(len(self.tokens))]
+
+    @property
+    def ends(self):
+        return [self.end(i) for i in range(len(self.tokens))]
+
+    def start(self, i):
+        return self.__offset(self._starts, i)
+
+    def end(self, i):
+        return self.__offset(self._ends, i)
+
+    def __offset(self, offsets, i):
+        return offsets[i] if i < self._gap else offsets[i] + len(self.text)
+
+    def __bisect(self, bisect, offsets, position, lo=0):
+        """`bisect` over the offsets as if they all were from the start."""
+        gap = max(lo, self._gap)
+        i = bisect(offsets, position, lo, gap)
+        if i < gap:
+            return i
+        return bisect(offsets, position - len(self.text), gap)
+
+    def __move_gap(self, gap):
+        length = len(self.text)
+        starts, ends = self._starts, self._ends
+        for i in range(self._gap, gap):
+            starts[i] += length
+            ends[i] += length
+        for i in range(gap, self._gap):
+            starts[i] -= length
+            ends[i] -= length
+        self._gap = gap
+
+    def edit(self, start, end, text):
+        """
+        Replace `self.text[start:end]` with `text`. Returns `(first, old_stop,
+        new_stop)`: the old `tokens[first:old_stop]` were replaced by the new
+        `tokens[first:new_stop]`.
+        """
+        assert 0 <= start <= end <= len(self.text), "Edit out of the text"
+        lexer = self.lexer
+        new = self.text[:start] + text + self.text[end:]
+        delta = len(text) - (end - start)
+
+        first = self.__bisect(bisect_right, self._ends, start - self.lookahead)
+        if first == len(self.tokens):
+            first = max(first - 1, 0)
+        i = self.end(first - 1) if first else 0
+
+        tokens, starts, ends = [], [], []
+        stop = len(self.tokens)
+        for ttype, token_start, token_end, reach in lexer._scan(new, i):
+            self.lookahead = max(self.lookahead, reach - token_end)
+            if token_start >= end + delta:
+                old_start = token_start - delta
+                j = self.__bisect(bisect_left, self._starts, old_start, first)
+                if j < stop and self.start(j) == old_start:
+                    stop = j
+                    break
+            if ttype is lexer.eof:
+                tokens.append(Token("$", ttype))
+            elif ttype not in lexer.ignore:
+                tokens.append(Token(new[token_start:token_end], ttype))
+            else:
+                continue
+            starts.append(token_start)
+            ends.append(token_end)
+
+        # The tokens kept after the edit are counted from the end: they keep
+        # their offsets, and the new ones go right before the gap
+        self.__move_gap(stop)
+        self.text = new
+        self.tokens[first:stop] = tokens
+        self._starts[first:stop] = starts
+        self._ends[first:stop] = ends
+        self._gap = first + len(tokens)
+        return first, stop, first + len(tokens)
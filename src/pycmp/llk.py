@@ -0,0 +1,362 @@
+from pycmp.exceptions import LLkLimitError
+
+
+class PrefixTrie:
+    """
+    Set of terminal-id strings of length <= k stored as a prefix tree.
+
+    A `final` node marks the end of a string. Nodes at depth k are always
+    final: they stand for every string having that prefix. Nodes shallower
+    than k are final only when a whole (shorter) string ends there.
+    """
+
+    __slots__ = ("children", "final")
+
+    def __init__(self, final=False):
+        self.children = {}
+        self.final = final
+
+    @staticmethod
+    def from_strings(*strings):
+        trie = PrefixTrie()
+        for string in strings:
+            trie.add(string)
+        return trie
+
+    def add(self, string):
+        node = self
+        for symbol in string:
+            try:
+                node = node.children[symbol]
+            except KeyError:
+                node.children[symbol] = node = PrefixTrie()
+        changed = not node.final
+        node.final = True
+        return changed
+
+    def update(self, other, room):
+        """Union `other` truncated to `room` symbols into this trie."""
+        changed = other.final and not self.final
+        if room == 0:
+            if not self.final and (other.final or other.children):
+                self.final = changed = True
+            return changed
+
+        self.final |= other.final
+        for symbol, other_child in other.children.items():
+            try:
+                child = self.children[symbol]
+            except KeyError:
+                child = self.children[symbol] = PrefixTrie()
+                changed = True
+            changed |= child.update(other_child, room - 1)
+        return changed
+
+    def concat(self, other, k):
+        """Return the k-truncated concatenation `self . other`."""
+        result = PrefixTrie()
+        self._concat_into(result, other, k, 0)
+        return result
+
+    def _concat_into(self, result, other, k, depth):
+        if self.final:
+            if depth == k:
+                result.final = True
+            else:
+                result.update(other, k - depth)
+        for symbol, child in self.children.items():
+            try:
+                result_child = result.children[symbol]
+            except KeyError:
+                result_child = result.children[symbol] = PrefixTrie()
+            child._concat_into(result_child, other, k, depth + 1)
+
+    def is_saturated(self, k, depth=0):
+        """True when every string has exactly k symbols (further concatenation is a no-op)."""
+        if depth == k:
+            return True
+        if self.final:
+            return False
+        return all(c.is_saturated(k, depth + 1) for c in self.children.values())
+
+    @property
+    def size(self):
+        return 1 + sum(child.size for child in self.children.values())
+
+    def __iter__(self):
+        stack = [((), self)]
+        while stack:
+            prefix, node = stack.pop()
+            if node.final:
+                yield prefix
+            for symbol, child in node.children.items():
+                stack.append((prefix + (symbol,), child))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PrefixTrie)
+            and self.final == other.final
+            and self.children == other.children
+        )
+
+    def __str__(self):
+        return str(sorted(self))
+
+    def __repr__(self):
+        return str(self)
+
+
+class DecisionNode:
+    """
+    Node of a per-nonterminal prediction trie.
+
+    Exactly one of `production` (the prediction is settled), `conflicts`
+    (productions that cannot be told apart) or `children` (read one more
+    terminal id) is meaningful.
+    """
+
+    __slots__ = ("production", "conflicts", "children")
+
+    def __init__(self, production=None, conflicts=None):
+        self.production = production
+        self.conflicts = conflicts
+        self.children = {}
+
+    @property
+    def depth(self):
+        if not self.children:
+            return 0
+        return 1 + max(child.depth for child in self.children.values())
+
+
+class LLkStats:
+    def __init__(self):
+        self.iterations = 0
+        self.concatenations = 0
+        self.max_set_nodes = 0
+        self.total_nodes = {}
+
+    def observe(self, k, trie, max_nodes):
+        nodes = trie.size
+        self.max_set_nodes = max(self.max_set_nodes, nodes)
+        if max_nodes is not None and nodes > max_nodes:
+            raise LLkLimitError(
+                f"A FIRST/FOLLOW set for k={k} grew to {nodes} trie nodes "
+                f"(limit is {max_nodes})",
+                self,
+            )
+        return nodes
+
+    def __str__(self):
+        return (
+            f"iterations={self.iterations}, concatenations={self.concatenations}, "
+            f"max_set_nodes={self.max_set_nodes}, total_nodes={self.total_nodes}"
+        )
+
+    def __repr__(self):
+        return str(self)
+
+
+class LLkTable:
+    def __init__(self, grammar, ids, decisions, k, stats):
+        self.grammar = grammar
+        self.ids = ids
+        self.decisions = decisions
+        self.k = k
+        self.stats = stats
+
+    @property
+    def conflicts(self):
+        return {
+            nonterminal: conflicts
+            for nonterminal, decision in self.decisions.items()
+            for conflicts in [list(_decision_conflicts(decision))]
+            if conflicts
+        }
+
+    @property
+    def is_llk(self):
+        return not self.conflicts
+
+
+def terminal_ids(grammar):
+    return {t: i for i, t in enumerate(grammar.terminals + [grammar.eof])}
+
+
+def compute_firsts_k(grammar, k, ids=None, max_nodes=None, stats=None):
+    ids = terminal_ids(grammar) if ids is None else ids
+    stats = LLkStats() if stats is None else stats
+
+    firsts = {t: PrefixTrie.from_strings((i,)) for t, i in ids.items()}
+    for nonterminal in grammar.nonterminals:
+        firsts[nonterminal] = PrefixTrie()
+
+    change = True
+    while change:
+        change = False
+        stats.iterations += 1
+
+        for production in grammar.productions:
+            local_first = compute_local_first_k(firsts, production.right, k, stats)
+            change |= firsts[production.left].update(local_first, k)
+            stats.observe(k, firsts[production.left], max_nodes)
+
+    return firsts
+
+
+def compute_local_first_k(firsts, alpha, k, stats=None):
+    first_alpha = PrefixTrie(final=True)
+    for symbol in alpha:
+        if first_alpha.is_saturated(k):
+            break
+        first_alpha = first_alpha.concat(firsts[symbol], k)
+        if stats is not None:
+            stats.concatenations += 1
+    return first_alpha
+
+
+def compute_follows_k(grammar, firsts, k, ids=None, max_nodes=None, stats=None):
+    ids = terminal_ids(grammar) if ids is None else ids
+    stats = LLkStats() if stats is None else stats
+
+    follows = {nonterminal: PrefixTrie() for nonterminal in grammar.nonterminals}
+    follows[grammar.start_symbol] = PrefixTrie.from_strings((ids[grammar.eof],))
+
+    local_firsts = {}
+
+    change = True
+    while change:
+        change = False
+        stats.iterations += 1
+
+        # X -> zeta Y beta: First_k(beta . Follow_k(X)) subset of Follow_k(Y)
+        for production in grammar.productions:
+            x, alpha = production
+            for i, y in enumerate(alpha):
+                if not y.is_nonterminal:
+                    continue
+                beta = alpha[i + 1 :]
+                try:
+                    first_beta = local_firsts[beta]
+                except KeyError:
+                    first_beta = local_firsts[beta] = compute_local_first_k(
+                        firsts, beta, k, stats
+                    )
+                follow_y = first_beta.concat(follows[x], k)
+                stats.concatenations += 1
+                change |= follows[y].update(follow_y, k)
+                stats.observe(k, follows[y], max_nodes)
+
+    return follows
+
+
+def compute_lookaheads_k(grammar, firsts, follows, k, stats=None):
+    lookaheads = {}
+    for production in grammar.productions:
+        first_alpha = compute_local_first_k(firsts, production.right, k, stats)
+        lookaheads[production] = first_alpha.concat(follows[production.left], k)
+    return lookaheads
+
+
+def build_decision_trie(productions, lookaheads):
+    return _build_decision_node([(p, lookaheads[p]) for p in productions])
+
+
+def _build_decision_node(pairs):
+    candidates = list(dict.fromkeys(p for p, _ in pairs))
+    if len(candidates) == 1:
+        return DecisionNode(production=candidates[0])
+
+    node = DecisionNode()
+    finals = list(dict.fromkeys(p for p, trie in pairs if trie.final))
+    if len(finals) > 1:
+        node.conflicts = finals
+        return node
+
+    symbols = dict.fromkeys(s for _, trie in pairs for s in trie.children)
+    for symbol in symbols:
+        node.children[symbol] = _build_decision_node(
+            [(p, trie.children[symbol]) for p, trie in pairs if symbol in trie.children]
+        )
+    return node
+
+
+def _decision_conflicts(node, prefix=()):
+    if node.conflicts:
+        yield prefix, node.conflicts
+    for symbol, child in node.children.items():
+        yield from _decision_conflicts(child, prefix + (symbol,))
+
+
+def build_llk_table(grammar, max_k=3, max_nodes=10000):
+    """
+    Build LL(k) prediction tries, raising k only for nonterminals whose
+    decision still has conflicts. FIRST_k/FOLLOW_k are computed at most once
+    per k and only while some nonterminal needs them.
+    """
+    ids = terminal_ids(grammar)
+    stats = LLkStats()
+    decisions, ks = {}, {}
+
+    pending = [nt for nt in grammar.nonterminals if nt.productions]
+    k = 0
+    while pending and k < max_k:
+        k += 1
+        firsts = compute_firsts_k(grammar, k, ids, max_nodes, stats)
+        follows = compute_follows_k(grammar, firsts, k, ids, max_nodes, stats)
+        lookaheads = compute_lookaheads_k(grammar, firsts, follows, k, stats)
+        stats.total_nodes[k] = sum(trie.size for trie in firsts.values()) + sum(
+            trie.size for trie in follows.values()
+        )
+
+        unresolved = []
+        for nonterminal in pending:
+            decision = build_decision_trie(nonterminal.productions, lookaheads)
+            decisions[nonterminal], ks[nonterminal] = decision, k
+            if any(_decision_conflicts(decision)):
+                unresolved.append(nonterminal)
+        pending = unresolved
+
+    return LLkTable(grammar, ids, decisions, ks, stats)
+
+
+def build_llk_parser(grammar, table=None, max_k=3):
+    if table is None:
+        table = build_llk_table(grammar, max_k)
+    ids, decisions = table.ids, table.decisions
+
+    def predict(top, tokens, cursor):
+        node = decisions[top]
+        while node.production is None:
+            if node.conflicts:
+                raise Exception("Parsing error")
+            try:
+                node = node.children[ids[tokens[cursor]]]
+            except (KeyError, IndexError):
+                raise Exception("Parsing error")
+            cursor += 1
+        return node.production
+
+    def parser(tokens):
+        stack = [grammar.start_symbol]
+        cursor = 0
+        output = []
+
+        while len(stack) > 0:
+            top = stack.pop()
+
+            if top.is_terminal:
+                if tokens[cursor] != top:
+                    raise Exception("Parsing error")
+                cursor += 1
+            else:
+                production = predict(top, tokens, cursor)
+                output.append(production)
+                stack.extend(reversed(production.right))
+
+        return output
+
+    return parser
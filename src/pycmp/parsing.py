@@ -2,6 +2,8 @@ from itertools import islice
 from pycmp.utils import ContainerSet
 from pycmp.automata import State, multiline_formatter
 from pycmp.grammar import Item
+from pycmp import compiled
+from pycmp.budget import STATE_BYTES, ITEM_BYTES
 
 
 def compute_local_first(firsts, alpha):
@@ -63,11 +65,41 @@ def compute_firsts(grammar):
     return firsts
 
 
-def compute_follows(g, firsts):
+def compute_suffix_firsts(grammar, firsts):
+    """
+    First of every suffix of every right side, computed once per grammar:
+    `suffixes[production][pos]` is First(production.right[pos:]).
+    """
+    suffixes = {}
+
+    for production in grammar.productions:
+        right = production.right
+        current = ContainerSet(contains_epsilon=True)
+        firsts_by_pos = [current]
+
+        # First(Xi ... XN) from First(Xi) and First(Xi+1 ... XN)
+        for symbol in reversed(right):
+            first_symbol = firsts[symbol]
+            if first_symbol.contains_epsilon:
+                current = ContainerSet(
+                    *first_symbol, *current, contains_epsilon=current.contains_epsilon
+                )
+            else:
+                current = ContainerSet(*first_symbol)
+            firsts_by_pos.append(current)
+
+        firsts_by_pos.reverse()
+        suffixes[production] = firsts_by_pos
+
+    return suffixes
+
+
+def compute_follows(g, firsts, suffixes=None):
     follows = {}
     change = True
 
-    local_firsts = {}
+    if suffixes is None:
+        suffixes = compute_suffix_firsts(g, firsts)
 
     # init Follow(Vn)
     for nonterminal in g.nonterminals:
@@ -87,15 +119,13 @@ def compute_follows(g, firsts):
             # X -> zeta Y beta
             # First(beta) - { epsilon } subset of Follow(Y)
             # beta ->* epsilon or X -> zeta Y ? Follow(X) subset of Follow(Y)
+            suffix_firsts = suffixes[production]
             for i, y in enumerate(alpha):
-                if y not in g.nonterminals:
+                if not y.is_nonterminal:
                     continue
-                beta = alpha[i + 1 :]
-                if beta:
-                    if beta not in local_firsts:
-                        local_firsts[beta] = compute_local_first(firsts, beta)
-                    change |= follows[y].update(local_firsts[beta])
-                if not beta or local_firsts[beta].contains_epsilon:
+                first_beta = suffix_firsts[i + 1]
+                change |= follows[y].update(first_beta)
+                if first_beta.contains_epsilon:
                     change |= follows[y].update(follow_x)
 
     # Follow(Vn)
@@ -120,12 +150,11 @@ def build_ll_table(g, firsts, follows):
 
         # working with epsilon
         if firsts[alpha].contains_epsilon:
-            for t in g.terminals + [g.eof]:
-                if t in follows[x]:
-                    try:
-                        table[x, t].append(production)
-                    except KeyError:
-                        table[x, t] = [production]
+            for t in follows[x]:
+                try:
+                    table[x, t].append(production)
+                except KeyError:
+                    table[x, t] = [production]
 
     return table
 
@@ -175,18 +204,136 @@ class ShiftReduceParser:
     REDUCE = "REDUCE"
     OK = "OK"
 
-    def __init__(self, grammar, verbose=False):
+    def __init__(self, grammar, verbose=False, skip_unit_productions=False):
         self.grammar = grammar
         self.verbose = verbose
+        self.skip_unit_productions = skip_unit_productions
         self.action = {}
         self.goto = {}
+        self.unit_shortcuts = {}
+        self.entry_states = {}
+        self._nonassoc = set()
         self._build_parsing_table()
+        if skip_unit_productions:
+            self._build_unit_shortcuts()
 
     def _build_parsing_table(self):
         raise NotImplementedError()
 
-    def __call__(self, tokens, return_actions=False):
-        stack, cursor = [0], 0
+    def update(self, added=(), removed=()):
+        """
+        Remove the productions in `removed` from the grammar, add those in
+        `added` and update the tables. On a conflict, the grammar and the
+        tables are left as they were.
+        """
+        grammar = self.grammar
+        productions = list(grammar.productions)
+        lefts = {p.left: list(p.left.productions) for p in [*added, *removed]}
+        saved = dict(self.__dict__)
+
+        try:
+            for production in removed:
+                grammar.remove_production(production)
+            for production in added:
+                grammar.add_production(production)
+            self._update_parsing_table()
+            if self.skip_unit_productions:
+                self.unit_shortcuts = {}
+                self._build_unit_shortcuts()
+        except BaseException:
+            # Assigned, not copied in place, so the grammar drops any
+            # fingerprint taken during the edit
+            grammar.productions = productions
+            for left, left_productions in lefts.items():
+                left.productions = left_productions
+            self.__dict__ = saved
+            raise
+
+    def _update_parsing_table(self):
+        """Build the tables again for the edited grammar."""
+        self.action, self.goto, self._nonassoc = {}, {}, set()
+        self._build_parsing_table()
+
+    def _resolve(self, key, current, value):
+        """
+        Settle a shift-reduce collision on `key` with the precedence and
+        associativity declared in the grammar, the way yacc does.
+
+        Returns the entries that survive: a single one when the declarations
+        decide, none for a nonassociative operator (the entry becomes an
+        error) and both when nothing was declared.
+        """
+        actions = {current[0], value[0]}
+        if actions != {self.SHIFT, self.REDUCE}:
+            return [current, value]
+
+        shift, reduce = (
+            (current, value) if current[0] == self.SHIFT else (value, current)
+        )
+        token_precedence = self.grammar.precedence.get(key[1])
+        production_precedence = self.grammar.get_precedence(reduce[1])
+        if token_precedence is None or production_precedence is None:
+            return [current, value]
+
+        if production_precedence[0] > token_precedence[0]:
+            return [reduce]
+        if production_precedence[0] < token_precedence[0]:
+            return [shift]
+        return {"left": [reduce], "right": [shift], "nonassoc": []}[token_precedence[1]]
+
+    def _register(self, table, key, value):
+        if table is self.action:
+            if key in self._nonassoc:
+                return
+            if key in table and table[key] != value:
+                entries = self._resolve(key, table[key], value)
+                if len(entries) == 1:
+                    table[key] = entries[0]
+                    return
+                if not entries:
+                    del table[key]
+                    self._nonassoc.add(key)
+                    return
+
+        assert (
+            key not in table or table[key] == value
+        ), "Shift-Reduce or Reduce-Reduce conflict!!!"
+        table[key] = value
+
+    def _build_unit_shortcuts(self):
+        """
+        Precompute, for every (state, nonterminal, lookahead) reached by a
+        goto, the chain of unit reductions (A -> B) the driver would perform
+        next and the state it would end up in, so the driver can jump there
+        at once.
+        """
+        unit_reductions = {}
+        for (state, lookahead), (action, tag) in self.action.items():
+            if (
+                action == self.REDUCE
+                and len(tag.right) == 1
+                and tag.right[0].is_nonterminal
+            ):
+                unit_reductions.setdefault(state, {})[lookahead] = tag
+
+        limit = len(self.grammar.nonterminals) + 1
+        for (state, symbol), dest in self.goto.items():
+            for lookahead, production in unit_reductions.get(dest, {}).items():
+                current, units = dest, []
+                while production is not None and len(units) < limit:
+                    units.append(production)
+                    current = self.goto[state, production.left]
+                    production = unit_reductions.get(current, {}).get(lookahead)
+                self.unit_shortcuts[state, symbol, lookahead] = (current, tuple(units))
+
+    def __call__(self, tokens, return_actions=False, unit_productions=True, entry=None):
+        """
+        Parse `tokens` and return the right parse. When the parser was built
+        with `skip_unit_productions`, the unit reductions are bypassed and
+        only appear in the output if `unit_productions` is set. Parsers with
+        several entry points start from the state of `entry`.
+        """
+        stack, cursor = [0 if entry is None else self.entry_states[entry]], 0
         output, actions = [], []
 
         while True:
@@ -210,8 +357,15 @@ class ShiftReduceParser:
             # Reduce case
             if action == self.REDUCE:
                 output.append(tag)
-                stack = stack[: len(stack) - len(tag.right)]
-                stack.append(self.goto[stack[-1], tag.left])
+                del stack[len(stack) - len(tag.right) :]
+                try:
+                    dest, units = self.unit_shortcuts[stack[-1], tag.left, lookahead]
+                    if unit_productions:
+                        output.extend(units)
+                        actions.extend([self.REDUCE] * len(units))
+                except KeyError:
+                    dest = self.goto[stack[-1], tag.left]
+                stack.append(dest)
 
             # OK case
             if action == self.OK:
@@ -222,7 +376,7 @@ class ShiftReduceParser:
         return (output, actions) if return_actions else output
 
 
-def build_lr0_automaton(grammar):
+def build_lr0_automaton(grammar, budget=None):
     assert len(grammar.start_symbol.productions) == 1, "Grammar must be augmented"
 
     start_production = grammar.start_symbol.productions[0]
@@ -232,6 +386,8 @@ def build_lr0_automaton(grammar):
 
     pending = [start_item]
     visited = {start_item: automaton}
+    if budget is not None:
+        budget.track("lr0 automaton")
 
     while pending:
         current_item = pending.pop()
@@ -256,6 +412,8 @@ def build_lr0_automaton(grammar):
                 pending.append(next_item)
                 next_state = State(next_item, True)
                 visited[next_item] = next_state
+                if budget is not None:
+                    budget.charge(1, 1, STATE_BYTES)
             if next_symbol:
                 current_state.add_transition(next_symbol, next_state)
             else:
@@ -265,12 +423,42 @@ def build_lr0_automaton(grammar):
 
 
 class SLR1Parser(ShiftReduceParser):
+    def __init__(
+        self,
+        grammar,
+        verbose=False,
+        skip_unit_productions=False,
+        augmented=None,
+        automaton=None,
+        follows=None,
+        budget=None,
+    ):
+        """
+        The augmented grammar, its deterministic LR(0) `automaton` and the
+        `follows` of the augmented grammar may be passed prebuilt. Otherwise
+        the automaton is built within `budget`, if given.
+        """
+        self.augmented = augmented
+        self.automaton = automaton
+        self.follows = follows
+        self.budget = budget
+        super().__init__(grammar, verbose, skip_unit_productions)
+
+    def _update_parsing_table(self):
+        self.augmented = self.automaton = self.follows = None
+        super()._update_parsing_table()
+
     def _build_parsing_table(self):
-        grammar = self.grammar.get_augmented_grammar(True)
-        firsts = compute_firsts(grammar)
-        follows = compute_follows(grammar, firsts)
+        grammar = self.augmented
+        if grammar is None:
+            grammar = self.augmented = self.grammar.get_augmented_grammar(True)
+        if self.follows is None:
+            self.follows = compute_follows(grammar, compute_firsts(grammar))
+        if self.automaton is None:
+            automaton = build_lr0_automaton(grammar, self.budget)
+            self.automaton = automaton.to_deterministic(budget=self.budget)
+        automaton, follows = self.automaton, self.follows
 
-        automaton = build_lr0_automaton(grammar).to_deterministic()
         for i, node in enumerate(automaton):
             if self.verbose:
                 print(i, "\t", "\n\t ".join(str(x) for x in node.state), "\n")
@@ -301,26 +489,25 @@ class SLR1Parser(ShiftReduceParser):
                 else:
                     self._register(self.goto, (idx, x), dest.idx)
 
-    @staticmethod
-    def _register(table, key, value):
-        assert (
-            key not in table or table[key] == value
-        ), "Shift-Reduce or Reduce-Reduce conflict!!!"
-        table[key] = value
-
 
-def expand(item, firsts):
+def expand(item, firsts, suffixes=None):
     next_symbol = item.next_symbol
     if next_symbol is None or not next_symbol.is_nonterminal:
         return []
 
+    # Compute lookahead for child items: First(beta c) for every lookahead c
+    # of the item, taking First(beta) from the suffix table when given
     lookaheads = ContainerSet()
-    # Compute lookahead for child items
-    for preview in item.preview():
-        preview_firsts = compute_local_first(firsts, preview)
-        lookaheads.update(preview_firsts)
+    if item.lookaheads:
+        if suffixes is None:
+            beta = item.production.right[item.pos + 1 :]
+            first_beta = compute_local_first(firsts, beta)
+        else:
+            first_beta = suffixes[item.production][item.pos + 1]
+        lookaheads.update(first_beta)
+        if first_beta.contains_epsilon:
+            lookaheads.extend(item.lookaheads)
 
-    assert not lookaheads.contains_epsilon
     # Build and return child items
     return [Item(prod, 0, lookaheads) for prod in next_symbol.productions]
 
@@ -341,7 +528,7 @@ def compress(items):
     }
 
 
-def closure_lr1(items, firsts):
+def closure_lr1(items, firsts, suffixes=None):
     closure = ContainerSet(*items)
 
     changed = True
@@ -350,79 +537,266 @@ def closure_lr1(items, firsts):
 
         new_items = ContainerSet()
         for item in closure:
-            new_items.extend(expand(item, firsts))
+            new_items.extend(expand(item, firsts, suffixes))
 
         changed = closure.update(new_items)
 
     return compress(closure)
 
 
-def goto_lr1(items, symbol, firsts=None, just_kernel=False):
+def goto_lr1(items, symbol, firsts=None, just_kernel=False, suffixes=None):
     assert (
         just_kernel or firsts is not None
     ), "`firsts` must be provided if `just_kernel=False`"
     items = frozenset(item.next_item() for item in items if item.next_symbol == symbol)
-    return items if just_kernel else closure_lr1(items, firsts)
+    return items if just_kernel else closure_lr1(items, firsts, suffixes)
+
+
+def build_lr1_automaton(G, workers=None, budget=None):
+    return build_lr1_automata(G, [G.start_symbol], workers, budget)[0]
+
+
+def build_lr1_automata(G, start_symbols, workers=None, budget=None):
+    """
+    Build one LR(1) automaton with an initial state per augmented start
+    symbol in `start_symbols`. States reachable from several entries are
+    shared. Returns the initial states in the same order.
+
+    The item sets are built on the compiled grammar, as LR(0) cores with
+    lookahead bitmasks, and only turned into `Item`s once at the end. With
+    `workers`, they are built in that many processes; the automaton is the
+    same. The collection is charged to `budget`, if given.
+    """
+    assert all(
+        len(s.productions) == 1 for s in start_symbols
+    ), "Grammar must be augmented"
+
+    cg = compiled.CompiledGrammar(G)
+    suffixes = compiled.compute_suffix_firsts(cg, *compiled.compute_firsts(cg))
+    collection = compiled.build_lr1_collection(
+        cg, suffixes, [cg.ids[s] for s in start_symbols], workers, budget
+    )
+
+    states = []
+    for items in collection.item_sets():
+        state = frozenset(
+            Item(
+                cg.productions[cg.item_production[item]],
+                item - cg.item_base[cg.item_production[item]],
+                cg.terminals_of(lookaheads),
+            )
+            for item, lookaheads in items
+        )
+        states.append(State(state, True))
 
+    # Transitions in grammar symbol order, as symbol ids are
+    for (origin, symbol), dest in sorted(collection.gotos.items()):
+        states[origin].add_transition(cg.symbols[symbol].name, states[dest])
 
-def build_lr1_automaton(G):
-    assert len(G.start_symbol.productions) == 1, "Grammar must be augmented"
+    automata = states[: len(start_symbols)]
+    for automaton in automata:
+        automaton.set_formatter(multiline_formatter)
+    return automata
+
+
+def _kernel_lookaheads(items):
+    kernel = {}
+    for item in items:
+        kernel.setdefault(item.center(), set()).update(item.lookaheads)
+    return kernel
 
-    firsts = compute_firsts(G)
-    firsts[G.eof] = ContainerSet(G.eof)
 
-    start_production = G.start_symbol.productions[0]
-    start_item = Item(start_production, 0, lookaheads=(G.eof,))
-    start = frozenset([start_item])
+def _kernel_items(kernel):
+    return [Item(x.production, x.pos, lookaheads) for x, lookaheads in kernel.items()]
 
-    closure = closure_lr1(start, firsts)
-    automaton = State(frozenset(closure), True)
 
-    pending = [start]
-    visited = {start: automaton}
+def weakly_compatible(kernel, other):
+    """
+    Pager's weak compatibility test for two kernels with the same core.
 
+    Merging is safe (it cannot introduce reduce-reduce conflicts that the
+    canonical LR(1) automaton would not have) when, for every pair of core
+    items i != j, the cross intersections are empty or the pair already
+    shares a lookahead inside one of the kernels.
+    """
+    centers = list(kernel)
+    for i, ci in enumerate(centers):
+        for cj in centers[i + 1 :]:
+            if not (kernel[ci] & other[cj] or other[ci] & kernel[cj]):
+                continue
+            if kernel[ci] & kernel[cj] or other[ci] & other[cj]:
+                continue
+            return False
+    return True
+
+
+def build_minimal_lr1_automaton(G, budget=None):
+    return build_minimal_lr1_automata(G, [G.start_symbol], budget)[0]
+
+
+def build_minimal_lr1_automata(G, start_symbols, budget=None):
+    """
+    Build an LR(1) automaton merging states with the same core during
+    construction whenever they are weakly compatible (Pager, 1977).
+
+    The result parses the same language as the canonical automaton without
+    new conflicts, usually with as many states as the LALR(1) automaton.
+    Like `build_lr1_automata`, there is an initial state per start symbol.
+    Every expanded state is charged to `budget`, if given.
+    """
+    assert all(
+        len(s.productions) == 1 for s in start_symbols
+    ), "Grammar must be augmented"
+
+    firsts = compute_firsts(G)
+    firsts[G.eof] = ContainerSet(G.eof)
+    suffixes = compute_suffix_firsts(G, firsts)
+
+    kernels = [
+        _kernel_lookaheads([Item(s.productions[0], 0, lookaheads=(G.eof,))])
+        for s in start_symbols
+    ]
+    transitions = [{} for _ in kernels]
+    cores = {}
+    for idx, kernel in enumerate(kernels):
+        cores.setdefault(frozenset(kernel), []).append(idx)
+
+    def find_or_merge(kernel, current):
+        if current is not None and weakly_compatible(kernels[current], kernel):
+            candidates = [current]
+        else:
+            candidates = cores.setdefault(frozenset(kernel), [])
+
+        for idx in candidates:
+            target = kernels[idx]
+            if weakly_compatible(target, kernel):
+                changed = False
+                for center, lookaheads in kernel.items():
+                    n = len(target[center])
+                    target[center].update(lookaheads)
+                    changed |= n != len(target[center])
+                if changed:
+                    pending.append(idx)
+                return idx
+
+        kernels.append(kernel)
+        transitions.append({})
+        candidates.append(len(kernels) - 1)
+        pending.append(len(kernels) - 1)
+        if budget is not None:
+            budget.charge(states=1, bytes=STATE_BYTES)
+        return len(kernels) - 1
+
+    if budget is not None:
+        budget.track("minimal lr1 automaton")
+    pending = list(reversed(range(len(kernels))))
     while pending:
-        current = pending.pop()
-        current_state = visited[current]
+        idx = pending.pop()
+        closure = closure_lr1(_kernel_items(kernels[idx]), firsts, suffixes)
+        if budget is not None:
+            # States are expanded again when merging grows their lookaheads,
+            # so only their items are charged here
+            budget.charge(items=len(closure), bytes=ITEM_BYTES * len(closure))
 
         for symbol in G.terminals + G.nonterminals:
-            # Get/Build `next_state`
-            next_ = frozenset(
-                goto_lr1(closure_lr1(current, firsts), symbol, just_kernel=True)
-            )
-            if not next_:
+            next_items = goto_lr1(closure, symbol, just_kernel=True)
+            if not next_items:
                 continue
+            kernel = _kernel_lookaheads(next_items)
+            transitions[idx][symbol] = find_or_merge(
+                kernel, transitions[idx].get(symbol)
+            )
 
-            try:
-                next_state = visited[next_]
-            except KeyError:
-                pending.append(next_)
-                next_closure = frozenset(closure_lr1(next_, firsts))
-                next_state = visited[next_] = State(next_closure, True)
+    # Redirected transitions may leave unreachable states behind
+    order = list(range(len(start_symbols)))
+    states, seen = {}, set(order)
+    for idx in order:
+        closure = frozenset(closure_lr1(_kernel_items(kernels[idx]), firsts, suffixes))
+        states[idx] = State(closure, True)
+        for dest in transitions[idx].values():
+            if dest not in seen:
+                seen.add(dest)
+                order.append(dest)
 
-            current_state.add_transition(symbol.name, next_state)
+    for idx in order:
+        for symbol, dest in transitions[idx].items():
+            states[idx].add_transition(symbol.name, states[dest])
 
-    automaton.set_formatter(multiline_formatter)
-    return automaton
+    automata = [states[idx] for idx in range(len(start_symbols))]
+    for automaton in automata:
+        automaton.set_formatter(multiline_formatter)
+    return automata
 
 
 class LR1Parser(ShiftReduceParser):
+    def __init__(
+        self,
+        grammar,
+        verbose=False,
+        minimal=False,
+        skip_unit_productions=False,
+        entries=None,
+        augmented=None,
+        automaton=None,
+        budget=None,
+    ):
+        """
+        Single-entry parsers may be given the augmented grammar and its
+        LR(1) `automaton` prebuilt. Otherwise the automata are built within
+        `budget`, if given.
+        """
+        assert entries is None or automaton is None, "Cannot reuse the automaton"
+        self.minimal = minimal
+        self.entries = entries
+        self.augmented = augmented
+        self.automaton = automaton
+        self.budget = budget
+        super().__init__(grammar, verbose, skip_unit_productions)
+
+    def _update_parsing_table(self):
+        self.augmented = self.automaton = None
+        super()._update_parsing_table()
+
     def _build_parsing_table(self):
-        grammar = self.grammar.get_augmented_grammar(True)
+        if self.entries is None:
+            grammar = self.augmented
+            if grammar is None:
+                grammar = self.augmented = self.grammar.get_augmented_grammar(True)
+            start_symbols = [grammar.start_symbol]
+        else:
+            grammar, start_symbols = self.grammar.get_entries_augmented_grammar(
+                self.entries
+            )
 
-        automaton = build_lr1_automaton(grammar)
-        for i, node in enumerate(automaton):
+        if self.automaton is not None:
+            automata = [self.automaton]
+        elif self.minimal:
+            automata = build_minimal_lr1_automata(grammar, start_symbols, self.budget)
+        else:
+            automata = build_lr1_automata(grammar, start_symbols, budget=self.budget)
+        self.automaton = automata[0]
+
+        visited, nodes = set(), []
+        for automaton in automata:
+            nodes.extend(automaton._visit(visited))
+        for i, node in enumerate(nodes):
             if self.verbose:
                 print(i, "\t", "\n\t ".join(str(x) for x in node.state), "\n")
             node.idx = i
 
-        for node in automaton:
+        if self.entries is not None:
+            self.entry_states = {
+                entry: automaton.idx for entry, automaton in zip(self.entries, automata)
+            }
+
+        start_symbols = set(start_symbols)
+        for node in nodes:
             idx = node.idx
             for item in node.state:
                 # - Fill `self.Action` and `self.Goto` according to `item`)
                 # - Feel free to use `self._register(...)`)
                 if item.is_reduce_item:
-                    is_start = item.production.left == grammar.start_symbol
+                    is_start = item.production.left in start_symbols
                     for s in item.lookaheads:
                         action = (
                             self.OK if is_start and s == grammar.eof else self.REDUCE
@@ -440,9 +814,195 @@ class LR1Parser(ShiftReduceParser):
                 else:
                     self._register(self.goto, (idx, x), dest.idx)
 
-    @staticmethod
-    def _register(table, key, value):
-        assert (
-            key not in table or table[key] == value
-        ), "Shift-Reduce or Reduce-Reduce conflict!!!"
-        table[key] = value
+
+class CompiledShiftReduceParser(ShiftReduceParser):
+    """
+    Shift-reduce parser whose tables are built on the `CompiledGrammar` of
+    the augmented grammar and then registered in terms of the grammar's own
+    symbols, so precedence handling and conflict collecting work as usual.
+    The states are built within `budget`, if given.
+
+    `update` rebuilds the tables reusing the states the edit did not touch.
+    """
+
+    def __init__(
+        self, grammar, verbose=False, skip_unit_productions=False, budget=None
+    ):
+        self.budget = budget
+        super().__init__(grammar, verbose, skip_unit_productions)
+
+    def _build_parsing_table(self):
+        self._compile()
+        self.collection = self._build_collection(self.compiled)
+        for state in range(len(self.collection.states)):
+            self._register_state(state)
+
+    def _compile(self):
+        augmented = self.grammar.get_augmented_grammar(True)
+        self.compiled = cg = compiled.CompiledGrammar(augmented)
+        self.firsts, self.nullable = compiled.compute_firsts(cg)
+        self.suffixes = compiled.compute_suffix_firsts(cg, self.firsts, self.nullable)
+
+    def _build_collection(self, cg, previous=None):
+        """
+        Return the `LR1Collection` of the states, rebuilt from the one of
+        the grammar before an edit when `previous` is given.
+        """
+        raise NotImplementedError()
+
+    def _state_items(self, state):
+        """The items of `state` as `(item, lookahead mask)`."""
+        return self.collection.items(state)
+
+    def _reused_states(self):
+        """States of an updated collection whose rows are the same as those
+        of the state they came from, and that state."""
+        return self.collection.reused
+
+    def _register_state(self, state):
+        compiled.register_state(
+            self, self.compiled, state, self._state_items(state), self.collection.gotos
+        )
+
+    def _update_parsing_table(self):
+        """
+        Only the states whose items the edit touched are built and
+        registered again: the rows of the others are copied with their
+        states renumbered.
+        """
+        action, goto, nonassoc = self.action, self.goto, self._nonassoc
+        self.action, self.goto, self._nonassoc = {}, {}, set()
+
+        self._compile()
+        cg = self.compiled
+        self.collection = self._build_collection(cg, self.collection)
+        gotos = self.collection.gotos
+        reused = self._reused_states()
+
+        renumber = {old: new for new, old in reused.items()}
+        (start,) = cg.productions_of(cg.start)
+        accept = (self.OK, cg.productions[start])
+        ids, table = cg.ids, self.action
+        for (state, symbol), value in action.items():
+            new = renumber.get(state)
+            if new is None:
+                continue
+            if value[0] == self.SHIFT:
+                dest = gotos[new, ids[symbol]]
+                if dest != value[1]:
+                    value = (self.SHIFT, dest)
+            elif value[0] == self.OK:
+                value = accept
+            table[new, symbol] = value
+        for (state, symbol), dest in goto.items():
+            new = renumber.get(state)
+            if new is not None:
+                self.goto[new, symbol] = gotos[new, ids[symbol]]
+        self._nonassoc.update(
+            (renumber[state], symbol) for state, symbol in nonassoc if state in renumber
+        )
+
+        for state in range(len(self.collection.states)):
+            if state not in reused:
+                self._register_state(state)
+
+
+class CompiledSLR1Parser(CompiledShiftReduceParser):
+    """
+    The LR(0) states are built as an `LR1Collection` with no lookaheads and
+    the reduce items get the follows of their left side.
+    """
+
+    def _build_collection(self, cg, previous=None):
+        follows = compiled.compute_follows(
+            cg, self.firsts, self.nullable, self.suffixes
+        )
+        if previous is None:
+            collection = compiled.LR1Collection(cg, self.suffixes)
+        else:
+            collection = compiled.IncrementalLR1Collection(previous, cg, self.suffixes)
+
+        (p,) = cg.productions_of(cg.start)
+        collection.add_state(collection.core((cg.item_base[p],)), (0,))
+        collection.build([], budget=self.budget)
+
+        if previous is not None:
+            # Reduce entries of a reused state are stale if the follows of
+            # the left side of one of its items changed
+            translation = collection.translation
+            kept = {
+                translation.symbols[x]: translation.mask(self.follows[x])
+                for x in range(previous.cg.n_terminals, len(previous.cg.symbols))
+            }
+            self.stale = {
+                x
+                for x in range(cg.n_terminals, len(cg.symbols))
+                if kept.get(x) != follows[x]
+            }
+        self.follows = follows
+        return collection
+
+    def _state_items(self, state):
+        core, _ = self.collection.states[state]
+        return compiled.slr_items(
+            self.compiled, self.collection.closures[core], self.follows
+        )
+
+    def _reused_states(self):
+        cg, collection = self.compiled, self.collection
+        return {
+            state: old
+            for state, old in collection.reused.items()
+            if not any(
+                cg.left[cg.item_production[item]] in self.stale
+                for item in collection.closures[collection.states[state][0]]
+                if cg.item_next[item] < 0
+            )
+        }
+
+
+class CompiledLR1Parser(CompiledShiftReduceParser):
+    def __init__(
+        self,
+        grammar,
+        verbose=False,
+        skip_unit_productions=False,
+        workers=None,
+        budget=None,
+    ):
+        """With `workers`, the LR(1) states are built in that many processes."""
+        self.workers = workers
+        super().__init__(grammar, verbose, skip_unit_productions, budget)
+
+    def _build_collection(self, cg, previous=None):
+        if previous is None:
+            return compiled.build_lr1_collection(
+                cg, self.suffixes, workers=self.workers, budget=self.budget
+            )
+        collection = compiled.IncrementalLR1Collection(previous, cg, self.suffixes)
+        return collection.build([cg.start], budget=self.budget)
+
+
+class CompiledLALR1Parser(CompiledLR1Parser):
+    """
+    The canonical collection is kept in `canonical` and updated on edits.
+    A merged state is reused when its core was adopted and its lookaheads
+    are those of a merged state before the edit.
+    """
+
+    def _build_collection(self, cg, previous=None):
+        if previous is None:
+            self.canonical = super()._build_collection(cg)
+            return self.canonical.merge_cores()
+
+        self.canonical = canonical = super()._build_collection(cg, self.canonical)
+        collection = canonical.merge_cores()
+        self.reused = {}
+        for state, (core, masks) in enumerate(collection.states):
+            old = canonical.origin(previous, core, masks)
+            if old is not None:
+                self.reused[state] = old
+        return collection
+
+    def _reused_states(self):
+        return self.reused
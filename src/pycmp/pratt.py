@@ -0,0 +1,181 @@
+from pycmp.parsing import compute_firsts, compute_follows, build_ll_table
+
+
+class ExpressionChain:
+    """
+    Layered operator nonterminals `levels[0] -> ... -> levels[-1] -> primary`
+    where every layer has one unit production `Li -> Li+1` and binary
+    productions `Li -> Li op Li+1` (left associative) or `Li -> Li+1 op Li`
+    (right associative). `levels[0]` binds the loosest.
+    """
+
+    def __init__(self, levels, primary, units, associativity, operators):
+        self.levels = levels
+        self.primary = primary
+        self.units = units
+        self.associativity = associativity
+        self.operators = operators
+
+    def __repr__(self):
+        return " -> ".join(str(s) for s in self.levels + [self.primary])
+
+
+def _classify_layer(nonterminal):
+    units, operators, associativity = [], {}, set()
+
+    for production in nonterminal.productions:
+        right = production.right
+        if len(right) == 1 and right[0].is_nonterminal:
+            units.append(production)
+        elif len(right) == 3 and right[1].is_terminal and right[1] not in operators:
+            if right[0] == nonterminal and right[2] != nonterminal:
+                associativity.add(("left", right[2]))
+            elif right[2] == nonterminal and right[0] != nonterminal:
+                associativity.add(("right", right[0]))
+            else:
+                return None
+            operators[right[1]] = production
+        else:
+            return None
+
+    if len(units) != 1 or len(associativity) != 1 or not operators:
+        return None
+
+    ((assoc, following),) = associativity
+    unit = units[0]
+    if unit.right[0] != following or following == nonterminal:
+        return None
+    return following, unit, assoc, operators
+
+
+def find_expression_chains(grammar):
+    layers = {}
+    for nonterminal in grammar.nonterminals:
+        layer = _classify_layer(nonterminal)
+        if layer is not None:
+            layers[nonterminal] = layer
+
+    chains = {}
+    for nonterminal in layers:
+        levels, units, associativity, operators = [], [], [], {}
+        current = nonterminal
+        while current in layers and current not in levels:
+            following, unit, assoc, layer_operators = layers[current]
+            if any(op in operators for op in layer_operators):
+                break
+            level = len(levels)
+            for op, production in layer_operators.items():
+                operators[op] = (level, production)
+            levels.append(current)
+            units.append(unit)
+            associativity.append(assoc)
+            current = following
+        else:
+            if current not in levels:
+                chains[nonterminal] = ExpressionChain(
+                    levels, current, units, associativity, operators
+                )
+
+    return chains
+
+
+def build_hybrid_parser(grammar, chains=None, firsts=None, follows=None):
+    """
+    Build a left parser that handles the operator layers found by
+    `find_expression_chains` with a precedence-climbing loop and the rest of
+    the grammar with the LL(1) driver.
+
+    Each operand costs one call to the primary parser plus the unit
+    productions needed to keep the output a complete left parse.
+    """
+    if chains is None:
+        chains = find_expression_chains(grammar)
+    if firsts is None:
+        firsts = compute_firsts(grammar)
+    if follows is None:
+        follows = compute_follows(grammar, firsts)
+
+    rest = grammar.copy()
+    rest.productions = [p for p in grammar.productions if p.left not in chains]
+    table = build_ll_table(rest, firsts, follows)
+
+    def parse_symbol(root, tokens, cursor, output):
+        stack = [root]
+
+        while stack:
+            top = stack.pop()
+
+            if top.is_terminal:
+                if tokens[cursor] != top:
+                    raise Exception("Parsing error")
+                cursor += 1
+            elif top in chains:
+                cursor = parse_expression(chains[top], tokens, cursor, output)
+            else:
+                try:
+                    production = table[top, tokens[cursor]]
+                except KeyError:
+                    raise Exception("Parsing error")
+                if len(production) > 1:
+                    raise Exception("Parsing error")
+                production = production[0]
+                output.append(production)
+                stack.extend(reversed(production.right))
+
+        return cursor
+
+    def lift(node, level, target, chain):
+        for i in range(level - 1, target - 1, -1):
+            node = (chain.units[i], [node])
+        return node
+
+    def climb(chain, min_level, tokens, cursor):
+        operand = []
+        cursor = parse_symbol(chain.primary, tokens, cursor, operand)
+        node, level = operand, len(chain.levels)
+
+        while True:
+            try:
+                op_level, production = chain.operators[tokens[cursor]]
+            except KeyError:
+                break
+            if op_level < min_level:
+                break
+            cursor += 1
+
+            if chain.associativity[op_level] == "left":
+                left = lift(node, level, op_level, chain)
+                right, right_level, cursor = climb(chain, op_level + 1, tokens, cursor)
+                right = lift(right, right_level, op_level + 1, chain)
+            else:
+                left = lift(node, level, op_level + 1, chain)
+                right, right_level, cursor = climb(chain, op_level, tokens, cursor)
+                right = lift(right, right_level, op_level, chain)
+
+            node, level = (production, [left, right]), op_level
+
+        return node, level, cursor
+
+    def parse_expression(chain, tokens, cursor, output):
+        node, level, cursor = climb(chain, 0, tokens, cursor)
+
+        pending = [lift(node, level, 0, chain)]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                output.extend(node)
+            else:
+                production, children = node
+                output.append(production)
+                pending.extend(reversed(children))
+
+        return cursor
+
+    def parser(tokens):
+        output = []
+        cursor = parse_symbol(grammar.start_symbol, tokens, 0, output)
+        if cursor != len(tokens) - 1 or tokens[cursor] != grammar.eof:
+            raise Exception("Parsing error")
+        return output
+
+    return parser
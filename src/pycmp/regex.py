@@ -1,7 +1,7 @@
 from pycmp.grammar import Grammar
-from pycmp.automata import NFA, DFA
+from pycmp.automata import NFA, DFA, NFABuilder
 from pycmp.automata import automata_closure, automata_union, automata_concatenation
-from pycmp.automata import nfa_to_dfa, automata_minimization
+from pycmp.automata import nfa_to_dfa, automata_minimization, CompiledDFA
 from pycmp.ast import Node, AtomicNode, UnaryNode, BinaryNode
 from pycmp.token import Token
 from pycmp.parsing import build_ll_parser
@@ -12,30 +12,54 @@ class EpsilonNode(AtomicNode):
     def evaluate(self):
         return DFA(states=1, finals=[0], transitions={})
 
+    def thompson(self, builder):
+        return builder.epsilon()
+
 
 class SymbolNode(AtomicNode):
     def evaluate(self):
         transitions = {(0, self.lex): 1}
         return DFA(states=2, finals=[1], transitions=transitions)
 
+    def thompson(self, builder):
+        return builder.symbol(self.lex)
+
 
 class ClosureNode(UnaryNode):
     @staticmethod
     def operate(value):
         return automata_closure(value)
 
+    @staticmethod
+    def thompson(builder, fragment):
+        return builder.closure(fragment)
+
 
 class UnionNode(BinaryNode):
     @staticmethod
     def operate(lvalue, rvalue):
         return automata_union(lvalue, rvalue)
 
+    @staticmethod
+    def thompson(builder, left, right):
+        return builder.union(left, right)
+
 
 class ConcatNode(BinaryNode):
     @staticmethod
     def operate(lvalue, rvalue):
         return automata_concatenation(lvalue, rvalue)
 
+    @staticmethod
+    def thompson(builder, left, right):
+        return builder.concatenation(left, right)
+
+
+def build_nfa(ast):
+    builder = NFABuilder()
+    fragment = ast.fold(lambda node, *fragments: node.thompson(builder, *fragments))
+    return builder.build(fragment)
+
 
 def regex_tokenizer(text, grammar, skip_whitespaces=True, scape="\\"):
     tokens = []
@@ -99,16 +123,20 @@ class Regex:
     def __init__(self, regex, skip_whitespaces=False):
         self.regex = regex
         self.automaton = Regex.build_automaton(regex, skip_whitespaces=skip_whitespaces)
+        self.matcher = CompiledDFA(self.automaton)
 
     def __call__(self, text):
-        return self.automaton.recognize(text)
+        return self.matcher.match(text)
+
+    def match_many(self, texts, workers=None):
+        return self.matcher.match_many(texts, workers)
 
     @classmethod
     def build_automaton(cls, regex, skip_whitespaces=False):
         tokens = regex_tokenizer(regex, cls.grammar, skip_whitespaces=skip_whitespaces)
         parse = cls.parser([t.ttype for t in tokens])
         ast = evaluate_parse(parse, tokens)
-        nfa = ast.evaluate()
+        nfa = build_nfa(ast)
         dfa = nfa_to_dfa(nfa)
         minimized = automata_minimization(dfa)
 
@@ -118,15 +118,20 @@ def pprint(item, header=""):
 
 
 class DisjointSet:
+    """Union-find with union by rank and path compression."""
+
     def __init__(self, *items):
         self.nodes = {x: DisjointNode(x) for x in items}
+        self.count = len(self.nodes)
 
     def merge(self, items):
         items = (self.nodes[x] for x in items)
         try:
             head, *others = items
             for other in others:
-                head.merge(other)
+                if head.representative is not other.representative:
+                    self.count -= 1
+                head = head.merge(other)
         except ValueError:
             pass
 
@@ -136,13 +141,13 @@ class DisjointSet:
 
     @property
     def groups(self):
-        return [
-            [n for n in self.nodes.values() if n.representative == r]
-            for r in self.representatives
-        ]
+        groups = {}
+        for node in self.nodes.values():
+            groups.setdefault(node.representative, []).append(node)
+        return list(groups.values())
 
     def __len__(self):
-        return len(self.representatives)
+        return self.count
 
     def __getitem__(self, item):
         return self.nodes[item]
@@ -158,15 +163,29 @@ class DisjointNode:
     def __init__(self, value):
         self.value = value
         self.parent = self
+        self.rank = 0
 
     @property
     def representative(self):
-        if self.parent != self:
-            self.parent = self.parent.representative
-        return self.parent
+        root = self
+        while root.parent is not root:
+            root = root.parent
+        node = self
+        while node.parent is not root:
+            node.parent, node = root, node.parent
+        return root
 
     def merge(self, other):
-        other.representative.parent = self.representative
+        """Join the sets of both nodes and return the representative."""
+        root, other = self.representative, other.representative
+        if root is other:
+            return root
+        if root.rank < other.rank:
+            root, other = other, root
+        other.parent = root
+        if root.rank == other.rank:
+            root.rank += 1
+        return root
 
     def __str__(self):
         return str(self.value)
@@ -0,0 +1,101 @@
+from pycmp.grammar import Grammar
+from pycmp.parsing import compute_firsts, compute_follows
+from grammar_analyzer.analysis import GrammarAnalysis, get_analysis
+from grammar_analyzer import ll_analyzer, slr_analyzer, lr_analyzer, lalr_analyzer
+from grammar_analyzer.classifier import classify
+from grammar_analyzer import basic_analyzer
+
+
+def build_grammar():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    L, R = G.add_nonterminals("L R")
+    eq, star, id_ = G.add_terminals("= * id")
+
+    S %= L + eq + R | R
+    L %= star + R | id_
+    R %= L
+
+    return G
+
+
+def test_artifacts_are_built_once():
+    G = build_grammar()
+
+    for analyzer, is_grammar in [
+        (ll_analyzer, ll_analyzer.is_ll_grammar),
+        (slr_analyzer, slr_analyzer.is_slr_grammar),
+        (lr_analyzer, lr_analyzer.is_lr_grammar),
+        (lalr_analyzer, lalr_analyzer.is_lalr_grammar),
+    ]:
+        is_grammar(G)
+        analyzer.build_conflict_str(G)
+    slr_analyzer.build_automaton(G)
+    lr_analyzer.build_automaton(G)
+    lalr_analyzer.build_automaton(G)
+    classify(G)
+
+    analysis = get_analysis(G)
+    assert set(analysis.builds) >= {
+        "augmented",
+        "firsts",
+        "follows",
+        "lr0_automaton",
+        "lr0_dfa",
+        "lr1_automaton",
+        "ll_table",
+        "slr_info",
+        "lr_info",
+        "lalr_info",
+        "lr0_collection",
+        "lalr_lookaheads",
+    }
+    assert all(count == 1 for count in analysis.builds.values())
+
+    assert lr_analyzer.is_lr_grammar(G)
+    assert lalr_analyzer.is_lalr_grammar(G)
+    assert not slr_analyzer.is_slr_grammar(G)
+
+
+def test_artifacts_match_direct_computation():
+    G = build_grammar()
+    analysis = GrammarAnalysis(G)
+
+    augmented = analysis.augmented
+    firsts = compute_firsts(augmented)
+    follows = compute_follows(augmented, firsts)
+
+    assert analysis.firsts == firsts
+    assert analysis.follows == follows
+    assert analysis.nullable == set()
+
+
+def test_invalidate_drops_dependents():
+    G = build_grammar()
+    analysis = GrammarAnalysis(G)
+
+    analysis.ll_table
+    analysis.lr1_automaton
+    assert "compiled_follows" in analysis.dependencies["ll_table"]
+
+    analysis.invalidate("compiled_follows")
+    assert "compiled_follows" not in analysis.artifacts
+    assert "ll_table" not in analysis.artifacts
+    assert "compiled_firsts" in analysis.artifacts
+    assert "lr1_automaton" in analysis.artifacts
+
+    analysis.ll_table
+    assert analysis.builds["ll_table"] == 2
+    assert analysis.builds["compiled_firsts"] == 1
+
+
+def test_basic_analyzer_matches_parsing():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    a = G.add_terminal("a")
+    S %= a + S | G.epsilon
+
+    firsts = compute_firsts(G)
+    assert basic_analyzer.compute_firsts(G) == firsts
+    assert basic_analyzer.compute_follows(G) == compute_follows(G, firsts)
@@ -0,0 +1,150 @@
+import pytest
+
+from pycmp.grammar import Grammar, Symbol, Production
+from grammar_analyzer.cache import ANALYSIS_CACHE, AnalysisCache, cached, grammar_weight
+from grammar_analyzer.analysis import get_augmented
+from grammar_analyzer.lr_analyzer import build_lr_tables
+from grammar_analyzer.lalr_analyzer import build_lalr_tables
+from grammar_analyzer.slr_analyzer import is_slr_grammar, build_slr_tables
+from grammar_analyzer.ll_analyzer import build_ll_table
+
+
+def build_grammar():
+    G = Grammar()
+
+    E = G.add_nonterminal("E", True)
+    T = G.add_nonterminal("T")
+    plus, num = G.add_terminals("+ num")
+
+    E %= E + plus + T | T
+    T %= num
+
+    return G
+
+
+def test_frozen_grammars_share_results():
+    cache = AnalysisCache()
+    calls = []
+
+    @cached(cache=cache)
+    def analyze(grammar):
+        calls.append(grammar)
+        return len(grammar.productions)
+
+    G, H = build_grammar().freeze(), build_grammar().freeze()
+    assert analyze(G) == analyze(H) == 3
+    assert len(calls) == 1
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+
+
+def test_mutable_grammars_are_not_stale():
+    cache = AnalysisCache()
+
+    @cached(cache=cache)
+    def analyze(grammar):
+        return len(grammar.productions)
+
+    G, H = build_grammar(), build_grammar()
+    assert analyze(G) == 3
+    assert analyze(H) == 3
+    assert cache.info().misses == 2
+
+    T = G["T"]
+    T %= G.epsilon
+    assert analyze(G) == 4
+
+
+def test_eviction_is_bounded_by_weight():
+    cache = AnalysisCache(max_entries=10, max_weight=10)
+
+    @cached(cache=cache, weigher=grammar_weight)
+    def analyze(grammar, i):
+        return i
+
+    G = build_grammar().freeze()
+    assert grammar_weight(G) == 8
+
+    analyze(G, 0)
+    analyze(G, 1)
+    info = cache.info()
+    assert info.entries == 1
+    assert info.weight == 8
+    assert info.evictions == 1
+
+    analyze(G, 1)
+    assert cache.info().hits == 1
+
+
+def test_analyzers_accept_frozen_grammars():
+    G = build_grammar()
+    assert is_slr_grammar(G.freeze())
+    assert is_slr_grammar(G)
+
+
+def test_renamed_grammars_share_tables():
+    cache = ANALYSIS_CACHE
+    cache.clear()
+
+    G = build_grammar()
+
+    H = Grammar()
+    T = H.add_nonterminal("term")
+    E = H.add_nonterminal("expr", True)
+    plus, num = H.add_terminals("+ num")
+    T %= num
+    E %= T | E + plus + T
+
+    action, _ = build_lr_tables(G)
+    hits = cache.info().hits
+    other_action, other_goto = build_lr_tables(H)
+    assert cache.info().hits == hits + 1
+
+    assert len(other_action) == len(action)
+    assert all(symbol in H.terminals + [H.eof] for _, symbol in other_action)
+    assert {symbol for _, symbol in other_goto} <= {E, T}
+
+
+def grammars_in(obj):
+    if isinstance(obj, dict):
+        return grammars_in(list(obj.items()))
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return set().union(*(grammars_in(x) for x in obj))
+    if isinstance(obj, Production):
+        return grammars_in([obj.left, *obj.right])
+    if isinstance(obj, Symbol):
+        return {id(obj.grammar)}
+    return set()
+
+
+@pytest.mark.parametrize(
+    "build", [build_slr_tables, build_lr_tables, build_lalr_tables, build_ll_table]
+)
+def test_translated_tables_hold_no_source_objects(build):
+    ANALYSIS_CACHE.clear()
+
+    G = build_grammar()
+    H = Grammar()
+    X = H.add_nonterminal("X", True)
+    Y = H.add_nonterminal("Y")
+    plus, num = H.add_terminals("+ num")
+    X %= X + plus + Y | Y
+    Y %= num
+
+    source = grammars_in(build(G))
+    assert id(get_augmented(G)) in source or build is build_ll_table
+
+    hits = ANALYSIS_CACHE.info().hits
+    translated = grammars_in(build(H))
+    assert ANALYSIS_CACHE.info().hits > hits
+    assert translated <= {id(H), id(get_augmented(H))}
+
+
+def test_tables_are_weighed_by_size():
+    cache = ANALYSIS_CACHE
+    cache.clear()
+
+    G = build_grammar()
+    weight = cache.info().weight
+    action, goto = build_lr_tables(G)
+    assert cache.info().weight - weight >= len(action) + len(goto)
@@ -0,0 +1,79 @@
+from pycmp.grammar import Grammar
+from grammar_analyzer.classifier import classify
+from grammar_analyzer.lalr_analyzer import is_lalr_grammar
+
+
+def test_classify_ll():
+    G = Grammar()
+
+    E = G.add_nonterminal("E", True)
+    T, X = G.add_nonterminals("T X")
+    plus, num, opar, cpar = G.add_terminals("+ num ( )")
+
+    E %= T + X
+    X %= plus + T + X | G.epsilon
+    T %= num | opar + E + cpar
+
+    assert classify(G) == (True, True, True, True)
+
+
+def test_classify_lalr_not_slr():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    L, R = G.add_nonterminals("L R")
+    eq, star, id_ = G.add_terminals("= * id")
+
+    S %= L + eq + R | R
+    L %= star + R | id_
+    R %= L
+
+    assert classify(G) == (False, False, True, True)
+    assert is_lalr_grammar(G) == True
+
+
+def test_classify_lr_not_lalr():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    A, B = G.add_nonterminals("A B")
+    a, b, c, d, e = G.add_terminals("a b c d e")
+
+    S %= a + A + d | b + B + d | a + B + e | b + A + e
+    A %= c
+    B %= c
+
+    assert classify(G) == (False, False, False, True)
+    assert is_lalr_grammar(G) == False
+
+
+def test_classify_ambiguous():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    X = G.add_nonterminal("X")
+    if_, then, else_, num = G.add_terminals("if then else num")
+
+    S %= if_ + X + then + S
+    S %= if_ + X + then + S + else_ + S
+    S %= num
+    X %= num
+
+    assert classify(G) == (False, False, False, False)
+
+
+def test_classify_nonproductive_lalr():
+    # Items of C have no lookaheads: C derives no string
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    A, B, C = G.add_nonterminals("A B C")
+    a = G.add_terminal("a")
+
+    S %= S + S + B
+    A %= a
+    B %= A + a + B | C + S
+    C %= A + C
+
+    assert classify(G) == (False, False, True, True)
+    assert is_lalr_grammar(G) == True
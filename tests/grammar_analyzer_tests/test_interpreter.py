@@ -1,6 +1,7 @@
 import json
 from grammar_analyzer.interpreter.language import grammar, lexer, parser
-from grammar_analyzer.interpreter import eval_input
+from grammar_analyzer.interpreter import eval_input, InputEvaluator
+from grammar_analyzer.interpreter.interpreter import evaluate_ast
 from pycmp.evaluation import evaluate_reverse_parse
 from pycmp.token import Token
 from pycmp.grammar import Grammar
@@ -111,3 +112,35 @@ def test_eval_input():
     balanced %= opar + cpar + balanced | goal_grammar.epsilon
     input_grammar = eval_input(text)
     assert goal_grammar.to_json == input_grammar.to_json
+
+
+def test_eval_input_edits():
+    texts = [
+        "s -> if x then s\ns -> num\nx -> num",
+        "s -> if x then s | eps\ns -> num\nx -> num",
+        "s -> if x then s | eps\ns -> num\nx -> num\ny -> x y",
+        "s -> if x then s | eps\ns -> num\nx -> num\ny -> x y |",
+        "s -> if x then s\ns -> num\nx -> num",
+    ]
+    evaluator = InputEvaluator()
+    for text in texts:
+        try:
+            goal = json.dumps(evaluator(text).to_json)
+        except Exception:
+            goal = None
+        tokens = lexer(text)
+        try:
+            parse, actions = parser(tokens)
+            ast = evaluate_reverse_parse(parse, actions, tokens)
+        except Exception:
+            assert goal is None
+            continue
+        assert goal == json.dumps(evaluate_ast(ast).to_json)
+
+
+def test_input_evaluators_are_independent():
+    first, second = InputEvaluator(), InputEvaluator()
+    assert first("s -> a s | eps").to_json == eval_input("s -> a s | eps").to_json
+    assert second("x -> b").to_json == eval_input("x -> b").to_json
+    assert first("s -> a s | b").to_json == eval_input("s -> a s | b").to_json
+    assert second("x -> b c").to_json == eval_input("x -> b c").to_json
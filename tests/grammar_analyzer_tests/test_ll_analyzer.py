@@ -1,4 +1,4 @@
-from grammar_analyzer.ll_analyzer import build_conflict_str
+from grammar_analyzer.ll_analyzer import build_conflict_str, build_conflict_strs
 from pycmp.grammar import Grammar, Sentence, Production
 from pycmp.utils import ContainerSet
 from pycmp.parsing import build_ll_parser
@@ -29,3 +29,32 @@ def test_build_conflict_str():
         assert False
     except Exception:
         pass
+
+
+def test_build_conflict_strs():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    A, B = G.add_nonterminals("A B")
+    a, b = G.add_terminals("a b")
+
+    S %= A + B
+    A %= a + A | a
+    B %= b + B | b
+
+    assert build_conflict_str(G) == [a]
+    assert build_conflict_strs(G) == {(A, a): [a], (B, b): [a, b]}
+
+
+def test_build_conflict_str_ll1():
+    G = Grammar()
+
+    E = G.add_nonterminal("E", True)
+    X = G.add_nonterminal("X")
+    plus, num = G.add_terminals("+ num")
+
+    E %= num + X
+    X %= plus + num + X | G.epsilon
+
+    assert build_conflict_str(G) is None
+    assert build_conflict_strs(G) == {}
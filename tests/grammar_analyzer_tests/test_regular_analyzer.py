@@ -1,6 +1,7 @@
 from grammar_analyzer.regular_analyzer import (is_regular_grammar,
                                                grammar_to_automaton,
                                                automaton_to_regex,
+                                               build_recognizer,
                                                __automaton_to_gnfa)
 from pycmp.grammar import Grammar, Sentence, Production
 from pycmp.utils import ContainerSet
@@ -79,3 +80,22 @@ def test_automaton_to_regex():
 
     # pprint(gnfa[1])
     # assert False
+
+
+def test_build_recognizer():
+    G = Grammar()
+
+    S = G.add_nonterminal("S", True)
+    A = G.add_nonterminal("A")
+    num, comma = G.add_terminals("num ,")
+
+    S %= num + A
+    S %= num
+    A %= comma + S
+
+    recognizer = build_recognizer(G)
+
+    assert recognizer.match("num , num , num".split())
+    assert not recognizer.match("num , num ,".split())
+    assert not recognizer.match("num num".split())
+    assert recognizer.match_many([["num"], [","]]) == [True, False]
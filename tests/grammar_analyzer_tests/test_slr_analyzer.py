@@ -1,5 +1,12 @@
 from pycmp.grammar import Grammar
-from grammar_analyzer.slr_analyzer import is_slr_grammar
+from grammar_analyzer.slr_analyzer import (
+    build_conflict_str,
+    build_conflict_strs,
+    get_derivation_tree_builder,
+    is_slr_grammar,
+)
+from grammar_analyzer.lr_analyzer import build_conflict_str as lr_build_conflict_str
+from grammar_analyzer.common import search_conflicts
 
 
 def test_is_slr_grammar():
@@ -15,3 +22,86 @@ def test_is_slr_grammar():
     X %= num
 
     assert is_slr_grammar(GG) == False
+
+
+def test_is_slr_grammar_with_precedence():
+    GG = Grammar()
+
+    E = GG.add_nonterminal("E", True)
+    plus, star, num = GG.add_terminals("+ * num")
+
+    E %= E + plus + E | E + star + E | num
+
+    assert is_slr_grammar(GG) == False
+
+    GG = GG.copy()
+    GG.add_precedence("left", plus)
+    GG.add_precedence("left", star)
+
+    assert is_slr_grammar(GG) == True
+
+
+def test_build_conflict_str_is_shortest():
+    GG = Grammar()
+
+    S = GG.add_nonterminal("S", True)
+    X = GG.add_nonterminal("X")
+    if_, then, else_, num = GG.add_terminals("if then else num")
+
+    S %= if_ + X + then + S
+    S %= if_ + X + then + S + else_ + S
+    S %= num
+    X %= num
+
+    # SLR(1) already fails once `else` follows a complete inner statement,
+    # LR(1) only when the `if` is nested
+    assert build_conflict_str(GG) == [if_, num, then, num, else_]
+    assert lr_build_conflict_str(GG) == [if_, num, then, if_, num, then, num, else_]
+
+    conflicts = build_conflict_strs(GG)
+    assert len(conflicts) == 1
+    assert list(conflicts.values()) == [[if_, num, then, num, else_]]
+
+
+def test_build_conflict_strs_without_conflicts():
+    GG = Grammar()
+
+    E = GG.add_nonterminal("E", True)
+    plus, num = GG.add_terminals("+ num")
+
+    E %= E + plus + num | num
+
+    assert build_conflict_str(GG) is None
+    assert build_conflict_strs(GG, time_budget=60) == {}
+
+
+def test_search_conflicts_records_conflicts_at_their_cost():
+    # the conflict is reachable from 0 by reading x, and from 1 for free
+    successors = {0: [(None, 1)], 1: []}
+    conflicts = {0: [("key", "x")], 1: [("key", None)]}
+
+    found = search_conflicts(0, successors.__getitem__, conflicts.__getitem__, {"key"})
+    assert found == {"key": []}
+
+
+def test_derivation_tree_builders_are_independent():
+    GG = Grammar()
+
+    E = GG.add_nonterminal("E", True)
+    plus, num = GG.add_terminals("+ num")
+
+    E %= E + plus + num | num
+
+    first = get_derivation_tree_builder(GG)
+    second = get_derivation_tree_builder(GG)
+    assert first is not second
+
+    def fresh(tokens):
+        return str(get_derivation_tree_builder(GG)(tokens))
+
+    for tokens, other in [
+        (["num", "+", "num"], ["num"]),
+        (["num", "+", "num", "+", "num"], ["num", "+", "num"]),
+    ]:
+        assert str(first(tokens)) == fresh(tokens)
+        assert str(second(other)) == fresh(other)
@@ -0,0 +1,44 @@
+import threading
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+from streamlit.ReportThread import ReportContext, add_report_ctx, _WidgetIDSet
+from streamlit.UploadedFileManager import UploadedFileManager
+from streamlit.widgets import Widgets
+from grammar_analyzer.stapp import input_grammar
+from grammar_analyzer.stapp.session import get_session_state
+
+
+def run_in_session(function, uploaded_file_mgr):
+    """Run `function` in a script thread of the session of `uploaded_file_mgr`."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    ctx = ReportContext(lambda msg: None, Widgets(), _WidgetIDSet(), uploaded_file_mgr)
+    add_report_ctx(thread, ctx)
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_input_grammar_bare():
+    grammar = input_grammar()
+    assert grammar is not None
+    assert str(grammar.start_symbol) == "s"
+
+    evaluator = get_session_state()["input_evaluator"]
+    assert input_grammar().fingerprint == grammar.fingerprint
+    assert get_session_state()["input_evaluator"] is evaluator
+
+
+def test_input_grammar_sessions():
+    first, second = UploadedFileManager(), UploadedFileManager()
+
+    assert run_in_session(input_grammar, first) is not None
+    assert run_in_session(input_grammar, second) is not None
+    evaluator = run_in_session(get_session_state, first)["input_evaluator"]
+    assert run_in_session(get_session_state, second)["input_evaluator"] is not evaluator
+
+    # Reruns get new report contexts but keep the session state
+    assert run_in_session(input_grammar, first) is not None
+    assert run_in_session(get_session_state, first)["input_evaluator"] is evaluator
@@ -1,10 +1,13 @@
+import random
 import pytest
 
 from pycmp.automata import move, epsilon_closure
-from pycmp.automata import nfa_to_dfa
+from pycmp.automata import nfa_to_dfa, epsilon_closures
 from pycmp.automata import automata_union, automata_concatenation, automata_closure
 from pycmp.automata import state_minimization, automata_minimization
-from pycmp.automata import State
+from pycmp.automata import hopcroft_minimization
+from pycmp.automata import NFA, State, CompiledDFA
+from pycmp.utils import DisjointSet
 
 from tests.pycmp_tests.test_automata_cases import test_dfa_cases
 from tests.pycmp_tests.test_automata_cases import test_move_cases
@@ -159,3 +162,105 @@ def test_automata_minimization_recognize(automaton, text, recognize):
 def test_state(automaton, text, recognize):
     state = State.from_nfa(automaton)
     assert recognize == state.recognize(text)
+
+
+def test_subset_construction_blowup():
+    # (a|b)*a(a|b)^k needs a DFA state for every suffix of length k + 1
+    k = 6
+    transitions = {(0, "a"): [0, 1], (0, "b"): [0]}
+    for i in range(1, k + 1):
+        transitions[i, "a"] = transitions[i, "b"] = [i + 1]
+    nfa = NFA(k + 2, [k + 1], transitions)
+
+    dfa = nfa_to_dfa(nfa)
+    start = State.from_nfa(nfa).to_deterministic()
+    assert dfa.states == len(list(start)) == 2 ** (k + 1)
+
+    for n in range(2 ** (k + 2)):
+        text = bin(n)[3:].replace("0", "a").replace("1", "b")
+        expected = len(text) > k and text[-k - 1] == "a"
+        assert dfa.recognize(text) == start.recognize(text) == expected
+
+
+def test_epsilon_closures_cycles():
+    rng = random.Random(0)
+    for _ in range(50):
+        n = rng.randint(1, 12)
+        edges = [[rng.randrange(n) for _ in range(rng.randint(0, 2))] for _ in range(n)]
+        epsilon = [sum({1 << d for d in destinations}) for destinations in edges]
+
+        closures = epsilon_closures(epsilon)
+        for state in range(n):
+            reached, pending = {state}, [state]
+            while pending:
+                for destination in edges[pending.pop()]:
+                    if destination not in reached:
+                        reached.add(destination)
+                        pending.append(destination)
+            assert closures[state] == sum(1 << s for s in reached)
+
+    nfa = NFA(3, [2], {(0, ""): [1], (1, ""): [0, 2], (2, "a"): [0]})
+    assert nfa.closures == [0b111, 0b111, 0b100]
+    assert State.from_nfa(nfa).recognize("aa")
+
+
+def test_hopcroft_minimization():
+    rng = random.Random(1)
+    for _ in range(50):
+        n = rng.randint(1, 10)
+        transitions = [
+            {c: rng.randrange(n) for c in "ab" if rng.random() < 0.8} for _ in range(n)
+        ]
+        labels = [rng.choice([None, None, "x", "y"]) for _ in range(n)]
+        blocks = hopcroft_minimization(transitions, labels)
+        assert blocks[0] == 0
+
+        # Moore's refinement, with the missing transitions as a class of their own
+        classes = labels
+        while True:
+            signatures = [
+                (classes[s],)
+                + tuple(
+                    classes[transitions[s][c]] if c in transitions[s] else "dead"
+                    for c in "ab"
+                )
+                for s in range(n)
+            ]
+            refined = [signatures.index(signature) for signature in signatures]
+            if len(set(refined)) == len(set(classes)):
+                break
+            classes = refined
+
+        for s in range(n):
+            for t in range(n):
+                assert (blocks[s] == blocks[t]) == (classes[s] == classes[t])
+
+
+def test_minimize_keeps_tags():
+    a = State(0)
+    b, c = State(1, True), State(2, True)
+    b.tag, c.tag = "x", "y"
+    a.add_transition("a", b).add_transition("b", c)
+
+    assert len(a.minimize().reachable()) == 2
+    minimized = a.minimize(key=lambda state: state.tag)
+    assert len(minimized.reachable()) == 3
+    assert minimized.get("a").tag == "x" and minimized.get("b").tag == "y"
+
+
+def test_disjoint_set():
+    partition = DisjointSet(*range(100))
+    for i in range(0, 98, 2):
+        partition.merge([i, i + 2])
+    assert len(partition) == 51
+    assert partition[0].representative is partition[98].representative
+    assert partition[1].representative is not partition[0].representative
+    assert sorted(len(group) for group in partition.groups) == [1] * 50 + [50]
+
+
+@pytest.mark.parametrize(("nfa", "text", "recognize"), test_nfa_to_dfa_recognize_cases)
+def test_compiled_dfa(nfa, text, recognize):
+    compiled = CompiledDFA(nfa_to_dfa(nfa))
+    assert recognize == compiled.match(text) == compiled.match(list(text))
+    assert not compiled.match(text + "?")
+    assert compiled.match_many([text, text], workers=2) == [recognize] * 2
@@ -0,0 +1,143 @@
+import pytest
+
+from pycmp.grammar import Grammar
+from pycmp.automata import NFA, nfa_to_dfa
+from pycmp.budget import Budget, CancellationToken
+from pycmp.exceptions import BudgetExceeded
+from pycmp.parsing import build_lr1_automaton, build_minimal_lr1_automaton
+from pycmp.parsing import build_lr0_automaton, CompiledLR1Parser, CompiledSLR1Parser
+from pycmp.parsing import LR1Parser, SLR1Parser
+from grammar_analyzer.analysis import GrammarAnalysis, get_analysis
+from grammar_analyzer.cache import ANALYSIS_CACHE
+from grammar_analyzer.classifier import classify
+from grammar_analyzer.lalr_analyzer import LALRParser, is_lalr_grammar
+from grammar_analyzer.lr_analyzer import build_lr_tables, is_lr_grammar
+from grammar_analyzer.slr_analyzer import build_slr_tables, is_slr_grammar
+from grammar_analyzer.enhancer import remove_left_recursion
+
+
+def build_grammar():
+    G = Grammar()
+    E = G.add_nonterminal("E", True)
+    T, F = G.add_nonterminals("T F")
+    plus, star, opar, cpar, num = G.add_terminals("+ * ( ) num")
+
+    E %= E + plus + T | T
+    T %= T + star + F | F
+    F %= num | opar + E + cpar
+
+    return G
+
+
+def test_budget_limits():
+    budget = Budget(max_states=2).track("test")
+    budget.charge(states=2, items=10, bytes=100)
+
+    with pytest.raises(BudgetExceeded) as info:
+        budget.charge(states=1)
+    assert info.value.limit == "states"
+    assert info.value.stats["stage"] == "test"
+    assert info.value.stats["states"] == 3
+    assert info.value.stats["items"] == 10
+    assert info.value.stats["bytes"] == 100
+
+    with pytest.raises(BudgetExceeded) as info:
+        Budget(max_items=5).charge(items=6)
+    assert info.value.limit == "items"
+
+    with pytest.raises(BudgetExceeded) as info:
+        Budget(max_bytes=5).charge(bytes=6)
+    assert info.value.limit == "bytes"
+
+    budget = Budget(max_seconds=1).track("test")
+    budget.started -= 2
+    with pytest.raises(BudgetExceeded) as info:
+        budget.check()
+    assert info.value.limit == "seconds"
+
+
+def test_budget_cancellation():
+    token = CancellationToken()
+    budget = Budget(token=token)
+    budget.charge(states=100)
+
+    token.cancel()
+    with pytest.raises(BudgetExceeded) as info:
+        budget.check()
+    assert info.value.limit == "cancelled"
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda G, budget: build_lr0_automaton(G.get_augmented_grammar(), budget),
+        lambda G, budget: build_lr0_automaton(
+            G.get_augmented_grammar()
+        ).to_deterministic(budget=budget),
+        lambda G, budget: build_lr1_automaton(G.get_augmented_grammar(), budget=budget),
+        lambda G, budget: build_minimal_lr1_automaton(
+            G.get_augmented_grammar(), budget
+        ),
+        lambda G, budget: CompiledSLR1Parser(G, budget=budget),
+        lambda G, budget: CompiledLR1Parser(G, budget=budget),
+        lambda G, budget: SLR1Parser(G, budget=budget),
+        lambda G, budget: LR1Parser(G, budget=budget),
+        lambda G, budget: LR1Parser(G, minimal=True, budget=budget),
+        lambda G, budget: LALRParser(G, budget=budget),
+        lambda G, budget: GrammarAnalysis(G, budget).lr1_automaton,
+        lambda G, budget: remove_left_recursion(G, budget),
+        lambda G, budget: is_slr_grammar(G, budget=budget),
+        lambda G, budget: is_lalr_grammar(G, budget=budget),
+        lambda G, budget: is_lr_grammar(G, budget=budget),
+        lambda G, budget: build_slr_tables(G, budget=budget),
+        lambda G, budget: build_lr_tables(G, budget=budget),
+        lambda G, budget: classify(G, budget=budget),
+    ],
+)
+def test_builders_stop_on_budget(build):
+    G = build_grammar()
+    build(G, Budget())
+
+    budget = Budget(max_items=3)
+    with pytest.raises(BudgetExceeded) as info:
+        build(G, budget)
+    assert info.value.stats["items"] > 3
+    assert info.value.stats["stage"] is not None
+
+
+def test_budgeted_analysis_is_not_cached():
+    G = build_grammar()
+    assert is_lr_grammar(G)
+    entries = ANALYSIS_CACHE.info().entries
+
+    with pytest.raises(BudgetExceeded):
+        is_lr_grammar(G, budget=Budget(max_items=3))
+    budget = Budget()
+    assert is_lr_grammar(G, budget=budget)
+    assert budget.items > 0
+    assert ANALYSIS_CACHE.info().entries == entries
+
+    analysis = get_analysis(G, budget=budget)
+    assert analysis.budget is budget
+    assert analysis is not get_analysis(G, budget=budget)
+    assert get_analysis(G) is get_analysis(G)
+
+
+def test_nfa_to_dfa_budget():
+    nfa = NFA(
+        states=3,
+        finals=[2],
+        transitions={
+            (0, "a"): [0, 1],
+            (0, "b"): [0],
+            (1, "a"): [2],
+            (1, "b"): [2],
+        },
+    )
+    budget = Budget()
+    dfa = nfa_to_dfa(nfa, budget)
+    assert budget.states == dfa.states - 1
+
+    with pytest.raises(BudgetExceeded) as info:
+        nfa_to_dfa(nfa, Budget(max_states=1))
+    assert info.value.stats["stage"] == "nfa to dfa"
@@ -0,0 +1,97 @@
+from pycmp.grammar import Grammar
+from pycmp.canonical import canonical_form, isomorphism, translate
+from pycmp.parsing import LR1Parser
+
+
+def build_grammar(names, reverse=False):
+    start, *names = names.split()
+    G = Grammar()
+
+    E = G.add_nonterminal(start, True)
+    T, F = G.add_nonterminals(" ".join(names))
+    plus, star, num, opar, cpar = G.add_terminals("+ * num ( )")
+
+    productions = [
+        (E, E + plus + T),
+        (E, T),
+        (T, T + star + F),
+        (T, F),
+        (F, num),
+        (F, opar + E + cpar),
+    ]
+    if reverse:
+        productions.reverse()
+    for left, right in productions:
+        left %= right
+
+    return G
+
+
+def test_canonical_form_ignores_names_and_order():
+    G = build_grammar("E T F")
+    H = build_grammar("expr term factor", reverse=True)
+
+    assert canonical_form(G) == canonical_form(H)
+    assert canonical_form(G).fingerprint != G.fingerprint
+    assert canonical_form(G).ids[G.start_symbol] == 0
+
+
+def test_canonical_form_keeps_structure():
+    G = build_grammar("E T F")
+
+    H = build_grammar("E T F")
+    H.add_precedence("left", H["+"])
+    assert canonical_form(G) != canonical_form(H)
+
+    H = build_grammar("E T F")
+    F = H["F"]
+    F %= H["E"]
+    assert canonical_form(G) != canonical_form(H)
+
+    assert isomorphism(G, H) is None
+
+
+def test_canonical_form_breaks_symmetric_ties():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    A, B = G.add_nonterminals("A B")
+    a = G.add_terminal("a")
+
+    S %= A + B
+    A %= a
+    B %= a
+
+    H = Grammar()
+    S = H.add_nonterminal("S", True)
+    B, A = H.add_nonterminals("B A")
+    a = H.add_terminal("a")
+
+    S %= B + A
+    B %= a
+    A %= a
+
+    assert canonical_form(G) == canonical_form(H)
+    assert isomorphism(G, H) is not None
+
+
+def test_translate_tables():
+    G = build_grammar("E T F")
+    H = build_grammar("expr term factor", reverse=True)
+
+    mapping = isomorphism(G, H)
+    assert mapping[G["E"]] is H["expr"]
+    assert mapping[G["num"]] is H["num"]
+
+    parser = LR1Parser(G)
+    action = translate(parser.action, mapping)
+    goto = translate(parser.goto, mapping)
+
+    nonterminals = set(H.nonterminals)
+    assert all(symbol in H.terminals + [H.eof] for _, symbol in action)
+    assert all(symbol in nonterminals for _, symbol in goto)
+    assert all(
+        tag in H.productions
+        for action_, tag in action.values()
+        if action_ == parser.REDUCE
+    )
+    assert len(action) == len(LR1Parser(H).action)
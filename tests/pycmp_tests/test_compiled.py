@@ -0,0 +1,270 @@
+import pytest
+
+from pycmp.grammar import Grammar, Production, Sentence
+from pycmp.parsing import compute_local_first
+from pycmp.parsing import CompiledSLR1Parser, CompiledLR1Parser, CompiledLALR1Parser
+from pycmp.compiled import CompiledGrammar, LR1Collection
+from pycmp.compiled import compute_firsts, compute_follows, build_ll_table
+from pycmp.compiled import compute_suffix_firsts
+from pycmp.compiled import decode_firsts, decode_follows
+from pycmp.budget import Budget
+from pycmp.exceptions import BudgetExceeded
+
+from tests.pycmp_tests.test_parsing_cases import test_compute_firsts_cases
+from tests.pycmp_tests.test_parsing_cases import test_compute_follows_cases
+from tests.pycmp_tests.test_parsing_cases import test_build_ll_table_cases
+from tests.pycmp_tests.test_parsing_cases import test_slr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_lr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_lr1_not_lalr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_precedence_parser_cases
+
+
+def test_compiled_grammar_layout():
+    G = Grammar()
+    E = G.add_nonterminal("E", True)
+    T = G.add_nonterminal("T")
+    plus, num = G.add_terminals("+ num")
+
+    T %= num
+    E %= E + plus + T | T
+
+    cg = CompiledGrammar(G)
+    assert cg.symbols == [plus, num, G.eof, E, T]
+    assert cg.n_terminals == 3 and cg.eof == 2 and cg.start == 3
+
+    assert [str(p) for p in cg.productions] == ["E := E + T", "E := T", "T := num"]
+    assert list(cg.rhs) == [3, 0, 4, 4, 1]
+    assert list(cg.offsets) == [0, 3, 4, 5]
+    assert list(cg.productions_of(cg.ids[E])) == [0, 1]
+    assert list(cg.productions_of(cg.ids[T])) == [2]
+
+    # E -> E . + T
+    item = cg.item_base[0] + 1
+    assert cg.item_next[item] == cg.ids[plus]
+    assert cg.item_next[cg.item_base[0] + 3] == -1
+    assert cg.item_production[item] == 0
+
+
+@pytest.mark.parametrize(("grammar", "firsts"), test_compute_firsts_cases)
+def test_compute_firsts(grammar, firsts):
+    cg = CompiledGrammar(grammar)
+    assert firsts == decode_firsts(cg, *compute_firsts(cg))
+
+
+@pytest.mark.parametrize(("grammar", "firsts", "follows"), test_compute_follows_cases)
+def test_compute_follows(grammar, firsts, follows):
+    cg = CompiledGrammar(grammar)
+    first_masks, nullable = compute_firsts(cg)
+    assert follows == decode_follows(cg, compute_follows(cg, first_masks, nullable))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "firsts", "follows", "table"), test_build_ll_table_cases
+)
+def test_build_ll_table(grammar, firsts, follows, table):
+    cg = CompiledGrammar(grammar)
+    first_masks, nullable = compute_firsts(cg)
+    suffixes = compute_suffix_firsts(cg, first_masks, nullable)
+    follow_masks = compute_follows(cg, first_masks, nullable, suffixes)
+
+    compiled = build_ll_table(cg, suffixes, follow_masks)
+    assert table == {
+        (cg.symbols[x], cg.symbols[t]): [cg.productions[p] for p in productions]
+        for (x, t), productions in compiled.items()
+    }
+
+
+@pytest.mark.parametrize(("grammar", "firsts"), test_compute_firsts_cases)
+def test_compute_suffix_firsts(grammar, firsts):
+    cg = CompiledGrammar(grammar)
+    suffix_firsts, suffix_nullable = compute_suffix_firsts(cg, *compute_firsts(cg))
+
+    for p, production in enumerate(cg.productions):
+        for dot in range(len(production.right) + 1):
+            item = cg.item_base[p] + dot
+            expected = compute_local_first(firsts, tuple(production.right)[dot:])
+            assert set(cg.terminals_of(suffix_firsts[item])) == expected.set
+            assert bool(suffix_nullable[item]) == expected.contains_epsilon
+
+
+@pytest.mark.parametrize(("grammar", "tokens", "derivation"), test_slr1_parser_cases)
+def test_compiled_slr1_parser(grammar, tokens, derivation):
+    parser = CompiledSLR1Parser(grammar)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"),
+    test_lr1_parser_cases + test_lr1_not_lalr1_parser_cases,
+)
+def test_compiled_lr1_parser(grammar, tokens, derivation):
+    parser = CompiledLR1Parser(grammar)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize("parser_class", [CompiledSLR1Parser, CompiledLR1Parser])
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_precedence_parser_cases
+)
+def test_compiled_precedence_parser(parser_class, grammar, tokens, derivation):
+    parser = parser_class(grammar)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_lr1_parser_cases + test_slr1_parser_cases
+)
+def test_compiled_lalr1_parser(grammar, tokens, derivation):
+    parser = CompiledLALR1Parser(grammar)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_lr1_not_lalr1_parser_cases
+)
+def test_compiled_lalr1_parser_conflicts(grammar, tokens, derivation):
+    with pytest.raises(AssertionError):
+        CompiledLALR1Parser(grammar)
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"),
+    test_lr1_parser_cases + test_lr1_not_lalr1_parser_cases,
+)
+def test_lr1_collection_cores(grammar, tokens, derivation):
+    collection = CompiledLR1Parser(grammar).collection
+    merged = collection.merge_cores()
+
+    assert len(set(collection.states)) == len(collection.states)
+    assert len(merged.states) == len({core for core, _ in collection.states})
+    assert len(merged.states) < len(collection.states)
+
+    # Merged masks are the union of the masks of the states with that core
+    for core, masks in merged.states:
+        union = [0] * len(masks)
+        for other, other_masks in collection.states:
+            if other == core:
+                union = [a | b for a, b in zip(union, other_masks)]
+        assert list(masks) == union
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"),
+    test_lr1_parser_cases + test_lr1_not_lalr1_parser_cases,
+)
+def test_parallel_lr1_collection(grammar, tokens, derivation):
+    cg = CompiledGrammar(grammar.get_augmented_grammar(True))
+    suffixes = compute_suffix_firsts(cg, *compute_firsts(cg))
+
+    sequential = LR1Collection(cg, suffixes).build([cg.start])
+    parallel = LR1Collection(cg, suffixes).build([cg.start], workers=2, min_wave=1)
+
+    assert parallel.states == sequential.states
+    assert parallel.gotos == sequential.gotos
+    assert parallel.item_sets() == sequential.item_sets()
+
+
+def test_parallel_lr1_collection_stops_on_budget():
+    grammar = test_lr1_parser_cases[0][0]
+    cg = CompiledGrammar(grammar.get_augmented_grammar(True))
+    suffixes = compute_suffix_firsts(cg, *compute_firsts(cg))
+
+    with pytest.raises(BudgetExceeded):
+        LR1Collection(cg, suffixes).build(
+            [cg.start], workers=2, min_wave=1, budget=Budget(max_states=2)
+        )
+
+
+def parsing_tables(parser):
+    action = {
+        key: (kind, tag if kind == "SHIFT" else str(tag))
+        for key, (kind, tag) in parser.action.items()
+    }
+    return action, parser.goto
+
+
+@pytest.mark.parametrize(
+    "parser_class", [CompiledSLR1Parser, CompiledLR1Parser, CompiledLALR1Parser]
+)
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_lr1_parser_cases + test_slr1_parser_cases
+)
+def test_compiled_parser_update(parser_class, grammar, tokens, derivation):
+    G = Grammar.from_json(grammar.to_json)
+    try:
+        parser = parser_class(G)
+    except AssertionError:
+        return
+    tokens = [G[token.name] for token in tokens]
+
+    for production in list(G.productions):
+        try:
+            parser.update(removed=[production])
+        except AssertionError:
+            continue
+        assert parsing_tables(parser) == parsing_tables(parser_class(G))
+
+        parser.update(added=[production])
+        assert parsing_tables(parser) == parsing_tables(parser_class(G))
+        assert derivation == str(parser(tokens))
+
+
+def test_compiled_parser_update_conflict():
+    G = Grammar()
+    E = G.add_nonterminal("E", True)
+    plus, num = G.add_terminals("+ num")
+    E %= E + plus + num | num
+
+    parser = CompiledLR1Parser(G)
+    tables = parsing_tables(parser)
+    productions = list(G.productions)
+
+    ambiguous = Production(E, Sentence(E, plus, E))
+    with pytest.raises(AssertionError):
+        parser.update(added=[ambiguous], removed=[productions[1]])
+    assert G.productions == productions and E.productions == productions
+    assert parsing_tables(parser) == tables
+    assert "[E -> num]" == str(parser([num, G.eof]))
+
+
+def test_parser_update_rollback_resets_fingerprint():
+    seen = []
+
+    class FailingParser(CompiledLR1Parser):
+        def _update_parsing_table(self):
+            seen.append(self.grammar.fingerprint)
+            raise AssertionError()
+
+    G = Grammar()
+    E = G.add_nonterminal("E", True)
+    plus, num = G.add_terminals("+ num")
+    E %= E + plus + num | num
+
+    parser = FailingParser(G)
+    fingerprint = G.fingerprint
+    with pytest.raises(AssertionError):
+        parser.update(removed=[G.productions[0]])
+    assert seen != [fingerprint]
+    assert G.fingerprint == fingerprint
+
+
+def test_compiled_parser_update_frozen_grammar():
+    G = Grammar()
+    E = G.add_nonterminal("E", True)
+    plus, num = G.add_terminals("+ num")
+    E %= E + plus + num | num
+
+    frozen = G.freeze()
+    fingerprint = frozen.fingerprint
+    productions = list(frozen.productions)
+    with pytest.raises(TypeError):
+        frozen.remove_production(productions[0])
+
+    parser = CompiledLR1Parser(frozen)
+    tables = parsing_tables(parser)
+    for edit in [{"removed": [productions[0]]}, {"added": [productions[0]]}]:
+        with pytest.raises(TypeError):
+            parser.update(**edit)
+        assert frozen.productions == productions
+        assert frozen.fingerprint == fingerprint
+        assert parsing_tables(parser) == tables
@@ -0,0 +1,50 @@
+import pytest
+
+from pycmp.disk import DiskStateStore, build_lr1_tables_on_disk
+from pycmp.parsing import CompiledLR1Parser
+
+from tests.pycmp_tests.test_parsing_cases import test_lr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_lr1_not_lalr1_parser_cases
+
+
+def test_disk_state_store(tmp_path):
+    keys = [(i % 3, tuple(range(i, i + i % 3 + 1))) for i in range(3000)]
+
+    with DiskStateStore(tmp_path, 2, [1, 2, 3], max_memory=256) as store:
+        ids = [store.intern(core, masks) for core, masks in keys]
+        assert ids == [(i, True) for i in range(3000)]
+        assert len(store.hot) < 10
+
+        assert [store.intern(core, masks) for core, masks in keys[::7]] == [
+            (i, False) for i in range(0, 3000, 7)
+        ]
+        assert [store.key(i) for i in range(3000)] == keys
+    assert store.log.closed
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"),
+    test_lr1_parser_cases + test_lr1_not_lalr1_parser_cases,
+)
+def test_build_lr1_tables_on_disk(tmp_path, grammar, tokens, derivation):
+    parser = CompiledLR1Parser(grammar)
+    cg = parser.compiled
+
+    action, goto = {}, {}
+    with build_lr1_tables_on_disk(
+        cg, parser.suffixes, tmp_path, max_memory=512
+    ) as tables:
+        assert tables.states == len(parser.collection.states)
+        assert list(tables.conflicts()) == []
+
+        for state, (row_action, row_goto) in enumerate(tables.rows()):
+            for t, [(kind, value)] in row_action.items():
+                if kind != "SHIFT":
+                    value = cg.productions[value]
+                action[state, cg.symbols[t]] = (kind, value)
+            for x, dest in row_goto.items():
+                goto[state, cg.symbols[x]] = dest
+    assert tables.rows_file.closed
+
+    assert action == parser.action
+    assert goto == parser.goto
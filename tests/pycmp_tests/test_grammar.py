@@ -0,0 +1,114 @@
+import pytest
+from pycmp.grammar import Grammar, FrozenGrammar
+
+
+def build_grammar():
+    G = Grammar()
+
+    E = G.add_nonterminal("E", True)
+    T = G.add_nonterminal("T")
+    plus, num = G.add_terminals("+ num")
+
+    E %= E + plus + T | T
+    T %= num
+
+    return G
+
+
+def test_fingerprint_is_content_based():
+    G, H = build_grammar(), build_grammar()
+    assert G.fingerprint == H.fingerprint
+
+    H.add_precedence("left", H["+"])
+    assert G.fingerprint != H.fingerprint
+
+    T = G["T"]
+    fingerprint = G.fingerprint
+    T %= G.epsilon
+    assert G.fingerprint != fingerprint
+
+
+def test_freeze_interns_equal_grammars():
+    G, H = build_grammar(), build_grammar()
+
+    frozen = G.freeze()
+    assert isinstance(frozen, FrozenGrammar)
+    assert frozen is H.freeze()
+    assert frozen.freeze() is frozen
+    assert frozen.fingerprint == G.fingerprint
+    assert [str(p) for p in frozen.productions] == [str(p) for p in G.productions]
+
+
+def test_frozen_grammar_is_a_snapshot():
+    G = build_grammar()
+    frozen = G.freeze()
+
+    T = G["T"]
+    T %= G.epsilon
+    assert len(frozen.productions) == 3
+    assert len(frozen["T"].productions) == 1
+
+    with pytest.raises(TypeError):
+        frozen.add_terminal("*")
+    with pytest.raises(TypeError):
+        E = frozen["E"]
+        E %= frozen["num"]
+
+    augmented = frozen.get_augmented_grammar(True)
+    assert len(augmented.productions) == 4
+    assert len(frozen.productions) == 3
+
+
+def test_frozen_grammar_copy_is_mutable():
+    G = build_grammar()
+    frozen = G.freeze()
+
+    copy = frozen.copy()
+    assert not isinstance(copy, FrozenGrammar)
+    T = copy["T"]
+    T %= copy.epsilon
+    assert len(copy.productions) == 4
+    assert len(frozen.productions) == 3 and len(frozen["T"].productions) == 1
+    assert copy.fingerprint != frozen.fingerprint
+
+    T = G["T"]
+    T %= G.epsilon
+    assert copy.fingerprint == G.fingerprint
+
+
+def build_attributed_grammar(offset):
+    G = Grammar()
+
+    E = G.add_nonterminal("E", True)
+    num = G.add_terminal("num")
+
+    E %= num, lambda h, s: int(s[1]) + offset
+
+    return G
+
+
+def test_fingerprint_of_attributed_grammars():
+    G, H = build_attributed_grammar(0), build_attributed_grammar(0)
+    assert G.fingerprint == H.fingerprint
+    assert G.fingerprint != build_attributed_grammar(1).fingerprint
+
+    def other(h, s):
+        return int(s[1])
+
+    E = H["E"]
+    E %= H["num"] + H["num"], other
+    assert G.fingerprint != H.fingerprint
+
+
+def test_fingerprint_is_cached_until_changed():
+    G = build_grammar()
+    fingerprint = G.fingerprint
+    assert G._fingerprint == fingerprint
+
+    G.add_terminal("*")
+    assert G._fingerprint is None
+    assert G.fingerprint != fingerprint
+
+    fingerprint = G.fingerprint
+    G.start_symbol = G["T"]
+    assert G.fingerprint != fingerprint
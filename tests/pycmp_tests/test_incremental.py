@@ -0,0 +1,174 @@
+import random
+import pytest
+
+from pycmp.grammar import Grammar, Production, Sentence
+from pycmp.lexer import Lexer, IncrementalLexer
+from pycmp.evaluation import evaluate_reverse_parse
+from pycmp.parsing import compute_firsts, compute_follows
+from pycmp.parsing import SLR1Parser, LR1Parser, CompiledLR1Parser
+from pycmp.incremental import IncrementalAnalysis, IncrementalDocument
+
+from tests.pycmp_tests.test_parsing_cases import test_compute_follows_cases
+
+
+def assert_up_to_date(analysis):
+    firsts = compute_firsts(analysis.grammar)
+    assert analysis.firsts == firsts
+    assert analysis.follows == compute_follows(analysis.grammar, firsts)
+
+
+@pytest.mark.parametrize(("grammar", "firsts", "follows"), test_compute_follows_cases)
+def test_incremental_analysis(grammar, firsts, follows):
+    G = Grammar.from_json(grammar.to_json)
+    analysis = IncrementalAnalysis(G)
+    assert_up_to_date(analysis)
+
+    productions = list(G.productions)
+    for production in productions[::2] + productions[1::2]:
+        analysis.remove_production(production)
+        assert_up_to_date(analysis)
+
+    for production in reversed(productions):
+        analysis.add_production(production)
+        assert_up_to_date(analysis)
+
+
+def test_incremental_analysis_cycles():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    A, B = G.add_nonterminals("A B")
+    a, b = G.add_terminals("a b")
+
+    S %= A + a
+    A %= B
+    B %= A | b + G.epsilon
+
+    analysis = IncrementalAnalysis(G)
+    assert analysis.firsts[A] == {b}
+
+    # A and B only support each other now
+    analysis.remove_production(Production(B, Sentence(b)))
+    assert analysis.firsts[A] == set() and analysis.firsts[B] == set()
+    assert_up_to_date(analysis)
+
+    analysis.apply(added=[Production(B, G.epsilon)])
+    assert analysis.nullable == {A, B}
+    assert analysis.firsts[S] == {a}
+    assert_up_to_date(analysis)
+
+    C = G.add_nonterminal("C")
+    analysis.apply(
+        added=[Production(C, Sentence(B, b)), Production(B, Sentence(C))],
+        removed=[Production(B, G.epsilon)],
+    )
+    assert analysis.nullable == set()
+    assert analysis.follows[B] == {a, b}
+    assert_up_to_date(analysis)
+
+
+def build_statements():
+    G = Grammar()
+    L = G.add_nonterminal("L", True)
+    S, E, T = G.add_nonterminals("S E T")
+    semi, plus, op, cp, num, idx, eq = G.add_terminals("; + ( ) num id =")
+
+    L %= L + S, lambda h, s: s[1] + [s[2]]
+    L %= S, lambda h, s: [s[1]]
+    S %= idx + eq + E + semi, lambda h, s: (s[1], s[3])
+    E %= E + plus + T, lambda h, s: s[1] + s[3]
+    E %= T, lambda h, s: s[1]
+    T %= num, lambda h, s: int(s[1])
+    T %= op + E + cp, lambda h, s: s[2]
+
+    digits = "|".join("0123456789")
+    letters = "|".join("abcdefghijklmnopqrstuvwxyz")
+    lexer = Lexer(
+        [
+            (num, f"({digits})({digits})*"),
+            (idx, f"({letters})({letters})*"),
+            (semi, ";"),
+            (plus, r"\+"),
+            (op, r"\("),
+            (cp, r"\)"),
+            (eq, "="),
+            ("space", "  *"),
+        ],
+        G.eof,
+        ignore=["space"],
+    )
+    return G, lexer
+
+
+@pytest.mark.parametrize("parser_class", [SLR1Parser, LR1Parser, CompiledLR1Parser])
+def test_incremental_document(parser_class):
+    G, lexer = build_statements()
+    parser = parser_class(G)
+    text = "".join(f"v = ({i} + 1) + {i};" for i in range(20))
+    document = IncrementalDocument(lexer, parser, text)
+
+    def assert_up_to_date():
+        tokens = lexer(document.text)
+        right_parse, actions = parser([t.ttype for t in tokens], return_actions=True)
+        assert document.parser.right_parse() == right_parse
+        value = evaluate_reverse_parse(right_parse, actions, tokens)
+        assert document.tree.evaluate() == value
+
+    assert_up_to_date()
+    assert document.tree.evaluate()[3] == ("v", 7)
+
+    middle = text.index(";", len(text) // 2) + 1
+    document.edit(middle, middle, " w = 2 + (3);")
+    assert_up_to_date()
+    assert 0 < document.parser.reused < 40
+
+    document.edit(5, 6, "10")
+    assert_up_to_date()
+    assert document.tree.evaluate()[0] == ("v", 11)
+
+    with pytest.raises(Exception):
+        document.edit(0, 1, "1")
+    assert document.tree is None
+    document.update(text)
+    assert_up_to_date()
+
+
+def test_incremental_lexer_random_edits():
+    _, lexer = build_statements()
+    rng = random.Random(7)
+    incremental = IncrementalLexer(lexer, "".join(f"v = {i};" for i in range(30)))
+
+    for _ in range(300):
+        start = rng.randrange(len(incremental.text) + 1)
+        end = min(len(incremental.text), start + rng.randrange(4))
+        incremental.edit(start, end, rng.choice(["", "1", " ", "ab", ";x=2;", "(("]))
+
+        expected = lexer(incremental.text)
+        assert [(t.lex, t.ttype) for t in incremental.tokens] == [
+            (t.lex, t.ttype) for t in expected
+        ]
+        spans = zip(incremental.starts, incremental.ends)
+        assert [incremental.text[i:j] for i, j in spans][:-1] == [
+            t.lex for t in expected[:-1]
+        ]
+
+
+def test_incremental_evaluation_skips_evaluated_subtrees():
+    G, lexer = build_statements()
+    calls = []
+    for production in G.productions:
+        rule = production.attributes[0]
+        production.attributes = (
+            lambda h, s, rule=rule: calls.append(1) or rule(h, s),
+        ) + tuple(production.attributes[1:])
+
+    text = "".join(f"v = ({i} + 1) + {i};" for i in range(50))
+    document = IncrementalDocument(lexer, LR1Parser(G), text)
+    document.tree.evaluate()
+    total = len(calls)
+
+    assert document.tree.evaluate()[49] == ("v", 99)
+    assert len(calls) == total
+
+    document.edit(0, 1, "w")
+    assert document.tree.evaluate()[0] == ("w", 1)
+    assert len(calls) - total < total // 2
@@ -1,6 +1,6 @@
 import pytest
 
-from pycmp.lexer import Lexer
+from pycmp.lexer import Lexer, IncrementalLexer
 
 from tests.pycmp_tests.test_lexer_cases import test_lexer_lex_cases
 from tests.pycmp_tests.test_lexer_cases import test_lexer_ttype_cases
@@ -18,3 +18,23 @@ def test_lexer_ttypes(regexs, eof, text, ttypes):
     lexer = Lexer(regexs, eof)
     tokens = lexer(text)
     assert ttypes == tuple(t.ttype for t in tokens)
+
+
+@pytest.mark.parametrize(("regexs", "eof", "text", "lexs"), test_lexer_lex_cases)
+def test_incremental_lexer(regexs, eof, text, lexs):
+    lexer = Lexer(regexs, eof)
+    incremental = IncrementalLexer(lexer, text)
+    assert lexs == tuple(t.lex for t in incremental.tokens)
+
+    edits = [(0, 0, "12 "), (4, 6, ""), (7, 7, "ach4"), (3, 9, "f"), (5, 5, "o")]
+    edits += [(len(text) - 1, len(text) - 1, " x"), (0, 0, "$"), (0, 1, "")]
+    for start, end, replacement in edits:
+        incremental.edit(start, end, replacement)
+        expected = lexer(incremental.text)
+        assert [(t.lex, t.ttype) for t in incremental.tokens] == [
+            (t.lex, t.ttype) for t in expected
+        ]
+        spans = zip(incremental.starts, incremental.ends)
+        assert [incremental.text[start:end] for start, end in spans][:-1] == [
+            t.lex for t in expected
+        ][:-1]
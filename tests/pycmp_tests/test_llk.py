@@ -0,0 +1,92 @@
+import pytest
+
+from pycmp.grammar import Grammar
+from pycmp.exceptions import LLkLimitError
+from pycmp.parsing import compute_firsts
+from pycmp.llk import PrefixTrie, compute_firsts_k, terminal_ids
+from pycmp.llk import build_llk_table, build_llk_parser
+
+from tests.pycmp_tests.test_parsing_cases import test_compute_firsts_cases
+
+
+def test_prefix_trie_concat():
+    left = PrefixTrie.from_strings((), (1,), (1, 2, 3))
+    right = PrefixTrie.from_strings((4,), (5, 6))
+
+    assert sorted(left.concat(right, 3)) == [(1, 2, 3), (1, 4), (1, 5, 6), (4,), (5, 6)]
+
+    left = PrefixTrie.from_strings((), (1,))
+    assert sorted(left.concat(right, 1)) == [(1,), (4,), (5,)]
+
+
+@pytest.mark.parametrize(("grammar", "firsts"), test_compute_firsts_cases)
+def test_firsts_k1_matches_firsts(grammar, firsts):
+    ids = terminal_ids(grammar)
+    firsts_k = compute_firsts_k(grammar, 1, ids)
+    for symbol, first in compute_firsts(grammar).items():
+        if symbol not in firsts_k:
+            continue
+        expected = {(ids[t],) for t in first}
+        if first.contains_epsilon:
+            expected.add(())
+        assert expected == set(firsts_k[symbol])
+
+
+def build_ll2_grammar():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    A = G.add_nonterminal("A")
+    a, b, c = G.add_terminals("a b c")
+
+    S %= a + b | a + c + A
+    A %= c + A | G.epsilon
+
+    return G
+
+
+def test_llk_raises_k_only_where_needed():
+    G = build_ll2_grammar()
+    table = build_llk_table(G, max_k=3)
+
+    assert table.is_llk
+    assert table.k == {G["S"]: 2, G["A"]: 1}
+    assert table.decisions[G["A"]].depth == 1
+
+
+def test_llk_parser():
+    G = build_ll2_grammar()
+    S, A = G["S"], G["A"]
+    a, c = G["a"], G["c"]
+    parser = build_llk_parser(G)
+
+    parse = parser([a, c, c, c, G.eof])
+    assert str(parse) == "[S -> a c A, A -> c A, A -> c A, A -> e]"
+
+
+def test_llk_reports_conflicts_beyond_max_k():
+    G = Grammar()
+    S, A = G.add_nonterminal("S", True), G.add_nonterminal("A")
+    a, b, c = G.add_terminals("a b c")
+
+    S %= A + b | A + c
+    A %= a + A | a
+
+    table = build_llk_table(G, max_k=4)
+    assert not table.is_llk
+    assert table.k[S] == 4
+    assert all(len(prefix) == 4 for prefix, _ in table.conflicts[S])
+    assert table.stats.iterations > 0
+
+
+def test_llk_node_limit():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    terminals = G.add_terminals("a b c d e f")
+
+    S %= S + S
+    for t in terminals:
+        S %= t
+
+    with pytest.raises(LLkLimitError) as error:
+        build_llk_table(G, max_k=4, max_nodes=50)
+    assert error.value.stats.max_set_nodes > 50
@@ -1,8 +1,11 @@
 import pytest
 
+from pycmp.grammar import Grammar
 from pycmp.parsing import compute_firsts, compute_follows
+from pycmp.parsing import compute_local_first, compute_suffix_firsts
 from pycmp.parsing import build_ll_table, build_ll_parser
 from pycmp.parsing import build_lr0_automaton, build_lr1_automaton
+from pycmp.parsing import build_minimal_lr1_automaton
 from pycmp.parsing import expand, closure_lr1, goto_lr1
 from pycmp.parsing import SLR1Parser, LR1Parser
 from pycmp.evaluation import evaluate_parse
@@ -19,6 +22,14 @@ from tests.pycmp_tests.test_parsing_cases import test_expand_cases
 from tests.pycmp_tests.test_parsing_cases import test_closure_lr1_cases
 from tests.pycmp_tests.test_parsing_cases import test_goto_lr1_cases
 from tests.pycmp_tests.test_parsing_cases import test_lr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_lr1_not_lalr1_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_minimal_lr1_automaton_cases
+from tests.pycmp_tests.test_parsing_cases import test_precedence_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_precedence_parser_error_cases
+from tests.pycmp_tests.test_parsing_cases import test_unit_productions_cases
+from tests.pycmp_tests.test_parsing_cases import test_entries_parser_cases
+from tests.pycmp_tests.test_parsing_cases import test_entries_parser_error_cases
+from tests.pycmp_tests.test_compiled import parsing_tables
 
 
 @pytest.mark.parametrize(("grammar", "firsts"), test_compute_firsts_cases)
@@ -31,6 +42,24 @@ def test_compute_follows(grammar, firsts, follows):
     assert follows == compute_follows(grammar, firsts)
 
 
+@pytest.mark.parametrize(("grammar", "firsts"), test_compute_firsts_cases)
+def test_compute_suffix_firsts(grammar, firsts):
+    suffixes = compute_suffix_firsts(grammar, firsts)
+    for production in grammar.productions:
+        right = tuple(production.right)
+        expected = [
+            compute_local_first(firsts, right[i:]) for i in range(len(right) + 1)
+        ]
+        assert expected == suffixes[production]
+
+
+@pytest.mark.parametrize(("item", "firsts", "result"), test_expand_cases)
+def test_expand_with_suffixes(item, firsts, result):
+    grammar = item.production.left.grammar
+    suffixes = compute_suffix_firsts(grammar, firsts)
+    assert result == str(expand(item, firsts, suffixes))
+
+
 @pytest.mark.parametrize(
     ("grammar", "firsts", "follows", "table"), test_build_ll_table_cases
 )
@@ -93,3 +122,123 @@ def test_build_lr1_automaton(grammar, text, recognize):
 def test_lr1_parser(grammar, tokens, derivation):
     parser = LR1Parser(grammar)
     assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "canonical", "minimal"), test_minimal_lr1_automaton_cases
+)
+def test_minimal_lr1_automaton_states(grammar, canonical, minimal):
+    augmented = grammar.get_augmented_grammar(True)
+    assert canonical == len(list(build_lr1_automaton(augmented)))
+    assert minimal == len(list(build_minimal_lr1_automaton(augmented)))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "text", "recognize"), test_build_lr1_automaton_cases
+)
+def test_build_minimal_lr1_automaton(grammar, text, recognize):
+    automaton = build_minimal_lr1_automaton(grammar)
+    assert recognize == automaton.recognize(text)
+
+
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"),
+    test_lr1_parser_cases + test_slr1_parser_cases + test_lr1_not_lalr1_parser_cases,
+)
+def test_minimal_lr1_parser(grammar, tokens, derivation):
+    parser = LR1Parser(grammar, minimal=True)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize("parser_class", [SLR1Parser, LR1Parser])
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_precedence_parser_cases
+)
+def test_precedence_parser(parser_class, grammar, tokens, derivation):
+    parser = parser_class(grammar)
+    assert derivation == str(parser(tokens))
+
+
+@pytest.mark.parametrize("parser_class", [SLR1Parser, LR1Parser])
+@pytest.mark.parametrize(("grammar", "tokens"), test_precedence_parser_error_cases)
+def test_precedence_parser_nonassoc(parser_class, grammar, tokens):
+    parser = parser_class(grammar)
+    with pytest.raises(Exception):
+        parser(tokens)
+
+
+@pytest.mark.parametrize("parser_class", [SLR1Parser, LR1Parser])
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation", "reductions", "skipped_reductions"),
+    test_unit_productions_cases,
+)
+def test_skip_unit_productions(
+    parser_class, grammar, tokens, derivation, reductions, skipped_reductions
+):
+    expected = parser_class(grammar)(tokens, return_actions=True)
+    parser = parser_class(grammar, skip_unit_productions=True)
+
+    assert expected == parser(tokens, return_actions=True)
+
+    parse, actions = parser(tokens, return_actions=True, unit_productions=False)
+    assert derivation == str(parse)
+    assert reductions == expected[1].count(parser.REDUCE)
+    assert skipped_reductions == actions.count(parser.REDUCE)
+
+
+@pytest.mark.parametrize("minimal", [False, True])
+@pytest.mark.parametrize(
+    ("grammar", "entries", "entry", "tokens", "derivation"), test_entries_parser_cases
+)
+def test_entries_parser(minimal, grammar, entries, entry, tokens, derivation):
+    parser = LR1Parser(grammar, minimal=minimal, entries=entries)
+    assert derivation == str(parser(tokens, entry=entry))
+
+
+@pytest.mark.parametrize(
+    ("grammar", "entries", "entry", "tokens"), test_entries_parser_error_cases
+)
+def test_entries_parser_errors(grammar, entries, entry, tokens):
+    parser = LR1Parser(grammar, entries=entries)
+    with pytest.raises(Exception):
+        parser(tokens, entry=entry)
+
+
+@pytest.mark.parametrize(
+    ("grammar", "entries", "entry", "tokens", "derivation"),
+    test_entries_parser_cases[:1],
+)
+def test_entries_share_states(grammar, entries, entry, tokens, derivation):
+    shared = LR1Parser(grammar, entries=entries)
+    states = {state for state, _ in shared.action}
+
+    separate = 0
+    for entry in entries:
+        parser = LR1Parser(grammar, entries=[entry])
+        separate += len({state for state, _ in parser.action})
+
+    assert len(states) < separate
+
+
+@pytest.mark.parametrize("parser_class", [SLR1Parser, LR1Parser])
+@pytest.mark.parametrize(
+    ("grammar", "tokens", "derivation"), test_lr1_parser_cases + test_slr1_parser_cases
+)
+def test_parser_update(parser_class, grammar, tokens, derivation):
+    G = Grammar.from_json(grammar.to_json)
+    try:
+        parser = parser_class(G)
+    except AssertionError:
+        return
+    tokens = [G[token.name] for token in tokens]
+
+    for production in list(G.productions):
+        try:
+            parser.update(removed=[production])
+        except AssertionError:
+            continue
+        assert parsing_tables(parser) == parsing_tables(parser_class(G))
+
+        parser.update(added=[production])
+        assert parsing_tables(parser) == parsing_tables(parser_class(G))
+        assert derivation == str(parser(tokens))
@@ -388,3 +388,113 @@ tokens = [num, plus, num, equal, num, plus, num, grammar.eof]
 derivation = "[A -> int, A -> int + A, A -> int, A -> int + A, E -> A = A]"
 
 test_lr1_parser_cases = [(grammar, tokens, derivation)]
+
+grammar = Grammar()
+S = grammar.add_nonterminal("S", True)
+A, B = grammar.add_nonterminals("A B")
+a, b, c, d, e = grammar.add_terminals("a b c d e")
+
+S %= a + A + d | b + B + d | a + B + e | b + A + e
+A %= c
+B %= c
+
+tokens = [b, c, e, grammar.eof]
+derivation = "[A -> c, S -> b A e]"
+
+test_lr1_not_lalr1_parser_cases = [(grammar, tokens, derivation)]
+
+# (grammar, canonical LR(1) states, minimal LR(1) states)
+test_minimal_lr1_automaton_cases = [
+    (test_compute_firsts_cases[0][0], 42, 22),
+    (test_compute_firsts_cases[1][0], 8, 8),
+    (test_compute_firsts_cases[2][0], 18, 16),
+    (test_slr1_parser_cases[0][0], 22, 12),
+    (test_lr1_parser_cases[0][0], 12, 9),
+    (grammar, 14, 14),
+]
+
+grammar = Grammar()
+E = grammar.add_nonterminal("E", True)
+lt, plus, minus, star, power, opar, cpar, num, uminus = grammar.add_terminals(
+    "< + - * ^ ( ) int uminus"
+)
+
+E %= E + lt + E | E + plus + E | E + minus + E | E + star + E | E + power + E
+E %= opar + E + cpar | minus + E | num
+
+grammar.add_precedence("nonassoc", lt)
+grammar.add_precedence("left", plus, minus)
+grammar.add_precedence("left", star)
+grammar.add_precedence("right", power)
+grammar.add_precedence("right", uminus)
+grammar.set_production_precedence(E.productions[6], uminus)
+
+test_precedence_parser_cases = [
+    (
+        grammar,
+        [num, plus, num, star, num, minus, num, grammar.eof],
+        "[E -> int, E -> int, E -> int, E -> E * E, E -> E + E, E -> int, E -> E - E]",
+    ),
+    (
+        grammar,
+        [num, power, num, power, num, grammar.eof],
+        "[E -> int, E -> int, E -> int, E -> E ^ E, E -> E ^ E]",
+    ),
+    (
+        grammar,
+        [minus, num, star, num, grammar.eof],
+        "[E -> int, E -> - E, E -> int, E -> E * E]",
+    ),
+    (grammar, [num, lt, num, grammar.eof], "[E -> int, E -> int, E -> E < E]"),
+]
+
+test_precedence_parser_error_cases = [(grammar, [num, lt, num, lt, num, grammar.eof])]
+
+grammar = test_slr1_parser_cases[0][0]
+num, plus, star = grammar["int"], grammar["+"], grammar["*"]
+
+tokens = [num, plus, num, star, num, plus, num, star, num, grammar.eof]
+derivation = (
+    "[F -> int, F -> int, F -> int, T -> T * F, E -> E + T, "
+    "F -> int, F -> int, T -> T * F, E -> E + T]"
+)
+
+test_unit_productions_cases = [(grammar, tokens, derivation, 13, 9)]
+
+grammar = Grammar()
+S = grammar.add_nonterminal("S", True)
+E, T = grammar.add_nonterminals("E T")
+idx, equal, plus, opar, cpar = grammar.add_terminals("id = + ( )")
+
+S %= idx + equal + E
+E %= E + plus + T | T
+T %= idx | opar + E + cpar
+
+test_entries_parser_cases = [
+    (
+        grammar,
+        [S, E, T],
+        S,
+        [idx, equal, idx, plus, idx, grammar.eof],
+        "[T -> id, E -> T, T -> id, E -> E + T, S -> id = E]",
+    ),
+    (
+        grammar,
+        [S, E, T],
+        E,
+        [idx, plus, opar, idx, cpar, grammar.eof],
+        "[T -> id, E -> T, T -> id, E -> T, T -> ( E ), E -> E + T]",
+    ),
+    (
+        grammar,
+        [S, E, T],
+        T,
+        [opar, idx, cpar, grammar.eof],
+        "[T -> id, E -> T, T -> ( E )]",
+    ),
+]
+
+test_entries_parser_error_cases = [
+    (grammar, [S, E, T], T, [idx, plus, idx, grammar.eof]),
+    (grammar, [S, E, T], E, [idx, equal, idx, grammar.eof]),
+]
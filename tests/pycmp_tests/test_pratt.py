@@ -0,0 +1,96 @@
+from pycmp.grammar import Grammar
+from pycmp.token import Token
+from pycmp.parsing import LR1Parser
+from pycmp.pratt import find_expression_chains, build_hybrid_parser
+from pycmp.evaluation import evaluate_parse, evaluate_reverse_parse
+
+
+def build_grammar():
+    G = Grammar()
+    S = G.add_nonterminal("S", True)
+    E, T, P, F = G.add_nonterminals("E T P F")
+    let, idx, equal, plus, minus, star, power, opar, cpar, num = G.add_terminals(
+        "let id = + - * ^ ( ) num"
+    )
+
+    S %= let + idx + equal + E, lambda h, s: s[4], None, None, None, None
+
+    E %= E + plus + T, lambda h, s: s[1] + s[3], None, None, None
+    E %= E + minus + T, lambda h, s: s[1] - s[3], None, None, None
+    E %= T, lambda h, s: s[1], None
+
+    T %= T + star + P, lambda h, s: s[1] * s[3], None, None, None
+    T %= P, lambda h, s: s[1], None
+
+    P %= F + power + P, lambda h, s: s[1] ** s[3], None, None, None
+    P %= F, lambda h, s: s[1], None
+
+    F %= opar + E + cpar, lambda h, s: s[2], None, None, None
+    F %= num, lambda h, s: float(s[1]), None
+
+    return G
+
+
+def tokenize(G, text):
+    tokens = [
+        Token(lex, G[lex] or (G["num"] if lex.isdigit() else G["id"]))
+        for lex in text.split()
+    ]
+    return tokens + [Token("$", G.eof)]
+
+
+def test_find_expression_chains():
+    G = build_grammar()
+    chains = find_expression_chains(G)
+
+    assert set(chains) == {G["E"], G["T"], G["P"]}
+    chain = chains[G["E"]]
+    assert chain.levels == [G["E"], G["T"], G["P"]]
+    assert chain.primary == G["F"]
+    assert chain.associativity == ["left", "left", "right"]
+    assert chain.operators[G["*"]][0] == 1
+
+
+def test_hybrid_parser_matches_lr_parser():
+    G = build_grammar()
+    parser = build_hybrid_parser(G)
+    lr_parser = LR1Parser(G)
+
+    for text in [
+        "let x = 1",
+        "let x = 2 - 3 - 4",
+        "let x = 2 ^ 3 ^ 2",
+        "let x = 1 + 2 * 3 ^ 2 * 4 - ( 5 - 6 ) * 7",
+    ]:
+        tokens = tokenize(G, text)
+        left_parse = parser([t.ttype for t in tokens])
+        right_parse, actions = lr_parser([t.ttype for t in tokens], return_actions=True)
+
+        assert len(left_parse) == len(right_parse)
+        assert evaluate_parse(left_parse, tokens) == evaluate_reverse_parse(
+            right_parse, actions, tokens
+        )
+
+
+def test_hybrid_parser_left_parse():
+    G = build_grammar()
+    parser = build_hybrid_parser(G)
+    tokens = tokenize(G, "let x = 1 - 2 * 3")
+
+    assert str(parser([t.ttype for t in tokens])) == (
+        "[S -> let id = E, E -> E - T, E -> T, T -> P, P -> F, F -> num, "
+        "T -> T * P, T -> P, P -> F, F -> num, P -> F, F -> num]"
+    )
+
+
+def test_hybrid_parser_errors():
+    G = build_grammar()
+    parser = build_hybrid_parser(G)
+
+    for text in ["let x = 1 +", "let x = ( 1", "let x = 1 1"]:
+        tokens = tokenize(G, text)
+        try:
+            parser([t.ttype for t in tokens])
+            assert False
+        except Exception as e:
+            assert str(e) == "Parsing error"
@@ -1,6 +1,8 @@
 import pytest
 
-from pycmp.regex import Regex
+from pycmp.automata import nfa_to_dfa
+from pycmp.evaluation import evaluate_parse
+from pycmp.regex import Regex, regex_tokenizer, build_nfa
 
 test_regex_cases = [
     ("a*(a|b)*cd | ε", "", True),
@@ -23,3 +25,32 @@ test_regex_cases = [
 def test_regex(regex, text, recognize):
     regex = Regex(regex, skip_whitespaces=True)
     assert recognize == regex(text)
+
+
+def test_regex_match_many():
+    regex = Regex("a*(a|b)*cd | ε", skip_whitespaces=True)
+    texts = [text for _, text, _ in test_regex_cases]
+    expected = [recognize for _, _, recognize in test_regex_cases]
+    assert regex.match_many(texts) == expected
+    assert regex.match_many(texts, workers=4) == expected
+
+
+@pytest.mark.parametrize(("regex", "text", "recognize"), test_regex_cases)
+def test_build_nfa(regex, text, recognize):
+    tokens = regex_tokenizer(regex, Regex.grammar)
+    ast = evaluate_parse(Regex.parser([t.ttype for t in tokens]), tokens)
+    assert nfa_to_dfa(build_nfa(ast)).recognize(text) == recognize
+    assert nfa_to_dfa(ast.evaluate()).recognize(text) == recognize
+
+
+def test_regex_long_patterns():
+    # deeper than the recursion limit in both the parse and the ast
+    word = "ab" * 1500
+    regex = Regex(word)
+    assert regex(word)
+    assert not regex(word[:-1])
+
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    regex = Regex("|".join(letters * 40))
+    assert all(regex(letter) for letter in letters)
+    assert not regex("") and not regex("aa")